@@ -1,58 +1,286 @@
-from flask import Flask, jsonify, request
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Optional
+from flask import Blueprint, Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
-from utils.graph import graph_main  # graph.py의 graph_main 임포트
+from utils.graph import BATCH_CONCURRENCY, build_initial_state, graph_batch_iter, graph_main, graph_stream, load_checkpointed_history  # graph.py의 graph_main 임포트
+from utils.llm_scheduler import QueueFullError
+from utils.logging_config import configure_logging, set_request_id
+from utils.memory.conversation_store import conversation_store
+from utils.memory.session_backend import COMPACT_INTERVAL, session_backend
+from utils.metrics import CONTENT_TYPE, http_server_duration, metrics_enabled, registry
+from utils.startup import warm_up, warm_up_enabled
+from utils.streaming import format_sse
+from utils.timing import NodeTimingHandler
+from utils.tracing import start_trace, trace_enabled
 
 # 환경 변수 로드
 load_dotenv()
 
-# Flask 애플리케이션 생성
-app = Flask(__name__)
-CORS(app)
+# 배치 요청 하나에 담을 수 있는 최대 대화 수
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "100"))
+
+# 라우트 정의 (create_app 에서 애플리케이션에 등록)
+bp = Blueprint('chatbot', __name__)
+
+# 이 프로세스에서 세션 정리를 시작했는지 여부
+_compaction_lock = threading.Lock()
+_compaction_started = False
+
+def start_session_compaction() -> None:
+    """
+    만료된 대화(와 SESSION_LEGACY_DIR 의 Flask-Session 파일)의 백그라운드 정리를 시작하고,
+    프로세스가 끝날 때 멈추도록 등록합니다. 여러 번 호출해도 한 번만 시작합니다.
+    모듈을 임포트하기만 하는 도구나 테스트에서는 정리 스레드가 돌지 않도록 첫 요청에서 호출합니다.
+    """
+    global _compaction_started
+    if _compaction_started:
+        return
+    with _compaction_lock:
+        if _compaction_started:
+            return
+        session_backend.start_compaction(COMPACT_INTERVAL)
+        atexit.register(session_backend.stop_compaction)
+        _compaction_started = True
+
+# 이 프로세스에서 미리 준비(warm_up)를 마쳤는지 여부
+_warm_up_lock = threading.Lock()
+_warmed_up = False
+
+def warm_up_once() -> None:
+    """
+    이 프로세스에서 아직 하지 않았으면 그래프, 에이전트, 연결 풀 등을 미리 준비합니다.
+    여러 번 호출해도 한 번만 실행하며, 준비하는 동안 들어온 다른 호출은 끝날 때까지 기다립니다.
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    with _warm_up_lock:
+        if _warmed_up:
+            return
+        warm_up()
+        _warmed_up = True
+
+@bp.before_app_request
+def start_background_tasks():
+    """
+    서버가 첫 요청을 받을 때 세션 정리를 시작하고, 아직 준비하지 않았으면 미리 준비합니다. (gunicorn 에서는 워커마다 시작)
+    gunicorn 워커는 gunicorn.conf.py 의 post_worker_init 에서 이미 준비를 마치므로 첫 요청이 기다리지 않습니다.
+    """
+    start_session_compaction()
+    if warm_up_enabled():
+        warm_up_once()
+
+@bp.before_app_request
+def start_request_metrics():
+    """요청 처리 시작 시각과 요청 ID 를 기록하고, trace-context 전파가 켜져 있으면 요청의 trace 를 시작합니다."""
+    g.request_started = time.perf_counter()
+    g.request_id = set_request_id(request.headers.get('X-Request-ID'))
+    if trace_enabled():
+        g.traceparent = start_trace(request.headers.get('traceparent'))
+
+@bp.after_app_request
+def record_request_metrics(response):
+    """
+    요청 처리 시간을 지표로 기록합니다.
+    스트리밍 응답은 본문을 보내기 전에 호출되므로 첫 응답까지의 시간이 기록됩니다.
+    """
+    if metrics_enabled() and 'request_started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_server_duration.observe(
+            time.perf_counter() - g.request_started,
+            route=route, method=request.method, status=response.status_code
+        )
+    if 'traceparent' in g:
+        response.headers['traceparent'] = g.traceparent
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@bp.app_errorhandler(QueueFullError)
+def queue_full(error):
+    """LLM 호출 대기열이 가득 차면 기다리지 않고 503 과 Retry-After 로 응답합니다."""
+    return (
+        jsonify({'error': '요청이 많아 지금은 답변할 수 없습니다. 잠시 후 다시 시도해주세요.'}),
+        503,
+        {'Retry-After': str(int(error.retry_after))}
+    )
+
+# Prometheus 지표 제공
+@bp.route('/metrics')
+def metrics_route():
+    """
+    그래프 노드, 언어 모델, 도구, 외부 HTTP 요청의 지연 시간 히스토그램과 캐시 통계를
+    Prometheus 텍스트 형식으로 반환하는 라우트입니다.
+    """
+    return Response(registry.render(), content_type=CONTENT_TYPE)
 
 # 홈 페이지 제공
-@app.route('/')
+@bp.route('/')
 def serve_home():
     """
     메인 페이지를 제공하는 라우트입니다.
     """
 
 # 챗봇 라우트 정의
-@app.route('/chatbot', methods=['POST'])
+@bp.route('/chatbot', methods=['POST'])
 def chatbot_route():
     """
     챗봇 요청을 처리하는 라우트입니다.
-    클라이언트로부터 메시지와 히스토리를 받아 그래프를 실행하고 응답을 반환합니다.
+    클라이언트로부터 메시지와 대화 ID를 받아 그래프를 실행하고 응답을 반환합니다.
+    대화 기록은 서버에 저장되며, 이전 방식처럼 history를 직접 보내는 것도 지원합니다.
     """
     data = request.get_json()
     question = data.get('message')
-    history = data.get('history')
 
     if not question:
         return jsonify({'error': '메시지를 입력해주세요.'}), 400
 
-    # 초기 상태 설정
-    if history:
-        state = {
-            "messages": [
-                *history,
-                {"role": "user", "content": question}
-            ]
-        }
-    else:
-        state = {
-            "messages": [
-                {"role": "user", "content": question}
-            ]
-        }
-
-    # 그래프 실행
-    result = graph_main(state)
+    # 대화 기록 불러오기 및 초기 상태 설정
+    conversation_id, history = conversation_store.resolve(data.get('conversation_id'), data.get('history'))
+    state = build_initial_state(question, history, conversation_id)
+
+    # 그래프 실행 (노드별 실행 시간은 Server-Timing 헤더로 전달)
+    timing = NodeTimingHandler()
+    result = graph_main(state, thread_id=conversation_id, use_cache=data.get('cache', True), callbacks=[timing])
 
     # 최종 응답 가져오기
     final_response = result.get('generation', result.get('response', '죄송하지만, 답변을 생성할 수 없습니다.'))
+    conversation_store.record_turn(conversation_id, question, final_response, history)
+
+    return (
+        jsonify({'llm': final_response, 'conversation_id': conversation_id}),
+        200,
+        {'Server-Timing': timing.server_timing()}
+    )
+
+# 스트리밍 챗봇 라우트 정의
+@bp.route('/chatbot/stream', methods=['POST'])
+def chatbot_stream_route():
+    """
+    챗봇 응답을 Server-Sent Events로 스트리밍하는 라우트입니다.
+    요청 형식은 /chatbot 과 같고, 대화 ID(conversation)와 토큰, 진행 상황(node_start, token, agent, progress)을
+    보낸 뒤 최종 응답을 answer 이벤트로 보냅니다.
+    """
+    data = request.get_json()
+    question = data.get('message')
+
+    if not question:
+        return jsonify({'error': '메시지를 입력해주세요.'}), 400
+
+    conversation_id, history = conversation_store.resolve(data.get('conversation_id'), data.get('history'))
+    state = build_initial_state(question, history, conversation_id)
+
+    def generate():
+        yield format_sse('conversation', {'conversation_id': conversation_id})
+        for event, payload in graph_stream(state, thread_id=conversation_id):
+            if event == 'answer':
+                conversation_store.record_turn(conversation_id, question, payload['text'], history)
+            yield format_sse(event, payload)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# 배치 챗봇 라우트 정의
+@bp.route('/chatbot/batch', methods=['POST'])
+def chatbot_batch_route():
+    """
+    여러 대화를 한 번에 처리하는 라우트입니다. 오프라인 작업(추천 미리 생성, 프롬프트 평가 등)에 사용합니다.
+    요청: {"conversations": [{"message", "conversation_id"?, "history"?}, ...], "cache"?, "concurrency"?, "stream"?}
+    응답: 요청 순서대로 {"results": [{"llm", "conversation_id"} 또는 {"error"}, ...]}.
+    stream 이 true 이면 끝나는 순서대로 한 줄에 하나씩 {"index", ...} JSON 을 보냅니다 (application/x-ndjson).
+    대화 하나가 실패해도 나머지 대화는 계속 처리됩니다.
+    """
+    data = request.get_json()
+    conversations = data.get('conversations')
+
+    if not isinstance(conversations, list) or not conversations:
+        return jsonify({'error': '대화 목록을 입력해주세요.'}), 400
+    if len(conversations) > BATCH_MAX_SIZE:
+        return jsonify({'error': f'한 번에 최대 {BATCH_MAX_SIZE}개의 대화를 처리할 수 있습니다.'}), 400
+
+    # 동시 실행 수는 서버 설정(BATCH_CONCURRENCY)보다 낮게만 지정할 수 있음
+    concurrency = data.get('concurrency')
+    if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+        return jsonify({'error': 'concurrency 는 1 이상의 정수여야 합니다.'}), 400
+    concurrency = min(concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)
+
+    # 메시지가 없는 대화는 실행하지 않고 오류로 응답
+    results = [None] * len(conversations)
+    jobs = []
+    for index, item in enumerate(conversations):
+        question = item.get('message') if isinstance(item, dict) else None
+        if not question:
+            results[index] = {'error': '메시지를 입력해주세요.'}
+            continue
+        conversation_id, history = conversation_store.resolve(item.get('conversation_id'), item.get('history'))
+        jobs.append((index, question, conversation_id, history))
+
+    def run():
+        """(요청 안에서의 위치, 결과) 를 끝나는 순서대로 돌려줍니다."""
+        states = [build_initial_state(question, history, conversation_id) for _, question, conversation_id, history in jobs]
+        completed = graph_batch_iter(
+            states,
+            thread_ids=[conversation_id for _, _, conversation_id, _ in jobs],
+            use_cache=data.get('cache', True),
+            max_concurrency=concurrency,
+        )
+        for position, result in completed:
+            index, question, conversation_id, history = jobs[position]
+            if 'error' in result:
+                yield index, {'error': '죄송하지만, 답변을 생성할 수 없습니다.', 'conversation_id': conversation_id}
+                continue
+            final_response = result.get('generation', result.get('response', '죄송하지만, 답변을 생성할 수 없습니다.'))
+            conversation_store.record_turn(conversation_id, question, final_response, history)
+            yield index, {'llm': final_response, 'conversation_id': conversation_id}
+
+    if data.get('stream'):
+        def generate():
+            for index, result in enumerate(results):
+                if result is not None:
+                    yield json.dumps({'index': index, **result}, ensure_ascii=False) + '\n'
+            for index, result in run():
+                yield json.dumps({'index': index, **result}, ensure_ascii=False) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    for index, result in run():
+        results[index] = result
+    return jsonify({'results': results})
+
+def create_app(warm: Optional[bool] = None) -> Flask:
+    """
+    Flask 애플리케이션을 생성합니다.
+    로깅을 설정하고, warm 이 True 이면 요청을 받기 전에 그래프, 에이전트, 연결 풀 등을 미리 준비합니다.
+    warm 이 False 이면 생성할 때는 준비하지 않고, WARM_UP 이 켜져 있으면 첫 요청(또는 gunicorn 의 post_worker_init)에서 준비합니다.
+
+    Args:
+        warm (bool, optional): 생성할 때 미리 준비할지 여부 (기본값은 WARM_UP 환경 변수, 켜짐)
+
+    Returns:
+        Flask: 애플리케이션
+    """
+    configure_logging()
+    # 저장소에 없는 대화는 그래프 체크포인트에서 복원
+    conversation_store.fallback_loader = load_checkpointed_history
+
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(bp)
+    if warm_up_enabled() if warm is None else warm:
+        warm_up_once()
+    return app
 
-    return jsonify({'llm': final_response}), 200
+# flask run, gunicorn "app:app" 에서 사용하는 애플리케이션 (gunicorn "app:create_app()" 도 가능)
+# 임포트만 하는 도구나 테스트에서 준비 비용을 치르지 않도록 생성할 때는 준비하지 않음
+app = create_app(warm=False)
 
 if __name__ == '__main__':
     # 애플리케이션 실행
@@ -0,0 +1,234 @@
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from utils.graph import (
+    BATCH_CONCURRENCY, build_initial_state, graph_batch_iter_async, graph_main_async, graph_stream_async,
+    load_checkpointed_history,
+)
+from utils.llm_scheduler import QueueFullError
+from utils.logging_config import configure_logging, set_request_id
+from utils.memory.conversation_store import conversation_store
+from utils.memory.session_backend import COMPACT_INTERVAL, session_backend
+from utils.metrics import CONTENT_TYPE, http_server_duration, metrics_enabled, registry
+from utils.optimization import close_async_http_client
+from utils.startup import warm_up, warm_up_enabled
+from utils.streaming import format_sse
+from utils.timing import NodeTimingHandler
+from utils.tracing import start_trace, trace_enabled
+
+# 환경 변수 로드
+load_dotenv()
+
+# 배치 요청 하나에 담을 수 있는 최대 대화 수
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "100"))
+
+# 라우트 정의 (create_app 에서 애플리케이션에 등록)
+router = APIRouter()
+
+
+async def request_metrics(request: Request, call_next):
+    """요청 ID 를 정하고 처리 시간을 지표로 기록하며, trace-context 전파가 켜져 있으면 요청의 trace 를 시작합니다."""
+    started = time.perf_counter()
+    request_id = set_request_id(request.headers.get('X-Request-ID'))
+    traceparent = start_trace(request.headers.get('traceparent')) if trace_enabled() else None
+    response = await call_next(request)
+    if metrics_enabled():
+        route = request.scope.get('route')
+        http_server_duration.observe(
+            time.perf_counter() - started,
+            route=route.path if route else 'unmatched', method=request.method, status=response.status_code
+        )
+    if traceparent:
+        response.headers['traceparent'] = traceparent
+    response.headers['X-Request-ID'] = request_id
+    return response
+
+
+async def queue_full(request: Request, error: QueueFullError):
+    """LLM 호출 대기열이 가득 차면 기다리지 않고 503 과 Retry-After 로 응답합니다."""
+    return JSONResponse(
+        {'error': '요청이 많아 지금은 답변할 수 없습니다. 잠시 후 다시 시도해주세요.'},
+        status_code=503,
+        headers={'Retry-After': str(int(error.retry_after))}
+    )
+
+
+@router.get('/metrics')
+async def metrics_route():
+    """그래프 노드, 언어 모델, 도구, 외부 HTTP 요청의 지연 시간과 캐시 통계를 Prometheus 텍스트 형식으로 반환합니다."""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+@router.post('/chatbot')
+async def chatbot_route(request: Request):
+    """
+    app.py 의 /chatbot 과 같은 JSON 형식(message, conversation_id/history → llm)을 사용하는 비동기 챗봇 라우트입니다.
+    그래프를 ainvoke 로 실행하므로 대화 하나가 워커 스레드를 점유하지 않습니다.
+    """
+    data = await request.json()
+    question = data.get('message')
+
+    if not question:
+        return JSONResponse({'error': '메시지를 입력해주세요.'}, status_code=400)
+
+    # 대화 기록 불러오기, 초기 상태 설정 및 그래프 실행
+    conversation_id, history = await run_in_threadpool(
+        conversation_store.resolve, data.get('conversation_id'), data.get('history')
+    )
+    state = build_initial_state(question, history, conversation_id)
+    timing = NodeTimingHandler()
+    result = await graph_main_async(
+        state, thread_id=conversation_id, use_cache=data.get('cache', True), callbacks=[timing]
+    )
+
+    # 최종 응답 가져오기
+    final_response = result.get('generation', result.get('response', '죄송하지만, 답변을 생성할 수 없습니다.'))
+    await run_in_threadpool(conversation_store.record_turn, conversation_id, question, final_response, history)
+
+    return JSONResponse(
+        {'llm': final_response, 'conversation_id': conversation_id},
+        status_code=200,
+        headers={'Server-Timing': timing.server_timing()}
+    )
+
+
+@router.post('/chatbot/stream')
+async def chatbot_stream_route(request: Request):
+    """
+    app.py 의 /chatbot/stream 과 같은 Server-Sent Events 스트리밍 라우트입니다.
+    대화 ID(conversation)와 토큰, 진행 상황(node_start, token, agent, progress)을 보낸 뒤 최종 응답을 answer 이벤트로 보냅니다.
+    """
+    data = await request.json()
+    question = data.get('message')
+
+    if not question:
+        return JSONResponse({'error': '메시지를 입력해주세요.'}, status_code=400)
+
+    conversation_id, history = await run_in_threadpool(
+        conversation_store.resolve, data.get('conversation_id'), data.get('history')
+    )
+    state = build_initial_state(question, history, conversation_id)
+
+    async def generate():
+        yield format_sse('conversation', {'conversation_id': conversation_id})
+        async for event, payload in graph_stream_async(state, thread_id=conversation_id):
+            if event == 'answer':
+                await run_in_threadpool(conversation_store.record_turn, conversation_id, question, payload['text'], history)
+            yield format_sse(event, payload)
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@router.post('/chatbot/batch')
+async def chatbot_batch_route(request: Request):
+    """
+    app.py 의 /chatbot/batch 와 같은 형식으로 여러 대화를 한 번에 처리하는 비동기 라우트입니다.
+    stream 이 true 이면 끝나는 순서대로 한 줄에 하나씩 {"index", ...} JSON 을 보냅니다 (application/x-ndjson).
+    """
+    data = await request.json()
+    conversations = data.get('conversations')
+
+    if not isinstance(conversations, list) or not conversations:
+        return JSONResponse({'error': '대화 목록을 입력해주세요.'}, status_code=400)
+    if len(conversations) > BATCH_MAX_SIZE:
+        return JSONResponse({'error': f'한 번에 최대 {BATCH_MAX_SIZE}개의 대화를 처리할 수 있습니다.'}, status_code=400)
+
+    # 동시 실행 수는 서버 설정(BATCH_CONCURRENCY)보다 낮게만 지정할 수 있음
+    concurrency = data.get('concurrency')
+    if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+        return JSONResponse({'error': 'concurrency 는 1 이상의 정수여야 합니다.'}, status_code=400)
+    concurrency = min(concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)
+
+    # 메시지가 없는 대화는 실행하지 않고 오류로 응답
+    results = [None] * len(conversations)
+    jobs = []
+    for index, item in enumerate(conversations):
+        question = item.get('message') if isinstance(item, dict) else None
+        if not question:
+            results[index] = {'error': '메시지를 입력해주세요.'}
+            continue
+        conversation_id, history = await run_in_threadpool(
+            conversation_store.resolve, item.get('conversation_id'), item.get('history')
+        )
+        jobs.append((index, question, conversation_id, history))
+
+    async def run():
+        """(요청 안에서의 위치, 결과) 를 끝나는 순서대로 돌려줍니다."""
+        states = [build_initial_state(question, history, conversation_id) for _, question, conversation_id, history in jobs]
+        completed = graph_batch_iter_async(
+            states,
+            thread_ids=[conversation_id for _, _, conversation_id, _ in jobs],
+            use_cache=data.get('cache', True),
+            max_concurrency=concurrency,
+        )
+        async for position, result in completed:
+            index, question, conversation_id, history = jobs[position]
+            if 'error' in result:
+                yield index, {'error': '죄송하지만, 답변을 생성할 수 없습니다.', 'conversation_id': conversation_id}
+                continue
+            final_response = result.get('generation', result.get('response', '죄송하지만, 답변을 생성할 수 없습니다.'))
+            await run_in_threadpool(conversation_store.record_turn, conversation_id, question, final_response, history)
+            yield index, {'llm': final_response, 'conversation_id': conversation_id}
+
+    if data.get('stream'):
+        async def generate():
+            for index, result in enumerate(results):
+                if result is not None:
+                    yield json.dumps({'index': index, **result}, ensure_ascii=False) + '\n'
+            async for index, result in run():
+                yield json.dumps({'index': index, **result}, ensure_ascii=False) + '\n'
+
+        return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+    async for index, result in run():
+        results[index] = result
+    return JSONResponse({'results': results})
+
+
+def create_app(warm: Optional[bool] = None) -> FastAPI:
+    """
+    비동기(ASGI) 애플리케이션을 생성합니다.
+    warm 이 True 이면 서버가 요청을 받기 전(lifespan 시작 시)에 그래프, 에이전트, 연결 풀 등을 미리 준비합니다.
+
+    Args:
+        warm (bool, optional): 미리 준비할지 여부 (기본값은 WARM_UP 환경 변수, 켜짐)
+
+    Returns:
+        FastAPI: 애플리케이션
+    """
+    configure_logging()
+    # 저장소에 없는 대화는 그래프 체크포인트에서 복원
+    conversation_store.fallback_loader = load_checkpointed_history
+    warm = warm_up_enabled() if warm is None else warm
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """서버 시작 시 구성 요소를 미리 준비하고 세션 정리를 시작하며, 종료 시 정리를 멈추고 HTTP 연결 풀을 닫습니다."""
+        if warm:
+            await run_in_threadpool(warm_up)
+        session_backend.start_compaction(COMPACT_INTERVAL)
+        yield
+        await run_in_threadpool(session_backend.stop_compaction)
+        await close_async_http_client()
+
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    app.middleware('http')(request_metrics)
+    app.add_exception_handler(QueueFullError, queue_full)
+    app.include_router(router)
+    return app
+
+
+# 실행: uvicorn asgi:app --host 0.0.0.0 --port 8000 (또는 uvicorn --factory asgi:create_app)
+app = create_app()
@@ -0,0 +1,93 @@
+"""
+워커 시작 비용을 측정하는 벤치마크입니다.
+매 측정마다 새 파이썬 프로세스를 띄워 다음을 잽니다.
+
+- utils.graph 임포트 시간 (API 키 없이도 임포트되는지 함께 확인)
+- 미리 준비(warm_up) 단계별 시간
+- 준비하지 않은 워커와 준비한 워커에서 첫 요청이 구성 요소를 만드는 데 쓰는 시간
+- 예전처럼 임포트 시 에이전트를 만들던 방식의 임포트 시간 (임포트 + 에이전트 생성)
+
+네트워크 호출은 하지 않습니다.
+
+실행 방법:
+    python benchmarks/bench_cold_start.py [반복 횟수]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 각 측정을 실행하는 자식 프로세스 코드 (결과를 JSON 한 줄로 출력)
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import utils.graph
+result = {{"import": time.perf_counter() - started}}
+if {warm!r}:
+    from utils.startup import warm_up
+    result["warm_up"] = warm_up(connect=False)
+    result["warm_up_total"] = time.perf_counter() - started - result["import"]
+if {first_request!r}:
+    from utils.chatbot_system import get_agent_executor
+    from utils.memory.history import count_tokens
+    from utils.optimization import get_optimizer
+    started = time.perf_counter()
+    get_agent_executor(); get_optimizer(); count_tokens("첫 요청")
+    result["first_request_setup"] = time.perf_counter() - started
+print(json.dumps(result))
+"""
+
+
+def run_child(env: dict, warm: bool = False, first_request: bool = False) -> dict:
+    """새 프로세스에서 측정 코드를 실행하고 결과를 반환합니다."""
+    code = CHILD.format(root=ROOT, warm=warm, first_request=first_request)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def median(runs: list, key: str) -> float:
+    """여러 실행 결과에서 key 값의 중앙값(밀리초)을 반환합니다."""
+    return statistics.median(run[key] for run in runs) * 1000
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    workdir = tempfile.mkdtemp()
+    base_env = {
+        **os.environ,
+        "WARM_UP": "0",
+        "LOG_LEVEL": "WARNING",
+        "CHECKPOINT_DB": os.path.join(workdir, "checkpoints.sqlite"),
+        "BOOK_CATALOG_PATH": os.path.join(workdir, "book_catalog.sqlite"),
+        "TOOL_CACHE_PATH": os.path.join(workdir, "tool_cache.sqlite"),
+    }
+    # 임포트는 API 키 없이도 되어야 함
+    no_keys = {k: v for k, v in base_env.items() if k not in ("OPENAI_API_KEY", "TAVILY_API_KEY", "NAVER_CLIENT_ID", "NAVER_CLIENT_SECRET")}
+    # 구성 요소 생성에는 키가 필요함 (네트워크 호출은 하지 않음)
+    with_keys = {
+        **base_env,
+        "OPENAI_API_KEY": "sk-benchmark", "TAVILY_API_KEY": "tvly-benchmark",
+        "NAVER_CLIENT_ID": "benchmark", "NAVER_CLIENT_SECRET": "benchmark",
+    }
+
+    import_runs = [run_child(no_keys) for _ in range(iterations)]
+    cold_runs = [run_child(with_keys, first_request=True) for _ in range(iterations)]
+    warm_runs = [run_child(with_keys, warm=True, first_request=True) for _ in range(iterations)]
+
+    print(f"utils.graph 임포트 (API 키 없음): {median(import_runs, 'import'):8.1f} ms")
+    print(f"예전 방식 임포트 (임포트 + 에이전트 생성): "
+          f"{statistics.median(run['import'] + run['warm_up'].get('agent', 0) for run in warm_runs) * 1000:8.1f} ms")
+    print(f"미리 준비 (warm_up) 전체: {median(warm_runs, 'warm_up_total'):8.1f} ms")
+    for step in warm_runs[0]["warm_up"]:
+        print(f"  - {step:<14} {statistics.median(run['warm_up'][step] for run in warm_runs) * 1000:8.1f} ms")
+    print(f"첫 요청의 구성 요소 생성 (준비 안 함): {median(cold_runs, 'first_request_setup'):8.1f} ms")
+    print(f"첫 요청의 구성 요소 생성 (준비함): {median(warm_runs, 'first_request_setup'):8.3f} ms")
@@ -0,0 +1,50 @@
+"""
+요청마다 그래프를 새로 컴파일하던 방식과 레지스트리에서 재사용하는 방식의
+그래프 준비 비용을 비교하는 벤치마크입니다.
+
+실행 방법:
+    python benchmarks/bench_graph_setup.py [반복 횟수]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 모듈 임포트 시 필요한 키 (네트워크 호출은 하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+os.environ.setdefault("NAVER_CLIENT_ID", "benchmark")
+os.environ.setdefault("NAVER_CLIENT_SECRET", "benchmark")
+
+from utils.graph import build_workflow, get_graph, graph_registry  # noqa: E402
+
+
+def per_request_compile() -> None:
+    """기존 방식: 요청마다 StateGraph를 정의하고 컴파일합니다."""
+    build_workflow().compile()
+
+
+def registry_lookup() -> None:
+    """개선된 방식: 컴파일된 그래프를 레지스트리에서 가져옵니다."""
+    get_graph("default")
+
+
+def measure(func, iterations: int) -> float:
+    """함수의 1회 평균 실행 시간(마이크로초)을 반환합니다."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    graph_registry.warm_up()
+
+    before = measure(per_request_compile, iterations)
+    after = measure(registry_lookup, iterations * 100)
+
+    print(f"요청당 컴파일 (기존): {before:10.1f} us")
+    print(f"레지스트리 조회 (개선): {after:10.3f} us")
+    print(f"속도 향상: {before / after:,.0f}x")
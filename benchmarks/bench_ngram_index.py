@@ -0,0 +1,113 @@
+"""
+합성 도서 카탈로그에서 음절 n-gram 색인의 유사 제목 검색 성능을 측정하는 벤치마크입니다.
+
+띄어쓰기 제거, 문장 부호 추가, 부제 추가, 글자 하나 바꾸기 등으로 변형한 제목을 검색하여
+색인 구축 시간, 검색 지연 시간(p50/p99), 1순위 정답률을 출력합니다.
+네이버 조회 결과를 카탈로그에 넣은 직후 검색하는 경우처럼, 책 몇 권을 추가한 직후의 검색 시간도 잽니다.
+
+실행 방법:
+    python benchmarks/bench_ngram_index.py [카탈로그 크기] [검색 횟수]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ngram_index import NgramIndex  # noqa: E402
+
+# 제목을 만들 때 쓰는 실제 단어들
+COMMON_WORDS = (
+    "살인자", "기억법", "채식주의자", "소년", "온다", "바다", "달빛", "고양이", "여름", "겨울",
+    "도시", "별", "우리", "사랑", "시간", "여행", "마음", "밤", "편지", "정원", "나무", "바람",
+    "이야기", "꿈", "그림자", "숲", "거리", "서점", "기차", "섬", "구름", "노래", "강", "빛",
+    "하늘", "아침", "작은", "오래된", "푸른", "검은", "마지막", "처음", "잃어버린", "조용한",
+)
+SUBTITLES = ("개정판", "특별판", "양장", "리커버", "큰글씨책")
+# 임의 단어를 만들 때 쓰는 음절
+SYLLABLES = "가각간갈감강개거건결경고곡공과관광교구국군권귀그극근글기길김나날남내너널노녹누눈느늘다단달담당대더도독동두드들등디라락란람래러려력로록료루류르른리린림마만말맘매머먼멀메며면명모목몽무문물미민바박반발방배백버번벌범법벽변별병보복본봄부북분불비빈빛사산살삼상새색생서석선설섬성세소속손솔송수숙순술숲스슬시식신실심아악안알암앙애야약양어언얼엄여역연열염영예오옥온올옹와왕외요용우운울움원월위유육윤은을음의이인일임입자작잔장재저적전절점정제조족존종주죽준중지진질집차착찬창채책처천철청초촌추춘출충치친칠카커코쿠타탄탑태터토통투트파판패펴평포표푸풀품프피필하학한할함합항해행향허헌현혈형호혼홍화확환활황회효후훈휘흐흑흔흥희흰힘"
+
+
+def synthetic_words(count: int, rng: random.Random) -> list:
+    """실제 단어와 2~3음절 임의 단어를 섞은 어휘를 만듭니다."""
+    words = set(COMMON_WORDS)
+    while len(words) < count:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))))
+    return list(words)
+
+
+def synthetic_titles(count: int, rng: random.Random) -> list:
+    """2~4개의 단어와 선택적인 숫자로 서로 다른 제목을 만듭니다."""
+    vocabulary = synthetic_words(max(len(COMMON_WORDS), count // 20), rng)
+    titles = set()
+    while len(titles) < count:
+        words = rng.sample(vocabulary, rng.randint(2, 4))
+        title = " ".join(words)
+        if rng.random() < 0.5:
+            title += f" {rng.randint(1, 999)}"
+        titles.add(title)
+    return list(titles)
+
+
+def perturb(title: str, rng: random.Random) -> str:
+    """LLM 이 만들 법한 작은 차이를 제목에 넣습니다."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return title.replace(" ", "")
+    if kind == 1:
+        return f"'{title}'"
+    if kind == 2:
+        return f"{title} ({rng.choice(SUBTITLES)})"
+    chars = list(title)
+    positions = [i for i, c in enumerate(chars) if c != " "]
+    chars[rng.choice(positions)] = rng.choice("가나다라마바사아자차카타파하")
+    return "".join(chars)
+
+
+def percentile(values: list, ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = random.Random(42)
+
+    titles = synthetic_titles(size, rng)
+    index = NgramIndex()
+    start = time.perf_counter()
+    for i, title in enumerate(titles):
+        index.add(str(i), title)
+    index.search(titles[0])  # posting list 배열 변환 포함
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    correct = 0
+    for _ in range(queries):
+        target = rng.randrange(size)
+        query = perturb(titles[target], rng)
+        start = time.perf_counter()
+        results = index.search(query, limit=1, min_similarity=0.5)
+        latencies.append((time.perf_counter() - start) * 1e3)
+        correct += bool(results) and results[0][0] == str(target)
+
+    # 네이버 응답(최대 10권)을 추가한 직후의 검색 (추가 시간 포함)
+    after_add = []
+    extra = synthetic_titles(queries * 10, rng)
+    for i in range(queries):
+        batch = extra[i * 10:(i + 1) * 10]
+        start = time.perf_counter()
+        for j, title in enumerate(batch):
+            index.add(f"new-{i}-{j}", title)
+        index.search(perturb(batch[0], rng), limit=1, min_similarity=0.5)
+        after_add.append((time.perf_counter() - start) * 1e3)
+
+    print(f"카탈로그 크기: {size:,}권, 검색 횟수: {queries:,}")
+    print(f"색인 구축: {build_seconds:8.2f} s")
+    print(f"검색 p50:  {percentile(latencies, 0.50):8.3f} ms")
+    print(f"검색 p99:  {percentile(latencies, 0.99):8.3f} ms")
+    print(f"10권 추가 후 검색 p50: {percentile(after_add, 0.50):8.3f} ms")
+    print(f"10권 추가 후 검색 p99: {percentile(after_add, 0.99):8.3f} ms")
+    print(f"1순위 정답률: {correct / queries:6.1%}")
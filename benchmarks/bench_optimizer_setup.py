@@ -0,0 +1,82 @@
+"""
+요청마다 Optimization 을 새로 만들던 방식과 공유 인스턴스를 쓰는 방식의
+요청당 준비 비용(시간, 메모리 할당)을 비교하는 벤치마크입니다.
+LLM 호출 직전까지(프롬프트 메시지 생성)만 측정하며 네트워크 호출은 하지 않습니다.
+
+실행 방법:
+    python benchmarks/bench_optimizer_setup.py [반복 횟수]
+"""
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 모듈 임포트 시 필요한 키 (네트워크 호출은 하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+os.environ.setdefault("NAVER_CLIENT_ID", "benchmark")
+os.environ.setdefault("NAVER_CLIENT_SECRET", "benchmark")
+
+from langchain_community.chat_models import ChatOpenAI  # noqa: E402
+from langchain.prompts import ChatPromptTemplate  # noqa: E402
+
+from utils.optimization import OPTIMIZATION_SYSTEM_PROMPT, Optimization, get_optimizer  # noqa: E402
+
+HISTORY = [
+    {"role": "user", "content": "로맨스 소설 추천해줘."},
+    {"role": "assistant", "content": "'사랑의 온도', '별의 계절', '마지막 편지' 등이 있습니다. 어떤 책이 궁금하신가요?"},
+]
+QUESTION = "책 제목: '너무 한낮의 연애'<br>작가: 김금희<br>추천 이유: 따뜻한 감정을 섬세하게 그립니다."
+INSTRUCTIONS = "응답이 친근하고 환영하는 느낌이 들도록 해주세요."
+
+
+def per_request_optimizer() -> list:
+    """기존 방식: 요청마다 환경 변수 확인, 프롬프트 문자열, LLM 클라이언트, 템플릿을 새로 만듭니다."""
+    os.getenv("NAVER_CLIENT_ID"), os.getenv("NAVER_CLIENT_SECRET")
+    os.getenv("NAVER_BOOK_API_URL"), os.getenv("NAVER_TIMEOUT", "3")
+    system_prompt = "".join([OPTIMIZATION_SYSTEM_PROMPT])
+    messages = [("system", system_prompt)] + Optimization.history_messages(HISTORY)
+    ChatOpenAI(model="chatgpt-4o-latest", temperature=0.7, streaming=True)
+    prompt = ChatPromptTemplate.from_messages(messages + [("human", f"{QUESTION}\n\n{INSTRUCTIONS}")])
+    return prompt.format_prompt(num_books=1).to_messages()
+
+
+def shared_optimizer() -> list:
+    """개선된 방식: 공유 인스턴스와 미리 컴파일한 템플릿을 사용합니다."""
+    return get_optimizer().build_prompt_messages(QUESTION, 1, HISTORY, INSTRUCTIONS)
+
+
+def measure(func, iterations: int) -> tuple:
+    """함수의 1회 평균 실행 시간(마이크로초)과 1회 평균 최대 할당량(KiB)을 반환합니다."""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - start) / iterations * 1e6
+
+    tracemalloc.start()
+    peaks = 0
+    for _ in range(iterations):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peaks += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, peaks / iterations / 1024
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    # 디버그 로그 출력 비용은 제외
+    logging.disable(logging.DEBUG)
+    assert [m.content for m in per_request_optimizer()] == [m.content for m in shared_optimizer()]
+
+    before_time, before_memory = measure(per_request_optimizer, iterations)
+    after_time, after_memory = measure(shared_optimizer, iterations)
+
+    print(f"요청당 생성 (기존): {before_time:10.1f} us, {before_memory:8.1f} KiB 할당")
+    print(f"공유 인스턴스 (개선): {after_time:10.1f} us, {after_memory:8.1f} KiB 할당")
+    print(f"속도 향상: {before_time / after_time:,.1f}x")
@@ -0,0 +1,141 @@
+"""
+최종 응답(책 카드) 렌더링의 기존 구현과 utils.render 렌더러를 비교하는 벤치마크입니다.
+benchmarks/fixtures.py 의 응답과 검색 결과로 응답 크기별 1회 처리 시간을 측정합니다. 네트워크나 LLM 호출은 하지 않습니다.
+두 구현의 출력이 바이트 단위로 같은지는 tests/test_render.py 에서 확인합니다.
+
+- 재작성: rewrite_response 후 항목 줄 제거 (기존) / body_lines 한 번 훑기 (개선)
+- 카드 생성: insert_book_info (기존) / render, ISBN 별 조각을 매번 비운 경우와 재사용하는 경우 (개선)
+
+실행 방법:
+    python benchmarks/bench_render.py [최소 측정 시간(초)]
+"""
+import os
+import re
+import sys
+import tempfile
+import timeit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 설명이 비어 있는 책을 보완할 때 실제 카탈로그 파일을 건드리지 않도록 임시 경로 사용
+os.environ.setdefault("BOOK_CATALOG_PATH", os.path.join(tempfile.mkdtemp(), "catalog.sqlite"))
+
+import fixtures  # noqa: E402
+from utils.catalog import book_catalog  # noqa: E402
+from utils.render import BookCardRenderer  # noqa: E402
+
+
+# ---- 기존 구현 (Optimization 의 메서드를 그대로 옮김) ----
+
+def legacy_rewrite_response(text: str, valid_titles: list) -> str:
+    lines = text.split('\n')
+    new_lines = []
+    for line in lines:
+        title_in_line = re.findall(r"'([^']+)'", line)
+        if not title_in_line or title_in_line[0] in valid_titles:
+            new_lines.append(line)
+    return '\n'.join(new_lines)
+
+
+def legacy_strip_fields(text: str) -> str:
+    for key in ['책 제목', '작가', '출판사', '추천 이유']:
+        text = re.sub(f"^{key}:.*$", '', text, flags=re.MULTILINE)
+    return text
+
+
+def legacy_format_author_names(author_str: str) -> str:
+    authors = [a.strip() for a in author_str.split(',')]
+    return ', '.join(authors)
+
+
+def legacy_summarize_text(text: str, num_sentences: int) -> str:
+    if not text:
+        return "상세한 내용은 링크를 참고해주세요."
+    sentences = re.split(r'(?<=[.!?]) +', text)
+    return ' '.join(sentences[:num_sentences])
+
+
+def legacy_generate_purchase_links(title: str, isbn: str) -> str:
+    isbn_num = isbn.split(' ')[1] if ' ' in isbn else isbn
+    isbn_num = isbn_num.strip()
+    encoded_title = requests.utils.quote(title)
+    yes24_link = f"<a href='https://www.yes24.com/Product/Search?query={encoded_title}' target='_blank'>예스24</a>"
+    aladin_link = f"<a href='https://www.aladin.co.kr/search/wsearchresult.aspx?SearchTarget=All&SearchWord={encoded_title}' target='_blank'>알라딘</a>"
+    kyobo_link = f"<a href='https://search.kyobobook.co.kr/search?keyword={encoded_title}' target='_blank'>교보문고</a>"
+    return f"- {yes24_link}<br>- {aladin_link}<br>- {kyobo_link}"
+
+
+def legacy_insert_book_info(text: str, book_info_list: list) -> str:
+    text = legacy_strip_fields(text)
+    book_details_list = []
+    for book_info in book_info_list:
+        if not book_info.get("description"):
+            catalog_entry = book_catalog.get(book_info.get("isbn", ""))
+            if catalog_entry:
+                book_info = {**catalog_entry, **{k: v for k, v in book_info.items() if v}}
+        title = re.sub('<[^<]+?>', '', book_info['title']).split('(')[0].strip()
+        author = legacy_format_author_names(book_info['author'])
+        publisher = book_info.get("publisher", "출판사 정보 없음")
+        description = book_info.get("description", "상세 설명을 찾을 수 없습니다.")
+        summary = legacy_summarize_text(description, 3)
+        purchase_links = legacy_generate_purchase_links(title, book_info.get('isbn', ''))
+        book_details_list.append(
+            f"책 제목: '{title}' <br>"
+            f"작가: {author} <br>"
+            f"출판사: {publisher} <br>"
+            f"추천 이유: {summary} <br>"
+            f"구매 링크:<br> {purchase_links} "
+        )
+    return f"{'<br><br>'.join(book_details_list)}<br>즐거운 독서 되세요!"
+
+
+# ---- 비교 ----
+
+def edge_cases() -> list:
+    """빈 설명, 빠진 출판사/설명 키, 괄호와 태그가 있는 제목, ISBN 없는 책, 특수 문자 등 경계 사례입니다."""
+    return [
+        {"title": "<b>달러구트</b> 꿈 백화점 (양장)", "author": " 이미예 , 김작가 ", "publisher": "", "description": "", "isbn": ""},
+        {"title": "Fish & Chips? 100% {진짜}", "author": "A", "isbn": "123"},
+        {"title": "소년이 온다", "author": "한강", "publisher": "창비", "description": "첫 문장.  두 번째!   세 번째? 네 번째.", "isbn": "89 978"},
+        {"title": "소년이 온다", "author": "한강", "publisher": "창비", "description": "설명이 바뀐 같은 ISBN.", "isbn": "89 978"},
+    ]
+
+
+def measure(func, min_time: float) -> float:
+    """함수의 1회 평균 실행 시간(마이크로초)을 반환합니다. (5회 측정 중 가장 빠른 값)"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+if __name__ == "__main__":
+    min_time = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    renderer = BookCardRenderer()
+
+    def render_cold(items):
+        renderer.clear()
+        return renderer.render(items)
+
+    print(f"{'케이스':24s} {'기존':>12s} {'개선':>12s} {'향상':>8s}")
+    for size, num_books in fixtures.SIZES.items():
+        text = fixtures.llm_response(num_books)
+        valid = re.findall(r"'([^']+)'", text)[::2]
+        items = fixtures.naver_items(num_books)
+        renderer.render(items)
+        rows = [
+            (f"재작성[{size}]",
+             lambda: legacy_strip_fields(legacy_rewrite_response(text, valid)),
+             lambda: renderer.body_lines(text, valid)),
+            (f"카드 생성[{size}]",
+             lambda: legacy_insert_book_info(text, items),
+             lambda: render_cold(items)),
+            (f"카드 생성 재사용[{size}]",
+             lambda: legacy_insert_book_info(text, items),
+             lambda: renderer.render(items)),
+        ]
+        for name, legacy, current in rows:
+            before, after = measure(legacy, min_time), measure(current, min_time)
+            print(f"{name:24s} {before:10.1f}us {after:10.1f}us {before / after:7.1f}x")
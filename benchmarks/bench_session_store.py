@@ -0,0 +1,101 @@
+"""
+세션 저장소의 조회/저장 시간과 정리(compact) 시간을 저장 방식별로 비교하는 벤치마크입니다.
+임시 디렉토리에 대화 N개를 만든 뒤 무작위 조회와 덮어쓰기의 평균 시간을 잽니다.
+
+- flat: 예전 ConversationStore 처럼 한 디렉토리에 대화별 JSON 파일
+- file: ShardedFileBackend (키 앞 두 글자로 나눈 하위 디렉토리)
+- sqlite: SQLiteSessionBackend (파일 하나)
+
+실행 방법:
+    python benchmarks/bench_session_store.py [대화 수]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 벤치마크용 저장소가 실제 flask_session/ 을 정리하지 않도록 함
+os.environ["SESSION_LEGACY_DIR"] = ""
+os.environ.setdefault("SESSION_DIR", tempfile.mkdtemp())
+
+from utils.memory.session_backend import ShardedFileBackend, SQLiteSessionBackend  # noqa: E402
+
+LOOKUPS = 2000
+
+
+class FlatStore:
+    """예전 ConversationStore 의 디스크 저장 방식 (비교용)"""
+    name = "flat"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str):
+        try:
+            with open(os.path.join(self.directory, f"{key}.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value) -> None:
+        path = os.path.join(self.directory, f"{key}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({**value, "updated_at": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def conversation(turns: int = 4) -> dict:
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"추리 소설 추천해줘 {i}"})
+        messages.append({"role": "assistant", "content": "책 제목: '살인자의 기억법' <br>작가: 김영하 " * 5})
+    return {"messages": messages}
+
+
+def timed(func, keys) -> float:
+    """keys 마다 func 를 호출한 평균 시간(마이크로초)을 반환합니다."""
+    started = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - started) / len(keys) * 1e6
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workdir = tempfile.mkdtemp()
+    value = conversation()
+    keys = [uuid.uuid4().hex for _ in range(count)]
+    rng = random.Random(0)
+    sample = [rng.choice(keys) for _ in range(LOOKUPS)]
+    missing = [uuid.uuid4().hex for _ in range(LOOKUPS)]
+
+    stores = [
+        FlatStore(os.path.join(workdir, "flat")),
+        ShardedFileBackend(os.path.join(workdir, "sharded"), max_entries=0, max_bytes=0),
+        SQLiteSessionBackend(os.path.join(workdir, "sessions.sqlite"), max_entries=0, max_bytes=0),
+    ]
+    print(f"대화 {count:,}개, 조회 {LOOKUPS:,}회")
+    print(f"{'저장소':8s} {'채우기':>10s} {'조회':>10s} {'없는 키':>10s} {'덮어쓰기':>10s} {'정리':>10s}")
+    for store in stores:
+        started = time.perf_counter()
+        for key in keys:
+            store.set(key, value)
+        fill = time.perf_counter() - started
+        # 서버에서는 시작 직후 한 번 정리하므로 정리한 뒤의 조회 시간을 잼
+        compact = "-"
+        if hasattr(store, "compact"):
+            started = time.perf_counter()
+            store.compact()
+            compact = f"{(time.perf_counter() - started) * 1000:8.0f}ms"
+        hit = timed(store.get, sample)
+        miss = timed(store.get, missing)
+        write = timed(lambda key: store.set(key, value), sample[:500])
+        print(f"{store.name:8s} {fill:9.2f}s {hit:8.1f}us {miss:8.1f}us {write:8.1f}us {compact:>10s}")
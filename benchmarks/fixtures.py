@@ -0,0 +1,87 @@
+"""
+마이크로 벤치마크에서 사용하는 한국어 응답/검색 결과 데이터입니다.
+같은 seed 로 항상 같은 데이터를 만들므로 측정 결과를 기준값과 비교할 수 있습니다.
+"""
+import random
+
+# 응답 크기별 책 수
+SIZES = {"small": 1, "medium": 5, "large": 50, "xlarge": 500}
+
+BOOKS = (
+    ("살인자의 기억법", "김영하", "문학동네"),
+    ("채식주의자", "한강", "창비"),
+    ("소년이 온다", "한강", "창비"),
+    ("너무 한낮의 연애", "김금희", "문학동네"),
+    ("82년생 김지영", "조남주", "민음사"),
+    ("아몬드", "손원평", "창비"),
+    ("불편한 편의점", "김호연", "나무옆의자"),
+    ("달러구트 꿈 백화점", "이미예", "팩토리나인"),
+    ("구의 증명", "최진영", "은행나무"),
+    ("작별하지 않는다", "한강", "문학동네"),
+)
+
+SENTENCES = (
+    "이 소설은 독특한 구성과 깊이 있는 캐릭터 분석으로 독자들에게 강렬한 인상을 남깁니다.",
+    "사랑과 인간관계에 대한 섬세한 통찰을 제공하며, 감동적인 이야기가 돋보입니다!",
+    "일상 속에서 느낄 수 있는 따뜻한 감정을 섬세하게 그려냅니다.",
+    "읽는 내내 마음이 먹먹해지는 경험을 하게 될 거예요.",
+    "한국 문학의 새로운 가능성을 보여준 작품으로 평가받습니다?",
+)
+
+
+def _book(index: int) -> tuple:
+    title, author, publisher = BOOKS[index % len(BOOKS)]
+    if index >= len(BOOKS):
+        title = f"{title} {index // len(BOOKS)}"
+    return title, author, publisher
+
+
+def llm_response(num_books: int, seed: int = 0) -> str:
+    """최적화 단계 LLM 이 돌려주는 형식의 응답을 만듭니다."""
+    rng = random.Random(seed)
+    blocks = ["요청하신 책을 추천드립니다."]
+    for index in range(num_books):
+        title, author, publisher = _book(index)
+        reason = " ".join(rng.sample(SENTENCES, 2))
+        blocks.append(
+            f"책 제목: '{title}'\n작가: {author}\n출판사: {publisher}\n추천 이유: {reason}\n"
+        )
+    blocks.append("즐거운 독서 되세요!")
+    return "\n".join(blocks)
+
+
+def agent_response(num_books: int, seed: int = 0) -> str:
+    """챗봇 단계 에이전트가 돌려주는 형식(<br> 구분)의 응답을 만듭니다."""
+    rng = random.Random(seed)
+    parts = []
+    for index in range(num_books):
+        title, author, publisher = _book(index)
+        parts.append(
+            f"<br>책 제목: '{title}'<br>작가: '{author}'<br>출판사: '{publisher}'<br>추천 이유: {rng.choice(SENTENCES)}"
+        )
+    return "두 권을 추천드립니다. 더 마음에 드는 책을 고르시면 됩니다.<br>" + "<br>".join(parts)
+
+
+def naver_items(num_books: int, seed: int = 0) -> list:
+    """네이버 책 검색 API items 형식의 검색 결과를 만듭니다."""
+    rng = random.Random(seed)
+    items = []
+    for index in range(num_books):
+        title, author, publisher = _book(index)
+        if rng.random() < 0.3:
+            title = f"The <b>{title}</b> (English Edition)"
+            publisher = "Penguin Books"
+        items.append({
+            "title": title,
+            "author": f"{author}^{author}" if rng.random() < 0.2 else author,
+            "publisher": publisher,
+            "description": " ".join(rng.choice(SENTENCES) for _ in range(5)),
+            "isbn": f"{8900000000 + index} {9788900000000 + index}",
+        })
+    return items
+
+
+def description(num_sentences: int, seed: int = 0) -> str:
+    """책 설명(여러 문장)을 만듭니다."""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(SENTENCES) for _ in range(num_sentences))
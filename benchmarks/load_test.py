@@ -0,0 +1,102 @@
+"""
+Flask(/chatbot)와 ASGI(/chatbot) 서빙 경로의 동시 처리 능력을 비교하는 부하 테스트입니다.
+
+각 동시성 단계마다 지정한 시간 동안 요청을 계속 보내고 처리량, 지연 시간, 오류 수를 출력합니다.
+
+실행 예시:
+    flask run --port 5000 --with-threads
+    uvicorn asgi:app --port 8000
+    python benchmarks/load_test.py \\
+        --target flask=http://127.0.0.1:5000/chatbot \\
+        --target asgi=http://127.0.0.1:8000/chatbot \\
+        --concurrency 10 50 100 200 --duration 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_MESSAGES = [
+    "김영하 작가 책 추천해줘",
+    "잠자기 전에 읽을만한 소설 추천해줘",
+    "너무 한낮의 연애를 읽고 싶어.",
+    "요즘 읽을만한 에세이 있어?",
+]
+
+
+async def run_stage(url: str, concurrency: int, duration: float, timeout: float) -> dict:
+    """
+    주어진 동시성으로 duration 초 동안 요청을 보내고 결과를 집계합니다.
+
+    Args:
+        url (str): /chatbot 주소
+        concurrency (int): 동시에 유지할 대화 수
+        duration (float): 측정 시간(초)
+        timeout (float): 요청 제한 시간(초)
+
+    Returns:
+        dict: 처리량과 지연 시간 통계
+    """
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        async def worker(worker_id: int):
+            nonlocal errors
+            count = 0
+            while time.perf_counter() < deadline:
+                message = DEFAULT_MESSAGES[(worker_id + count) % len(DEFAULT_MESSAGES)]
+                count += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json={"message": message, "history": []})
+                    response.raise_for_status()
+                    response.json()["llm"]
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return float("nan")
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "completed": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "mean": statistics.fmean(latencies) if latencies else float("nan"),
+    }
+
+
+async def main(args):
+    print(f"{'target':<8} {'conc':>5} {'done':>6} {'err':>5} {'rps':>8} {'p50(s)':>8} {'p95(s)':>8}")
+    for target in args.target:
+        name, url = target.split("=", 1)
+        for concurrency in args.concurrency:
+            result = await run_stage(url, concurrency, args.duration, args.timeout)
+            print(
+                f"{name:<8} {concurrency:>5} {result['completed']:>6} {result['errors']:>5} "
+                f"{result['rps']:>8.2f} {result['p50']:>8.2f} {result['p95']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/chatbot 서빙 경로 부하 테스트")
+    parser.add_argument("--target", action="append", required=True, help="이름=URL 형식, 여러 번 지정 가능")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(main(parser.parse_args()))
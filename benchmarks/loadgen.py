@@ -0,0 +1,154 @@
+"""
+/chatbot 엔드포인트에 목표 RPS 로 요청을 보내고, 전체 및 그래프 노드별 지연 시간 분포를 출력하는
+부하 생성기입니다. 노드별 시간은 응답의 Server-Timing 헤더에서 읽습니다.
+
+요청은 응답을 기다리지 않고 일정한 간격으로 보내므로(open-loop), 서버가 느려져도 부하가 줄지 않습니다.
+동시에 처리 중인 요청이 --max-inflight 를 넘으면 그 요청은 보내지 않고 dropped 로 셉니다.
+
+OpenAI/Tavily/네이버 비용 없이 측정하려면 먼저 실제 호출을 기록한 뒤 재생 모드로 서버를 띄웁니다:
+    REPLAY_MODE=record python app.py                       # 질문 목록을 한 번 보내 cassettes/ 에 기록
+    python benchmarks/loadgen.py --rps 1 --duration 30 --no-cache
+    REPLAY_MODE=replay REPLAY_LATENCY_LLM=lognormal:900,0.4 python app.py
+    python benchmarks/loadgen.py --rps 20 --duration 60 --no-cache
+
+실행 방법:
+    python benchmarks/loadgen.py [--url URL] [--rps N] [--duration 초] [--questions 파일] [--no-cache]
+"""
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_QUESTIONS = [
+    "김영하 작가의 책 추천해줘.",
+    "잠자기 전에 읽을만한 따뜻한 소설 추천해줘.",
+    "너무 한낮의 연애를 읽고 싶어.",
+    "한강 작가의 대표작이 궁금해.",
+    "요즘 인기 있는 에세이 한 권 추천해줘.",
+    "추리 소설 좋아하는데 추천해줄래?",
+]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Server-Timing 헤더 값을 {이름: 밀리초} 로 변환합니다."""
+    timings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                timings[name] = float(value)
+    return timings
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+class LoadGenerator:
+    """목표 RPS 로 요청을 보내고 결과를 모으는 클래스입니다."""
+    def __init__(self, url: str, questions: List[str], use_cache: bool, max_inflight: int, timeout: float):
+        self.url = url
+        self.questions = questions
+        self.use_cache = use_cache
+        self.max_inflight = max_inflight
+        self.client = httpx.Client(timeout=timeout, limits=httpx.Limits(max_connections=max_inflight))
+        self.executor = ThreadPoolExecutor(max_workers=max_inflight)
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+        self.dropped = 0
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def run(self, rps: float, duration: float) -> float:
+        """
+        duration 초 동안 rps 속도로 요청을 보내고, 모든 응답을 기다립니다.
+
+        Returns:
+            float: 마지막 응답까지 걸린 시간(초)
+        """
+        interval = 1.0 / rps
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            scheduled = start + sent * interval
+            if scheduled - start >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with self._lock:
+                if self._inflight >= self.max_inflight:
+                    self.dropped += 1
+                    sent += 1
+                    continue
+                self._inflight += 1
+            self.executor.submit(self._request, random.choice(self.questions))
+            sent += 1
+        self.executor.shutdown(wait=True)
+        return time.perf_counter() - start
+
+    def _request(self, question: str) -> None:
+        begin = time.perf_counter()
+        try:
+            response = self.client.post(self.url, json={"message": question, "cache": self.use_cache})
+            elapsed = (time.perf_counter() - begin) * 1000
+            with self._lock:
+                if response.status_code != 200:
+                    self.errors += 1
+                    return
+                self.timings["client"].append(elapsed)
+                for name, duration in parse_server_timing(response.headers.get("Server-Timing", "")).items():
+                    self.timings[name].append(duration)
+        except httpx.HTTPError:
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def report(self, elapsed: float) -> None:
+        completed = len(self.timings.get("client", []))
+        print(f"완료: {completed}건, 오류: {self.errors}건, 건너뜀(max-inflight 초과): {self.dropped}건")
+        print(f"처리량: {completed / elapsed:.2f} req/s ({elapsed:.1f} s)")
+        print(f"\n{'구간':14s} {'건수':>6s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s}")
+        # 클라이언트 측 전체 시간, 서버 전체 시간, 노드 순서로 출력
+        names = ["client", "total"] + sorted(name for name in self.timings if name not in ("client", "total"))
+        for name in names:
+            values = self.timings.get(name)
+            if values:
+                print(f"{name:14s} {len(values):6d} {percentile(values, 0.50):10.1f} "
+                      f"{percentile(values, 0.95):10.1f} {percentile(values, 0.99):10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000/chatbot", help="요청을 보낼 주소")
+    parser.add_argument("--rps", type=float, default=5.0, help="초당 요청 수")
+    parser.add_argument("--duration", type=float, default=30.0, help="요청을 보내는 시간(초)")
+    parser.add_argument("--questions", help="한 줄에 질문 하나씩 적은 파일 (기본: 내장 질문 목록)")
+    parser.add_argument("--no-cache", action="store_true", help="의미 기반 응답 캐시를 사용하지 않음")
+    parser.add_argument("--max-inflight", type=int, default=64, help="동시에 처리 중인 최대 요청 수")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=0, help="질문 선택 난수 시드")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions, 'r', encoding='utf-8') as f:
+            questions = [line.strip() for line in f if line.strip()]
+
+    generator = LoadGenerator(args.url, questions, not args.no_cache, args.max_inflight, args.timeout)
+    elapsed = generator.run(args.rps, args.duration)
+    generator.report(elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+판단/응답 후처리 단계의 순수 파이썬 함수들에 대한 마이크로 벤치마크입니다.
+네트워크나 LLM 호출 없이 benchmarks/fixtures.py 의 한국어 응답으로 측정합니다.
+
+케이스마다 초당 실행 횟수(ops/s)와 1회 실행 시 최대 메모리 할당량을 출력하고,
+--save 로 기준값을 저장하거나 --check 로 기준값보다 threshold 이상 느려지거나
+메모리를 더 쓰는 케이스가 있으면 실패(종료 코드 1)합니다.
+
+실행 방법:
+    python benchmarks/microbench.py                  # 측정 결과 출력
+    python benchmarks/microbench.py --save           # 기준값 저장
+    python benchmarks/microbench.py --check          # 기준값과 비교 (기본 25%)
+    python benchmarks/microbench.py --check --threshold 0.1 --filter judgement
+
+기준값은 측정한 기기에 따라 다르므로 같은 기기에서 --save 한 값과 비교해야 합니다.
+기기 부하 변화는 케이스마다 직전에 측정한 고정된 기준 작업의 속도로 보정합니다.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 모듈 임포트 시 필요한 키 (네트워크 호출은 하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+os.environ.setdefault("NAVER_CLIENT_ID", "benchmark")
+os.environ.setdefault("NAVER_CLIENT_SECRET", "benchmark")
+# 설명이 비어 있는 책을 보완할 때 실제 카탈로그 파일을 건드리지 않도록 임시 경로 사용
+os.environ.setdefault("BOOK_CATALOG_PATH", os.path.join(tempfile.mkdtemp(), "catalog.sqlite"))
+
+import fixtures  # noqa: E402
+from utils import judgement  # noqa: E402
+from utils.optimization import Optimization  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+def calibration_workload() -> int:
+    """기기 속도를 가늠하기 위한 고정된 순수 파이썬 작업입니다."""
+    text = "책 제목: '살인자의 기억법' 작가: 김영하 " * 20
+    return sum(len(part) for part in text.split(" ") if part) + sum(range(500))
+
+
+def build_cases() -> List[Tuple[str, Callable[[], object]]]:
+    """(케이스 이름, 인자 없는 함수) 리스트를 만듭니다."""
+    optimizer = Optimization(tone="친절한", style="설득력 있는")
+    cases = []
+    for size, num_books in fixtures.SIZES.items():
+        agent_text = fixtures.agent_response(num_books)
+        llm_text = fixtures.llm_response(num_books)
+        items = fixtures.naver_items(num_books)
+        titles = optimizer.extract_book_titles(llm_text)
+        valid_titles = titles[::2]
+        book_info_list = optimizer.filter_and_sort_results(items, "살인자의 기억법")
+        description = fixtures.description(num_books * 3)
+
+        cases += [
+            (f"judgement.is_about_books[{size}]", lambda t=agent_text: judgement.is_about_books(t)),
+            (f"judgement.is_about_author[{size}]", lambda t=agent_text: judgement.is_about_author(t)),
+            (f"judgement.is_about_negative[{size}]", lambda t=agent_text: judgement.is_about_negative(t)),
+            (f"extract_book_titles[{size}]", lambda t=llm_text: optimizer.extract_book_titles(t)),
+            (f"rewrite_response[{size}]", lambda t=llm_text, v=valid_titles: optimizer.rewrite_response(t, v)),
+            (f"insert_book_info[{size}]", lambda t=llm_text, b=book_info_list: optimizer.insert_book_info(t, b)),
+            (f"summarize_text[{size}]", lambda d=description: optimizer.summarize_text(d, 3)),
+            (f"filter_and_sort_results[{size}]", lambda i=items: optimizer.filter_and_sort_results(i, "살인자의 기억법")),
+            (f"contains_korean[{size}]", lambda t=agent_text: Optimization.contains_korean(t)),
+        ]
+    # 한글이 없는 긴 텍스트는 끝까지 검사하므로 최악의 경우로 따로 측정
+    english_text = "The quick brown fox jumps over the lazy dog. " * 200
+    cases.append(("contains_korean[no_korean]", lambda: Optimization.contains_korean(english_text)))
+    return cases
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    함수의 초당 실행 횟수와 1회 실행 시 최대 메모리 할당량을 측정합니다.
+
+    Args:
+        func (Callable): 측정할 함수
+        repeat (int, optional): 반복 측정 횟수 (가장 빠른 값 사용)
+        min_time (float, optional): 1회 측정의 최소 시간(초)
+
+    Returns:
+        dict: {"ops": 초당 실행 횟수, "peak_kib": 1회 최대 할당량(KiB)}
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    func()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return {"ops": 1.0 / best, "peak_kib": max(peak, 0) / 1024}
+
+
+def compare(results: Dict[str, dict], baselines: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    측정 결과를 기준값과 비교하여 성능이 떨어진 케이스 설명 리스트를 반환합니다.
+    속도는 기준 작업 대비 상대 속도(relative)로 비교하므로, 기기 부하가 달라져도 비교할 수 있습니다.
+
+    Args:
+        results (dict): 이번 측정 결과
+        baselines (dict): 저장된 기준값
+        threshold (float): 허용하는 변화 비율 (0.25 = 25%)
+
+    Returns:
+        list: 회귀 설명 문자열 리스트 (없으면 빈 리스트)
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        if result["relative"] < baseline["relative"] * (1 - threshold):
+            expected = result["ops"] * baseline["relative"] / result["relative"]
+            regressions.append(f"{name}: {expected:,.0f} (보정) -> {result['ops']:,.0f} ops/s")
+        # 아주 작은 할당량은 측정 오차가 크므로 1 KiB 여유를 둠
+        if result["peak_kib"] > baseline["peak_kib"] * (1 + threshold) + 1:
+            regressions.append(f"{name}: {baseline['peak_kib']:.1f} -> {result['peak_kib']:.1f} KiB")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", action="store_true", help="측정 결과를 기준값으로 저장")
+    parser.add_argument("--check", action="store_true", help="기준값보다 나빠진 케이스가 있으면 실패")
+    parser.add_argument("--threshold", type=float, default=0.25, help="허용하는 변화 비율 (기본 0.25)")
+    parser.add_argument("--filter", default="", help="이름에 이 문자열이 포함된 케이스만 실행")
+    parser.add_argument("--baselines", default=BASELINE_PATH, help="기준값 파일 경로")
+    args = parser.parse_args()
+
+    # 디버그 로그 출력 비용은 제외
+    logging.disable(logging.CRITICAL)
+
+    results = {}
+    for name, func in build_cases():
+        if args.filter not in name:
+            continue
+        reference = measure(calibration_workload, repeat=3, min_time=0.05)
+        results[name] = measure(func)
+        results[name]["relative"] = results[name]["ops"] / reference["ops"]
+        print(f"{name:45s} {results[name]['ops']:>14,.0f} ops/s {results[name]['peak_kib']:>10.1f} KiB")
+
+    if args.save:
+        baselines = {}
+        if os.path.exists(args.baselines):
+            with open(args.baselines, 'r', encoding='utf-8') as f:
+                baselines = json.load(f)
+        baselines.update({name: {k: round(v, 6) for k, v in result.items()} for name, result in results.items()})
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(baselines.items())), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"기준값을 저장했습니다: {args.baselines}")
+
+    if args.check:
+        if not os.path.exists(args.baselines):
+            print(f"기준값 파일이 없습니다: {args.baselines} (--save 로 먼저 저장하세요)")
+            return 1
+        with open(args.baselines, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n기준값보다 {args.threshold:.0%} 이상 나빠진 케이스:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n모든 케이스가 기준값의 {args.threshold:.0%} 이내입니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
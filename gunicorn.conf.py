@@ -0,0 +1,15 @@
+# gunicorn 설정 (저장소 루트에서 gunicorn "app:app" 으로 실행하면 이 파일을 자동으로 읽음)
+import sys
+
+
+def post_worker_init(worker):
+    """
+    워커가 Flask 애플리케이션을 불러온 뒤 요청을 받기 전에 그래프, 에이전트, 연결 풀 등을 미리 준비합니다.
+    ASGI 애플리케이션(asgi:app)은 lifespan 시작 때 스스로 준비하므로 건너뜁니다.
+    """
+    flask_app = sys.modules.get("app")
+    if flask_app is None:
+        return
+    from utils.startup import warm_up_enabled
+    if warm_up_enabled():
+        flask_app.warm_up_once()
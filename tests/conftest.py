@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+# 저장소 루트의 utils 패키지를 임포트할 수 있도록 경로 추가 (benchmarks 와 같은 방식)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 모듈을 임포트할 때 만들어지는 저장소들이 flask_session/, data/ 의 파일을 건드리지 않도록 임시 경로 사용
+_workdir = tempfile.mkdtemp(prefix="chatbot-tests-")
+os.environ.setdefault("SESSION_LEGACY_DIR", "")
+os.environ.setdefault("SESSION_DIR", os.path.join(_workdir, "sessions"))
+os.environ.setdefault("CHECKPOINT_DB", os.path.join(_workdir, "checkpoints.sqlite"))
+os.environ.setdefault("BOOK_CATALOG_PATH", os.path.join(_workdir, "book_catalog.sqlite"))
+os.environ.setdefault("TOOL_CACHE_PATH", "")
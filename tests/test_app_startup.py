@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+os.environ.setdefault("WARM_UP", "0")
+
+import app as app_module  # noqa: E402
+from utils.memory.session_backend import build_session_backend  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_does_not_start_session_compaction():
+    assert app_module.session_backend._compactor is None
+
+
+def test_session_compaction_starts_on_first_request():
+    backend = app_module.session_backend
+    client = app_module.create_app(warm=False).test_client()
+    try:
+        client.get("/metrics")
+        assert backend._compactor is not None and backend._compactor.is_alive()
+        # 다음 요청에서 다시 시작하지 않음
+        compactor = backend._compactor
+        client.get("/metrics")
+        assert backend._compactor is compactor
+    finally:
+        backend.stop_compaction()
+
+
+def test_legacy_sweep_is_off_by_default(monkeypatch, tmp_path):
+    monkeypatch.delenv("SESSION_LEGACY_DIR", raising=False)
+    monkeypatch.setenv("SESSION_DIR", str(tmp_path / "sessions"))
+    assert build_session_backend().legacy_dir is None
+
+    monkeypatch.setenv("SESSION_LEGACY_DIR", str(tmp_path / "flask_session"))
+    assert build_session_backend().legacy_dir == str(tmp_path / "flask_session")
+
+
+def test_import_does_not_warm_up():
+    # 준비 함수가 불리면 실패하도록 바꾼 뒤 새 프로세스에서 임포트
+    code = (
+        "import sys, utils.startup as startup\n"
+        "startup.warm_up = lambda *args, **kwargs: sys.exit(3)\n"
+        "import app\n"
+        "assert not app._warmed_up\n"
+    )
+    env = {**os.environ, "WARM_UP": "1"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_first_request_warms_up_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module, "warm_up", lambda: calls.append(1))
+    monkeypatch.setattr(app_module, "_warmed_up", False)
+    monkeypatch.setenv("WARM_UP", "1")
+    client = app_module.create_app(warm=False).test_client()
+    assert calls == []
+    try:
+        client.get("/metrics")
+        client.get("/metrics")
+    finally:
+        app_module.session_backend.stop_compaction()
+    assert calls == [1]
+
+    # 이미 준비한 프로세스에서는 create_app 도 다시 준비하지 않음
+    app_module.create_app(warm=True)
+    assert calls == [1]
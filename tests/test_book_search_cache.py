@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+from utils import optimization
+from utils.cache import SQLiteStore, TTLCache
+from utils.optimization import Optimization
+from utils.stubs import NaverBookStubServer
+
+BOOKS = {
+    "살인자의 기억법": [{"title": "살인자의 기억법", "author": "김영하", "publisher": "문학동네", "isbn": "1", "description": ""}],
+    "소년이 온다": [{"title": "소년이 온다", "author": "한강", "publisher": "창비", "isbn": "2", "description": ""}],
+    "채식주의자": [{"title": "채식주의자", "author": "한강", "publisher": "창비", "isbn": "3", "description": ""}],
+}
+
+
+@pytest.fixture
+def stub():
+    with NaverBookStubServer(BOOKS) as server:
+        yield server
+
+
+@pytest.fixture
+def optimizer(stub, monkeypatch):
+    monkeypatch.setenv("NAVER_CLIENT_ID", "test")
+    monkeypatch.setenv("NAVER_CLIENT_SECRET", "test")
+    monkeypatch.setenv("NAVER_BOOK_API_URL", stub.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return Optimization("친근한", "간결한")
+
+
+def use_cache(monkeypatch, cache: TTLCache) -> TTLCache:
+    monkeypatch.setattr(optimization, "book_search_cache", cache)
+    return cache
+
+
+def test_repeated_search_is_served_from_cache(optimizer, stub, monkeypatch):
+    cache = use_cache(monkeypatch, TTLCache(maxsize=8))
+    first = optimizer.get_search_results("살인자의 기억법")
+    # 앞뒤 공백만 다른 검색어도 같은 키
+    second = optimizer.get_search_results(" 살인자의 기억법 ")
+    assert first == second == BOOKS["살인자의 기억법"]
+    assert stub.request_count == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # 비동기 조회도 같은 캐시를 사용
+    assert asyncio.run(optimizer.aget_search_results("살인자의 기억법")) == first
+    assert stub.request_count == 1
+
+
+def test_results_expire_after_ttl(optimizer, stub, monkeypatch):
+    use_cache(monkeypatch, TTLCache(maxsize=8, ttl=0.05, negative_ttl=60))
+    optimizer.get_search_results("소년이 온다")
+    optimizer.get_search_results("소년이 온다")
+    assert stub.request_count == 1
+    time.sleep(0.1)
+    optimizer.get_search_results("소년이 온다")
+    assert stub.request_count == 2
+
+
+def test_empty_results_use_negative_ttl(optimizer, stub, monkeypatch):
+    use_cache(monkeypatch, TTLCache(maxsize=8, ttl=60, negative_ttl=0.05))
+    assert optimizer.get_search_results("없는 책") == []
+    assert optimizer.get_search_results("없는 책") == []
+    assert stub.request_count == 1
+    time.sleep(0.1)
+    optimizer.get_search_results("없는 책")
+    assert stub.request_count == 2
+    # 결과가 있는 검색어는 긴 TTL 을 그대로 사용
+    optimizer.get_search_results("채식주의자")
+    time.sleep(0.1)
+    optimizer.get_search_results("채식주의자")
+    assert stub.request_count == 3
+
+
+def test_least_recently_used_entry_is_evicted(optimizer, stub, monkeypatch):
+    cache = use_cache(monkeypatch, TTLCache(maxsize=2))
+    for query in ("살인자의 기억법", "소년이 온다", "살인자의 기억법", "채식주의자"):
+        optimizer.get_search_results(query)
+    assert stub.request_count == 3
+    assert cache.stats()["evictions"] == 1
+
+    # 가장 오래 쓰지 않은 "소년이 온다" 만 다시 조회
+    optimizer.get_search_results("살인자의 기억법")
+    assert stub.request_count == 3
+    optimizer.get_search_results("소년이 온다")
+    assert stub.request_count == 4
+    assert stub.queries == ["살인자의 기억법", "소년이 온다", "채식주의자", "소년이 온다"]
+
+
+def test_sqlite_store_is_shared_between_caches(optimizer, stub, monkeypatch, tmp_path):
+    path = str(tmp_path / "book_cache.sqlite")
+    use_cache(monkeypatch, TTLCache(maxsize=8, store=SQLiteStore(path, table="naver_book_search")))
+    optimizer.get_search_results("채식주의자")
+    assert stub.request_count == 1
+
+    # 다른 워커(또는 재시작한 워커)의 캐시는 메모리가 비어 있어도 저장소에서 찾음
+    other = use_cache(monkeypatch, TTLCache(maxsize=8, store=SQLiteStore(path, table="naver_book_search")))
+    assert optimizer.get_search_results("채식주의자") == BOOKS["채식주의자"]
+    assert stub.request_count == 1
+    assert other.stats()["store_hits"] == 1
+
+    # 만료된 항목은 저장소에서도 돌려주지 않음
+    expired = SQLiteStore(path, table="naver_book_search")
+    expired.set("10:소년이 온다", BOOKS["소년이 온다"], time.time() - 1)
+    optimizer.get_search_results("소년이 온다")
+    assert stub.request_count == 2
@@ -0,0 +1,88 @@
+import pytest
+
+from utils import optimization
+from utils.catalog import BookCatalog
+from utils.ngram_index import NgramIndex
+from utils.optimization import Optimization
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return BookCatalog(str(tmp_path / "catalog.sqlite"))
+
+
+def _book(isbn: str, title: str, author: str = "한강") -> dict:
+    return {"isbn": isbn, "title": title, "author": author, "publisher": "창비", "description": ""}
+
+
+def test_lookup_matches_exact_and_normalized_titles(catalog):
+    catalog.add_many([_book("1", "채식주의자")])
+    assert catalog.lookup("채식주의자")["isbn"] == "1"
+    assert catalog.lookup(" 채식 주의자 (개정판)")["isbn"] == "1"
+    assert catalog.lookup("채식주의자의 식탁") is None
+
+
+def test_changed_title_is_reindexed(catalog):
+    catalog.add_many([_book("1", "소년이 온다"), _book("2", "흰")])
+    catalog.add_many([_book("1", "작별하지 않는다")])
+
+    assert catalog.lookup("소년이 온다") is None
+    assert catalog.lookup("작별하지 않는다")["isbn"] == "1"
+    assert catalog.fuzzy_lookup("소년이 온다") is None
+    assert catalog.fuzzy_lookup("작별하지 않는다 (양장)")["title"] == "작별하지 않는다"
+    assert len(catalog) == 2
+
+
+def test_changed_title_keeps_other_book_with_same_title(catalog):
+    catalog.add_many([_book("1", "흰"), _book("2", "흰", author="다른 작가")])
+    catalog.add_many([_book("1", "희랍어 시간")])
+    assert catalog.lookup("흰")["isbn"] == "2"
+
+
+def test_ngram_index_replaces_document_with_same_key():
+    index = NgramIndex()
+    index.add("a", "소년이온다")
+    assert index.search("소년이온다", limit=5, min_similarity=0.5) == [("a", 1.0)]
+    index.add("a", "작별하지않는다")
+    assert index.search("소년이온다", limit=5, min_similarity=0.5) == []
+    assert index.search("작별하지않는다", limit=5, min_similarity=0.5) == [("a", 1.0)]
+    assert len(index) == 1
+
+
+class _FakeNaver(Optimization):
+    """네이버 API 대신 정해진 검색 결과를 돌려주는 Optimization (생성자의 API 키/모델 준비는 건너뜀)"""
+    def __init__(self, items: list):
+        self.items = items
+        self.queries = []
+
+    def get_search_results(self, search_query: str, display_count: int = 10) -> list:
+        self.queries.append(search_query)
+        return self.items
+
+
+@pytest.fixture
+def patched_catalog(catalog, monkeypatch):
+    monkeypatch.setattr(optimization, "book_catalog", catalog)
+    return catalog
+
+
+def test_similar_catalog_title_is_not_accepted_without_naver(patched_catalog):
+    patched_catalog.add_many([_book("1", "채식주의자")])
+    naver = _FakeNaver([_book("1", "채식주의자"), _book("9", "채식주의자의 식탁", author="김작가")])
+
+    result = naver.search_book_info("채식주의자의 식탁")
+    assert naver.queries == ["채식주의자의 식탁"]
+    assert [book["isbn"] for book in result] == ["9"]
+
+
+def test_exact_catalog_title_skips_naver(patched_catalog):
+    patched_catalog.add_many([_book("1", "채식주의자")])
+    naver = _FakeNaver([])
+    assert [book["isbn"] for book in naver.search_book_info("채식 주의자")] == ["1"]
+    assert naver.queries == []
+
+
+def test_similar_catalog_title_breaks_ties_between_naver_results(patched_catalog):
+    patched_catalog.add_many([_book("2", "달러구트 꿈 백화점 (리커버)")])
+    naver = _FakeNaver([_book("1", "달러구트 꿈 백화점"), _book("2", "달러구트 꿈 백화점")])
+    assert [book["isbn"] for book in naver.search_book_info("달러구트 꿈 백화점 2")] == ["2"]
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from utils.graph import (
+    GraphState, build_initial_state, get_graph, graph_flight, graph_main, graph_main_async, graph_registry,
+)
+from utils.timing import NodeTimingHandler
+
+QUESTION_A = "추리 소설 추천해줘"
+QUESTION_B = "추리 소설  추천해줘?"
+
+
+def _answer(state: GraphState) -> dict:
+    messages = state["messages"] + [{"role": "assistant", "content": "답변"}]
+    return {"messages": messages, "generation": "답변"}
+
+
+@pytest.fixture
+def gates():
+    return threading.Event(), threading.Event()
+
+
+@pytest.fixture
+def slow_graph(gates):
+    started, release = gates
+
+    def answer(state: GraphState) -> dict:
+        started.set()
+        release.wait(5)
+        return _answer(state)
+
+    def build() -> StateGraph:
+        workflow = StateGraph(GraphState)
+        workflow.add_node("answer", answer)
+        workflow.add_edge(START, "answer")
+        workflow.add_edge("answer", END)
+        return workflow
+
+    graph_registry.register("test-coalesce", build)
+    return "test-coalesce"
+
+
+def _wait_for_follower(shared_before: int) -> None:
+    deadline = time.monotonic() + 5
+    while graph_flight.shared == shared_before and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def _checkpointed(graph_name: str, thread_id: str):
+    return get_graph(graph_name, persistent=True).get_state({"configurable": {"thread_id": thread_id}})
+
+
+def test_follower_gets_own_checkpoint_and_timings(slow_graph, gates):
+    started, release = gates
+    results, timings = {}, {"sync-a": NodeTimingHandler(), "sync-b": NodeTimingHandler()}
+
+    def call(thread_id: str, question: str):
+        state = build_initial_state(question, conversation_id=thread_id)
+        results[thread_id] = graph_main(
+            state, slow_graph, thread_id=thread_id, use_cache=False, callbacks=[timings[thread_id]]
+        )
+
+    leader = threading.Thread(target=call, args=("sync-a", QUESTION_A))
+    leader.start()
+    assert started.wait(5)
+    shared_before = graph_flight.shared
+    follower = threading.Thread(target=call, args=("sync-b", QUESTION_B))
+    follower.start()
+    _wait_for_follower(shared_before)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results["sync-b"] == {"generation": "답변", "coalesced": True}
+    assert "answer" in timings["sync-b"].durations
+
+    snapshot = _checkpointed(slow_graph, "sync-b")
+    assert snapshot.next == ()
+    assert snapshot.values["generation"] == "답변"
+    assert snapshot.values["conversation_id"] == "sync-b"
+    assert snapshot.values["messages"] == [
+        {"role": "user", "content": QUESTION_B},
+        {"role": "assistant", "content": "답변"},
+    ]
+    # 먼저 들어온 요청의 대화는 그대로 유지
+    assert _checkpointed(slow_graph, "sync-a").values["messages"][0]["content"] == QUESTION_A
+
+
+def test_async_follower_gets_own_checkpoint(slow_graph, gates):
+    started, release = gates
+    timing = NodeTimingHandler()
+
+    async def main():
+        leader = asyncio.ensure_future(graph_main_async(
+            build_initial_state(QUESTION_A, conversation_id="async-a"), slow_graph, thread_id="async-a", use_cache=False
+        ))
+        while not started.is_set():
+            await asyncio.sleep(0.005)
+        follower = asyncio.ensure_future(graph_main_async(
+            build_initial_state(QUESTION_B, conversation_id="async-b"), slow_graph, thread_id="async-b",
+            use_cache=False, callbacks=[timing],
+        ))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(leader, follower)
+
+    _, result = asyncio.run(main())
+    assert result == {"generation": "답변", "coalesced": True}
+    assert "answer" in timing.durations
+    assert _checkpointed(slow_graph, "async-b").values["messages"][0]["content"] == QUESTION_B
@@ -0,0 +1,43 @@
+import pytest
+
+from utils.judgement import classify_question
+
+
+@pytest.mark.parametrize("question", [
+    "산책하기 좋은 코스 추천해줘",
+    "책임감 있는 리더가 되는 법 알려줘",
+    "책상 정리하는 방법 추천해줘",
+    "시집가기 전에 준비할 것 알려줘",
+])
+def test_words_containing_book_keywords_are_not_book_questions(question):
+    # 책과 상관없는 요청이므로 규칙으로 정하지 않고 분류 모델에 넘김
+    assert classify_question(question) == "unknown"
+
+
+@pytest.mark.parametrize("question", [
+    "추리 소설 추천해줘",
+    "책 좀 추천해줘",
+    "아이에게 읽어 줄 그림책 추천해주세요",
+    "요리책 추천해줘",
+    "책을 추천해줄래?",
+    "윤동주 시집 알려줘",
+])
+def test_book_requests_are_routed_to_book(question):
+    assert classify_question(question) == "book"
+
+
+@pytest.mark.parametrize("question", [
+    "김영하 작가 책 추천해줘",
+    "채식주의자 작가가 누구야?",
+])
+def test_author_questions_are_routed_to_author(question):
+    assert classify_question(question) == "author"
+
+
+@pytest.mark.parametrize("question", [
+    "안녕하세요",
+    "오늘 날씨 어때?",
+    "요즘 베스트셀러 추천해줘",
+])
+def test_small_talk_and_time_sensitive_questions_are_routed_to_chat(question):
+    assert classify_question(question) == "chat"
@@ -0,0 +1,212 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from utils.llm_scheduler import BATCH, INTERACTIVE, LLMScheduler, QueueFullError, ScheduledChatModel
+
+
+class FakeClock:
+    """직접 앞으로 돌리기 전에는 멈춰 있는 시계입니다. 토큰 버킷이 저절로 차지 않도록 합니다."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_scheduler(clock):
+    created = []
+
+    def make(rpm=600, tpm=600, max_concurrency=1, max_queue=10, queue_timeout=0.05) -> LLMScheduler:
+        # rpm=600, tpm=600 이면 버킷 크기는 요청 100개, 토큰 100개
+        scheduler = LLMScheduler(rpm, tpm, max_concurrency, max_queue, queue_timeout, clock=clock)
+        created.append(scheduler)
+        return scheduler
+
+    yield make
+    # 버킷을 기다리며 걸어 둔 실제 타이머가 다른 테스트에서 울리지 않도록 정리
+    for scheduler in created:
+        if scheduler._timer is not None:
+            scheduler._timer.cancel()
+
+
+def test_interactive_calls_are_admitted_before_batch(make_scheduler):
+    scheduler = make_scheduler(queue_timeout=5)
+    admitted = []
+
+    async def call(name: str, priority: int):
+        await scheduler.aacquire(1, priority)
+        admitted.append(name)
+
+    async def main():
+        scheduler.acquire(1)
+        tasks = [
+            asyncio.ensure_future(call("batch-1", BATCH)),
+            asyncio.ensure_future(call("batch-2", BATCH)),
+            asyncio.ensure_future(call("interactive", INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 3
+        for _ in tasks:
+            scheduler.release(1, 1)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert admitted == ["interactive", "batch-1", "batch-2"]
+
+
+def test_queue_overflow_is_rejected_immediately(make_scheduler):
+    scheduler = make_scheduler(rpm=60, max_queue=1, queue_timeout=5)
+
+    async def main():
+        scheduler.acquire(1)
+        waiting = asyncio.ensure_future(scheduler.aacquire(1))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError) as raised:
+            scheduler.acquire(1)
+        scheduler.release(1)
+        await waiting
+        return raised.value
+
+    error = asyncio.run(main())
+    # 대기 1개 + 진행 1개, 분당 60개 → 2초
+    assert error.retry_after == 2
+    assert scheduler.stats() == {
+        "queued": 0, "inflight": 1, "admitted": 2, "rejected": 1, "retries": 0, "rate_limited": 0,
+    }
+
+
+def test_queue_timeout_raises_and_drops_waiter(make_scheduler):
+    scheduler = make_scheduler()
+    scheduler.acquire(1)
+    with pytest.raises(QueueFullError):
+        scheduler.acquire(1)
+    assert scheduler.stats()["queued"] == 0
+    assert scheduler.stats()["rejected"] == 1
+
+    # 시간이 지나 취소된 호출은 차례를 받지 않고, 반납된 자리는 다음 호출이 받음
+    scheduler.release(1)
+    scheduler.acquire(1)
+    assert scheduler.stats()["inflight"] == 1
+    assert scheduler.stats()["admitted"] == 2
+
+
+def test_release_refunds_unused_tokens(make_scheduler):
+    scheduler = make_scheduler(max_concurrency=4)
+    scheduler.acquire(60)
+    # 60개를 예상했지만 20개만 썼으므로 40개를 돌려받아 80개가 남음
+    scheduler.release(60, 20)
+    with pytest.raises(QueueFullError):
+        scheduler.acquire(81)
+    scheduler.acquire(80)
+    assert scheduler.stats()["inflight"] == 1
+
+    # 실제 사용량을 모르면 예상치를 그대로 쓴 것으로 봄
+    scheduler.release(80)
+    with pytest.raises(QueueFullError):
+        scheduler.acquire(1)
+
+
+def test_tokens_refill_with_clock(make_scheduler, clock):
+    scheduler = make_scheduler(max_concurrency=4)
+    scheduler.acquire(100)
+    scheduler.release(100)
+    with pytest.raises(QueueFullError):
+        scheduler.acquire(10)
+    # 분당 600개 → 1초에 10개
+    clock.advance(1)
+    scheduler.acquire(10)
+
+
+def test_penalize_pauses_until_retry_after(make_scheduler, clock):
+    scheduler = make_scheduler(max_concurrency=4)
+    scheduler.penalize(30)
+    with pytest.raises(QueueFullError) as raised:
+        scheduler.acquire(1)
+    assert raised.value.retry_after == 30
+    assert scheduler.stats()["rate_limited"] == 1
+
+    clock.advance(29)
+    with pytest.raises(QueueFullError):
+        scheduler.acquire(1)
+    clock.advance(1)
+    scheduler.acquire(1)
+    assert scheduler.stats()["inflight"] == 1
+
+
+def test_cancelled_async_call_returns_admitted_slot(make_scheduler):
+    scheduler = make_scheduler(queue_timeout=5)
+
+    async def main():
+        scheduler.acquire(1)
+        waiting = asyncio.ensure_future(scheduler.aacquire(1))
+        await asyncio.sleep(0)
+        # 자리를 받은 직후, 깨어나기 전에 취소되면 받은 자리를 돌려줘야 함
+        scheduler.release(1)
+        assert scheduler.stats()["inflight"] == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(main())
+    assert scheduler.stats()["inflight"] == 0
+    scheduler.acquire(1)
+    assert scheduler.stats()["admitted"] == 3
+
+
+def test_cancelled_async_call_leaves_queue(make_scheduler):
+    scheduler = make_scheduler(queue_timeout=5)
+
+    async def main():
+        scheduler.acquire(1)
+        waiting = asyncio.ensure_future(scheduler.aacquire(1))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert scheduler.stats()["queued"] == 0
+        scheduler.release(1)
+
+    asyncio.run(main())
+    assert scheduler.stats()["inflight"] == 0
+    assert scheduler.stats()["admitted"] == 1
+
+
+class _InterruptedChatModel(FakeListChatModel):
+    """호출 도중 KeyboardInterrupt 로 중단되는 언어 모델"""
+    def _call(self, *args, **kwargs) -> str:
+        raise KeyboardInterrupt
+
+
+def test_streamed_call_releases_counted_usage(make_scheduler):
+    # 스트리밍 응답처럼 token_usage 가 없는 응답
+    scheduler = make_scheduler(max_concurrency=4)
+    model = ScheduledChatModel(inner=FakeListChatModel(responses=["답변"]), scheduler=scheduler, completion_tokens=50)
+    assert model.invoke([HumanMessage(content="안녕")]).content == "답변"
+    assert scheduler.stats()["inflight"] == 0
+    # 예상치(프롬프트 + 50)가 아니라 실제로 센 몇 토큰만 버킷에서 빠짐
+    scheduler.acquire(90)
+
+
+def test_interrupted_call_returns_slot(make_scheduler):
+    scheduler = make_scheduler(max_concurrency=1)
+    model = ScheduledChatModel(
+        inner=_InterruptedChatModel(responses=["답변"]), scheduler=scheduler, completion_tokens=10
+    )
+    with pytest.raises(KeyboardInterrupt):
+        model.invoke([HumanMessage(content="안녕")])
+    assert scheduler.stats()["inflight"] == 0
+    scheduler.acquire(1)
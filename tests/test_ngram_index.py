@@ -0,0 +1,52 @@
+import threading
+
+from utils.ngram_index import NgramIndex
+
+
+def test_search_returns_most_similar_first():
+    index = NgramIndex()
+    for key, title in [("1", "소년이온다"), ("2", "소년이오다"), ("3", "채식주의자")]:
+        index.add(key, title)
+    assert [key for key, _ in index.search("소년이온다", limit=2, min_similarity=0.3)] == ["1", "2"]
+
+
+def test_search_while_adding_uses_consistent_snapshot():
+    index = NgramIndex()
+    for i in range(200):
+        index.add(f"seed-{i}", f"책제목{i}")
+    errors, stop = [], threading.Event()
+
+    def writer():
+        # 새 문서와 같은 키의 재색인을 섞어 posting 배열과 문서 길이 배열이 계속 바뀌도록 함
+        for i in range(3000):
+            index.add(f"doc-{i % 500}", f"책제목{i}번째이야기")
+        stop.set()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                for key, similarity in index.search("책제목12번째이야기", limit=5, min_similarity=0.3):
+                    assert 0.3 <= similarity <= 1.0, (key, similarity)
+            except Exception as e:  # noqa: BLE001 - 스레드 안의 실패를 테스트로 전달
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(index) == 700
+    assert index.search("책제목2999번째이야기", limit=1, min_similarity=0.9) == [("doc-499", 1.0)]
+
+
+def test_search_right_after_add_finds_new_documents():
+    index = NgramIndex()
+    # 문서 길이 버퍼(처음 1024개)와 posting 버퍼가 여러 번 늘어나도록 충분히 추가
+    for i in range(3000):
+        title = "제목" + chr(0xAC00 + i)
+        index.add(f"doc-{i}", title)
+        assert index.search(title, limit=1, min_similarity=1.0) == [(f"doc-{i}", 1.0)]
+    assert index.search("제목" + chr(0xAC00 + 7), limit=1, min_similarity=1.0) == [("doc-7", 1.0)]
@@ -0,0 +1,52 @@
+import os
+import re
+import sys
+
+import pytest
+
+# 기존 구현과 입력 데이터는 벤치마크와 함께 benchmarks/ 에 있음
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import fixtures  # noqa: E402
+from bench_render import (  # noqa: E402
+    edge_cases, legacy_insert_book_info, legacy_rewrite_response, legacy_strip_fields, legacy_summarize_text,
+)
+from utils.render import BookCardRenderer, summarize  # noqa: E402
+
+
+@pytest.fixture
+def renderer():
+    return BookCardRenderer()
+
+
+@pytest.mark.parametrize("num_books", fixtures.SIZES.values(), ids=fixtures.SIZES.keys())
+def test_line_filtering_matches_legacy(renderer, num_books):
+    text = fixtures.llm_response(num_books)
+    titles = re.findall(r"'([^']+)'", text)
+    for valid in (titles, titles[::2], []):
+        assert renderer.filter_lines(text, valid) == legacy_rewrite_response(text, valid)
+        assert renderer.body_lines(text, valid) == legacy_strip_fields(legacy_rewrite_response(text, valid))
+
+
+@pytest.mark.parametrize("num_books", fixtures.SIZES.values(), ids=fixtures.SIZES.keys())
+def test_book_cards_match_legacy(renderer, num_books):
+    text = fixtures.llm_response(num_books)
+    items = fixtures.naver_items(num_books)
+    # 두 번째는 ISBN 별로 재사용한 조각으로 만든 결과
+    for _ in range(2):
+        assert renderer.render(items) == legacy_insert_book_info(text, items)
+
+
+@pytest.mark.parametrize("num_books", fixtures.SIZES.values(), ids=fixtures.SIZES.keys())
+def test_summary_matches_legacy(num_books):
+    description = fixtures.description(num_books * 3)
+    for num_sentences in (0, 1, 3, 10):
+        assert summarize(description, num_sentences) == legacy_summarize_text(description, num_sentences)
+
+
+def test_edge_case_cards_match_legacy(renderer):
+    cases = edge_cases()
+    for _ in range(2):
+        assert renderer.render(cases) == legacy_insert_book_info("", cases)
+        for case in cases:
+            assert renderer.render([case]) == legacy_insert_book_info("", [case])
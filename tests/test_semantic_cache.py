@@ -0,0 +1,80 @@
+import pytest
+
+from utils.semantic_cache import SemanticCache, content_tokens, normalize_question, query_guard
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(max_entries=64, dim=2048)
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("10대가 읽을 만한 책 추천해줘", "20대가 읽을 만한 책 추천해줘"),
+    ("한강 작가 책 추천해줘", "한강 작가 책 2권 추천해줘"),
+    ("로맨스 소설 추천해줘", "로맨스 소설 말고 추천해줘"),
+    ("추리 소설 추천해줘", "추리 소설 빼고 추천해줘"),
+    ("김영하 책 추천해줘", "김연수 책 추천해줘"),
+    # 긴 질문에서 한 낱말만 다른 경우
+    ("요즘 읽을 만한 한국 장편 소설 중에서 김영하 작가 책 추천해줘",
+     "요즘 읽을 만한 한국 장편 소설 중에서 김연수 작가 책 추천해줘"),
+    ("출퇴근길에 가볍게 읽기 좋은 여성 작가가 쓴 책으로 추천해줘",
+     "출퇴근길에 가볍게 읽기 좋은 남성 작가가 쓴 책으로 추천해줘"),
+    ("회사 생활을 막 시작한 신입 사원에게 도움이 되는 경영 관련 책 추천해줘",
+     "회사 생활을 막 시작한 신입 사원에게 도움이 되는 심리 관련 책 추천해줘"),
+])
+def test_questions_with_different_meaning_miss(cache, stored, asked):
+    cache.store(stored, "answer")
+    assert cache.lookup(asked) is None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("김영하 작가 책 추천해줘", "김영하 작가 책 추천 좀 해주세요"),
+    ("자기계발서 추천해줘", "자기계발서 추천해주세요!"),
+    ("SF 소설 추천", "sf 소설 추천해줘"),
+    ("로맨스 소설 말고 추천해줘", "로맨스 소설 말고 추천 좀 해주세요"),
+    ("요즘 읽을 만한 한국 장편 소설 중에서 김영하 작가 책 추천해줘",
+     "요즘 읽을 만한 한국 장편 소설 중에서 김영하 작가 책 추천 좀 해주세요"),
+])
+def test_paraphrases_hit(cache, stored, asked):
+    cache.store(stored, "answer")
+    assert cache.lookup(asked) == "answer"
+
+
+def test_entries_are_scoped_by_namespace_and_history(cache):
+    cache.store("추리 소설 추천해줘", "fast answer", namespace="fast")
+    assert cache.lookup("추리 소설 추천해줘", namespace="default") is None
+    assert cache.lookup("추리 소설 추천해줘", namespace="fast") == "fast answer"
+
+    history = [{"role": "user", "content": "안녕"}, {"role": "assistant", "content": "안녕하세요"}]
+    assert cache.lookup("추리 소설 추천해줘", history, namespace="fast") is None
+
+
+def test_query_guard():
+    assert query_guard("10대 책 추천") == (("10",), ())
+    assert query_guard("로맨스 말고 제외 추천") == ((), ("말고", "제외"))
+
+
+def test_content_tokens_ignore_stop_words_and_request_endings():
+    assert content_tokens(normalize_question("경영 관련 책 추천해주세요")) == ("경영",)
+    assert content_tokens(normalize_question("경영 도서 추천 좀 해줘")) == ("경영",)
+
+
+def test_storage_grows_with_entries_and_evicts_at_limit():
+    cache = SemanticCache(max_entries=100, dim=64)
+    assert cache._vectors.shape == (64, 64)
+    for i in range(100):
+        cache.store(f"질문 {i}번", f"answer {i}")
+    assert cache._vectors.shape == (100, 64)
+    assert cache.lookup("질문 0번") == "answer 0"
+
+    cache.store("새 질문", "new")
+    assert cache.stats()["evictions"] == 1
+    assert cache._vectors.shape == (100, 64)
+    assert cache.lookup("새 질문") == "new"
+    # 가장 오래 사용되지 않은 "질문 1번" 이 교체됨
+    assert cache.lookup("질문 1번") is None
+    assert cache.lookup("질문 0번") == "answer 0"
+
+    cache.clear()
+    assert cache._vectors.shape == (64, 64)
+    assert cache.lookup("새 질문") is None
@@ -0,0 +1,45 @@
+import multiprocessing
+import os
+import tempfile
+
+from utils.memory.session_backend import ShardedFileBackend
+
+
+def _write_many(directory: str, worker: int) -> None:
+    backend = ShardedFileBackend(directory)
+    for i in range(200):
+        backend.set("shared-key", {"worker": worker, "i": i})
+
+
+def test_forked_workers_writing_same_key_do_not_collide(tmp_path):
+    directory = str(tmp_path / "sessions")
+    # 포크된 워커는 스레드 ID 가 같을 수 있으므로 임시 파일 이름이 프로세스마다 달라야 함
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_write_many, args=(directory, worker)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    value = ShardedFileBackend(directory).get("shared-key")
+    assert value["i"] == 199 and value["worker"] in range(4)
+    assert not [name for name in os.listdir(os.path.join(directory, "sh")) if name.endswith(".tmp")]
+
+
+def test_write_retries_when_shard_is_removed_concurrently(tmp_path, monkeypatch):
+    backend = ShardedFileBackend(str(tmp_path / "sessions"))
+    mkstemp = tempfile.mkstemp
+    removed = []
+
+    def remove_shard_first(*args, dir=None, **kwargs):
+        # 다른 워커의 정리 작업이 makedirs 직후에 빈 하위 디렉토리를 지운 상황
+        if not removed:
+            os.rmdir(dir)
+            removed.append(dir)
+        return mkstemp(*args, dir=dir, **kwargs)
+
+    monkeypatch.setattr(tempfile, "mkstemp", remove_shard_first)
+    backend.set("abc", {"n": 1})
+    assert removed == [str(tmp_path / "sessions" / "ab")]
+    assert backend.get("abc") == {"n": 1}
@@ -0,0 +1,142 @@
+import operator
+import threading
+from typing import Annotated, List
+
+import pytest
+from langgraph.checkpoint.base import create_checkpoint, empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from utils.memory.sqlite_checkpointer import SQLiteCheckpointer
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.sqlite")
+
+
+def _config(thread_id: str, checkpoint_id: str = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def _put_chain(saver: SQLiteCheckpointer, thread_id: str, count: int) -> List[str]:
+    """thread_id 에 부모-자식으로 이어지는 체크포인트 count 개를 저장하고 ID 목록을 반환합니다."""
+    ids, checkpoint, config = [], empty_checkpoint(), _config(thread_id)
+    for step in range(count):
+        checkpoint = create_checkpoint(checkpoint, None, step)
+        checkpoint["channel_values"] = {"step": step}
+        config = saver.put(config, checkpoint, {"source": "loop", "step": step, "writes": None}, {})
+        ids.append(config["configurable"]["checkpoint_id"])
+    return ids
+
+
+def test_put_and_get_tuple_round_trip(db_path):
+    saver = SQLiteCheckpointer(db_path, compact_every=0)
+    ids = _put_chain(saver, "t1", 3)
+
+    latest = saver.get_tuple(_config("t1"))
+    assert latest.config["configurable"]["checkpoint_id"] == ids[-1]
+    assert latest.checkpoint["channel_values"] == {"step": 2}
+    assert latest.metadata == {"source": "loop", "step": 2, "writes": None}
+    assert latest.parent_config["configurable"]["checkpoint_id"] == ids[-2]
+
+    first = saver.get_tuple(_config("t1", ids[0]))
+    assert first.checkpoint["channel_values"] == {"step": 0}
+    assert first.parent_config is None
+    assert saver.get_tuple(_config("missing")) is None
+    saver.close()
+
+
+def test_list_orders_newest_first_and_filters(db_path):
+    saver = SQLiteCheckpointer(db_path, compact_every=0)
+    ids = _put_chain(saver, "t1", 4)
+    _put_chain(saver, "t2", 2)
+
+    listed = [item.config["configurable"]["checkpoint_id"] for item in saver.list(_config("t1"))]
+    assert listed == ids[::-1]
+    assert [item.config["configurable"]["checkpoint_id"] for item in saver.list(_config("t1"), limit=2)] == ids[:1:-1]
+    assert [item.config["configurable"]["checkpoint_id"] for item in saver.list(_config("t1"), before=_config("t1", ids[2]))] == [ids[1], ids[0]]
+    assert [item.metadata["step"] for item in saver.list(_config("t1"), filter={"step": 1})] == [1]
+    assert len(list(saver.list(None))) == 6
+    saver.close()
+
+
+def test_put_writes_are_returned_as_pending_writes(db_path):
+    saver = SQLiteCheckpointer(db_path, compact_every=0)
+    checkpoint_id = _put_chain(saver, "t1", 1)[0]
+    config = _config("t1", checkpoint_id)
+    saver.put_writes(config, [("messages", ["a"]), ("question", "q")], task_id="task-1")
+    saver.put_writes(config, [("response", "r")], task_id="task-2")
+
+    pending = saver.get_tuple(config).pending_writes
+    assert pending == [("task-1", "messages", ["a"]), ("task-1", "question", "q"), ("task-2", "response", "r")]
+    saver.close()
+
+
+def test_resumes_after_restart(db_path):
+    saver = SQLiteCheckpointer(db_path, compact_every=0)
+    ids = _put_chain(saver, "t1", 2)
+    saver.close()
+
+    reopened = SQLiteCheckpointer(db_path, compact_every=0)
+    latest = reopened.get_tuple(_config("t1"))
+    assert latest.config["configurable"]["checkpoint_id"] == ids[-1]
+    assert latest.checkpoint["channel_values"] == {"step": 1}
+    reopened.close()
+
+
+class _CounterState(TypedDict):
+    total: Annotated[int, operator.add]
+
+
+def _build_graph(saver: SQLiteCheckpointer):
+    workflow = StateGraph(_CounterState)
+    workflow.add_node("add", lambda state: {"total": 1})
+    workflow.add_edge(START, "add")
+    workflow.add_edge("add", END)
+    return workflow.compile(checkpointer=saver)
+
+
+def test_graph_state_continues_in_a_new_process(db_path):
+    saver = SQLiteCheckpointer(db_path, compact_every=0)
+    config = {"configurable": {"thread_id": "conversation"}}
+    assert _build_graph(saver).invoke({"total": 1}, config) == {"total": 2}
+    saver.close()
+
+    # 재시작한 워커는 저장된 상태에서 이어서 실행
+    reopened = SQLiteCheckpointer(db_path, compact_every=0)
+    graph = _build_graph(reopened)
+    assert graph.get_state(config).values == {"total": 2}
+    assert graph.invoke({"total": 1}, config) == {"total": 4}
+    reopened.close()
+
+
+def test_compaction_runs_in_background_and_keeps_latest(db_path):
+    saver = SQLiteCheckpointer(db_path, keep_last=2, compact_every=5)
+    ids = _put_chain(saver, "t1", 5)
+    saver.wait_for_compaction(timeout=5)
+
+    remaining = [item.config["configurable"]["checkpoint_id"] for item in saver.list(_config("t1"))]
+    assert remaining == ids[:2:-1]
+    saver.close()
+
+
+def test_concurrent_puts_keep_counters_consistent(db_path):
+    saver = SQLiteCheckpointer(db_path, sync_every=7, compact_every=0)
+
+    def worker(index: int):
+        _put_chain(saver, f"t{index}", 25)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 8 * 25 = 200 번 저장, 7 번마다 초기화되므로 200 % 7 이 남아야 함
+    assert saver._puts_since_sync == 200 % 7
+    assert len(list(saver.list(None))) == 200
+    saver.close()
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from utils import tool_cache as tool_cache_module
+from utils.cache import TTLCache
+from utils.stubs import SearchToolStub
+from utils.tool_cache import CachedSearchTool, cache_tool, tool_flight
+
+RESULTS = {
+    "김영하 신작": [{"url": "https://example.com/news", "content": "김영하 작가의 신작 소식"}],
+    "채식주의자 줄거리": [{"url": "https://example.com/book", "content": "채식주의자의 줄거리"}],
+}
+
+
+class _FailingSearchStub(SearchToolStub):
+    """Tavily 도구처럼 실패하면 예외 대신 오류 문자열을 돌려주는 스텁 도구"""
+    def _run(self, query: str, run_manager: Any = None) -> Any:
+        self.queries.append(query)
+        return "HTTPError('429 Client Error: Too Many Requests')"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TTLCache(maxsize=8, ttl=60, negative_ttl=60)
+    monkeypatch.setattr(tool_cache_module, "tool_cache", cache)
+    monkeypatch.setenv("TOOL_CACHE", "1")
+    return cache
+
+
+def test_normalized_queries_share_one_upstream_call(cache):
+    stub = SearchToolStub(results=RESULTS)
+    tool = cache_tool(stub)
+    assert isinstance(tool, CachedSearchTool)
+    # 공백, 문장 부호, 대소문자만 다른 검색어는 같은 키
+    for query in ("김영하 신작", "  김영하   신작? ", "김영하 신작!"):
+        assert tool.invoke(query) == RESULTS["김영하 신작"]
+    assert stub.queries == ["김영하 신작"]
+    assert cache.stats()["hits"] == 2
+
+    # 비동기 호출도 같은 캐시를 사용
+    assert asyncio.run(tool.ainvoke("김영하 신작")) == RESULTS["김영하 신작"]
+    assert stub.queries == ["김영하 신작"]
+
+
+def test_news_queries_expire_before_evergreen_queries(cache, monkeypatch):
+    monkeypatch.setattr(tool_cache_module, "NEWS_TTL", 0.05)
+    stub = SearchToolStub(results=RESULTS)
+    tool = cache_tool(stub)
+    tool.invoke("김영하 신작")
+    tool.invoke("채식주의자 줄거리")
+    time.sleep(0.1)
+
+    # 뉴스성 검색어는 NEWS_TTL 이 지나 다시 조회하고, 그 밖의 검색어는 긴 TTL 로 남아 있음
+    tool.invoke("김영하 신작")
+    tool.invoke("채식주의자 줄거리")
+    assert stub.queries == ["김영하 신작", "채식주의자 줄거리", "김영하 신작"]
+
+
+def test_error_strings_are_not_cached(cache):
+    stub = _FailingSearchStub()
+    tool = cache_tool(stub)
+    assert tool.invoke("김영하 신작").startswith("HTTPError")
+    assert tool.invoke("김영하 신작").startswith("HTTPError")
+    assert stub.queries == ["김영하 신작", "김영하 신작"]
+    assert cache.stats()["size"] == 0
+
+
+def test_concurrent_identical_queries_are_coalesced(cache):
+    stub = SearchToolStub(results=RESULTS, latency=0.2)
+    tool = cache_tool(stub)
+    shared_before = tool_flight.shared
+    results = []
+
+    def call(query: str):
+        results.append(tool.invoke(query))
+
+    threads = [threading.Thread(target=call, args=("김영하 신작",)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [RESULTS["김영하 신작"]] * 6
+    assert stub.queries == ["김영하 신작"]
+    assert tool_flight.shared - shared_before == 5
+
+
+def test_concurrent_identical_async_queries_are_coalesced(cache):
+    stub = SearchToolStub(results=RESULTS, latency=0.1)
+    tool = cache_tool(stub)
+
+    async def main():
+        return await asyncio.gather(*(tool.ainvoke("채식주의자 줄거리") for _ in range(4)))
+
+    assert asyncio.run(main()) == [RESULTS["채식주의자 줄거리"]] * 4
+    assert stub.queries == ["채식주의자 줄거리"]
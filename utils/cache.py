@@ -0,0 +1,219 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# 캐시에 값이 없음을 나타내는 표식 (None 이나 빈 리스트도 캐시될 수 있으므로 별도로 둠)
+MISSING = object()
+
+
+class SQLiteStore:
+    """
+    여러 워커가 공유할 수 있는 SQLite 기반 키-값 저장소입니다.
+    값은 JSON으로 직렬화되며 만료 시각과 함께 저장됩니다.
+    """
+    def __init__(self, path: str, table: str = "cache"):
+        """
+        Args:
+            path (str): SQLite 파일 경로
+            table (str, optional): 사용할 테이블 이름
+        """
+        self.path = path
+        self.table = table
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        # WAL 모드는 여러 프로세스의 동시 읽기를 막지 않습니다.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        저장된 값을 가져옵니다.
+
+        Returns:
+            tuple: (값, 만료 시각). 없거나 만료된 경우 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        """값을 만료 시각과 함께 저장합니다."""
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """값을 삭제합니다."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """
+        만료된 항목을 삭제합니다.
+
+        Returns:
+            int: 삭제된 항목 수
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """모든 항목을 삭제합니다."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """연결을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+
+class TTLCache:
+    """
+    만료 시간(TTL)을 지원하는 스레드 안전 LRU 캐시입니다.
+
+    프로세스 메모리에 최근 항목을 보관하고, store가 주어지면 메모리에 없는 항목을
+    영구 저장소에서 찾아 다시 메모리에 올립니다.
+    """
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 3600,
+        negative_ttl: float = 300,
+        store: Optional[SQLiteStore] = None
+    ):
+        """
+        Args:
+            maxsize (int, optional): 메모리에 보관할 최대 항목 수
+            ttl (float, optional): 일반 항목의 만료 시간(초)
+            negative_ttl (float, optional): 빈 결과의 만료 시간(초)
+            store (SQLiteStore, optional): 영구 저장소
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.store = store
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """
+        캐시된 값을 가져옵니다.
+
+        Args:
+            key (str): 캐시 키
+            default (Any, optional): 값이 없을 때 반환할 값
+
+        Returns:
+            Any: 캐시된 값 또는 default
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._data[key]
+
+        if self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                value, expires_at = stored
+                with self._lock:
+                    self._put(key, value, expires_at)
+                    self.hits += 1
+                    self.store_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        값을 캐시에 저장합니다. 빈 값은 negative_ttl 동안만 보관합니다.
+
+        Args:
+            key (str): 캐시 키
+            value (Any): 저장할 값 (store 사용 시 JSON 직렬화 가능해야 함)
+            ttl (float, optional): 이 항목에만 적용할 만료 시간(초)
+        """
+        if ttl is None:
+            ttl = self.ttl if value else self.negative_ttl
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._put(key, value, expires_at)
+        if self.store is not None:
+            self.store.set(key, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        """값을 캐시에서 삭제합니다."""
+        with self._lock:
+            self._data.pop(key, None)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def clear(self) -> None:
+        """캐시와 통계를 초기화합니다."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.store_hits = self.evictions = 0
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계를 반환합니다.
+
+        Returns:
+            dict: 적중/실패 횟수, 적중률, 현재 크기 등
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "store_hits": self.store_hits,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _put(self, key: str, value: Any, expires_at: float) -> None:
+        """락을 잡은 상태에서 항목을 넣고 LRU 순서대로 초과분을 제거합니다."""
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,249 @@
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+from .metrics import registry
+from .ngram_index import NgramIndex
+
+_TAG = re.compile(r"<[^<]+?>")
+_SUBTITLE = re.compile(r"\([^)]*\)")
+_NON_WORD = re.compile(r"[\W_]+")
+
+# 카탈로그에 저장하는 필드 순서
+FIELDS = ("isbn", "title", "author", "publisher", "description")
+
+
+def clean_title(title: str) -> str:
+    """네이버 검색 결과의 강조 태그를 제거한 제목을 반환합니다."""
+    return _TAG.sub("", title or "").strip()
+
+
+def normalize_title(title: str) -> str:
+    """
+    띄어쓰기, 문장 부호, 괄호 안 부제, 대소문자 차이를 무시하도록 제목을 정규화합니다.
+
+    Args:
+        title (str): 책 제목
+
+    Returns:
+        str: 정규화된 제목
+    """
+    text = unicodedata.normalize("NFKC", clean_title(title)).lower()
+    without_subtitle = _SUBTITLE.sub("", text)
+    normalized = _NON_WORD.sub("", without_subtitle)
+    # 제목 전체가 괄호인 경우 부제를 지우지 않음
+    return normalized or _NON_WORD.sub("", text)
+
+
+class BookCatalog:
+    """
+    네이버 API 없이 책 제목을 검증하기 위한 로컬 도서 카탈로그입니다.
+
+    책 정보(제목, 작가, 출판사, ISBN, 설명)는 SQLite 파일에 저장하고, 처음 사용할 때
+    제목/정규화된 제목 색인을 메모리에 올려 조회를 사전(dict) 조회 한 번으로 처리합니다.
+    제목이 조금씩 다른 경우를 위해 음절 n-gram 색인(fuzzy_lookup)도 함께 유지합니다.
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): SQLite 파일 경로
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._loaded = False
+        self._by_isbn: Dict[str, tuple] = {}
+        self._by_title: Dict[str, str] = {}
+        self._by_normalized: Dict[str, str] = {}
+        self._title_index = NgramIndex()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, title: str) -> Optional[Dict[str, str]]:
+        """
+        제목으로 책을 찾습니다. 정확히 같은 제목을 먼저 찾고, 없으면 정규화된 제목으로 찾습니다.
+
+        Args:
+            title (str): 책 제목
+
+        Returns:
+            dict: 책 정보 (없으면 None)
+        """
+        self._ensure_loaded()
+        key = self._by_title.get(clean_title(title))
+        if key is None:
+            key = self._by_normalized.get(normalize_title(title))
+        if key is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._as_dict(self._by_isbn[key])
+
+    def fuzzy_lookup(self, title: str, min_similarity: float = 0.5) -> Optional[Dict[str, str]]:
+        """
+        띄어쓰기, 문장 부호, 부제 등이 조금 다른 제목으로 책을 찾습니다.
+
+        Args:
+            title (str): 책 제목
+            min_similarity (float, optional): 최소 음절 bigram Jaccard 유사도
+
+        Returns:
+            dict: 가장 비슷한 책 정보 (없으면 None)
+        """
+        self._ensure_loaded()
+        matches = self._title_index.search(normalize_title(title), limit=1, min_similarity=min_similarity)
+        if not matches:
+            return None
+        return self._as_dict(self._by_isbn[matches[0][0]])
+
+    def get(self, isbn: str) -> Optional[Dict[str, str]]:
+        """ISBN으로 책을 찾습니다."""
+        self._ensure_loaded()
+        record = self._by_isbn.get(isbn)
+        return self._as_dict(record) if record else None
+
+    def add_many(self, items: Iterable[dict]) -> int:
+        """
+        책 정보를 한 번에 추가합니다. 네이버 API 응답의 items 를 그대로 넣을 수 있습니다.
+
+        Args:
+            items (Iterable[dict]): title, author, publisher, isbn, description 키를 가진 딕셔너리들
+
+        Returns:
+            int: 추가(또는 갱신)된 책 수
+        """
+        records = []
+        for item in items:
+            title = clean_title(item.get("title", ""))
+            if not title:
+                continue
+            isbn = (item.get("isbn") or "").strip() or f"title:{normalize_title(title)}"
+            records.append((
+                isbn,
+                title,
+                clean_title(item.get("author", "")),
+                clean_title(item.get("publisher", "")),
+                item.get("description", "") or "",
+            ))
+        if not records:
+            return 0
+
+        self._ensure_loaded()
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO books (isbn, title, normalized_title, author, publisher, description) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(r[0], r[1], normalize_title(r[1]), r[2], r[3], r[4]) for r in records],
+            )
+            conn.commit()
+            for record in records:
+                self._index(record)
+        return len(records)
+
+    def import_file(self, path: str) -> int:
+        """
+        JSON Lines(.jsonl) 또는 CSV(.csv) 파일에서 책 정보를 가져옵니다.
+
+        Args:
+            path (str): 가져올 파일 경로
+
+        Returns:
+            int: 추가된 책 수
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith(".csv"):
+                items = list(csv.DictReader(f))
+            else:
+                items = [json.loads(line) for line in f if line.strip()]
+        return self.add_many(items)
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._by_isbn)
+
+    def stats(self) -> Dict[str, int]:
+        """카탈로그 크기와 조회 적중/실패 횟수를 반환합니다."""
+        return {"size": len(self), "hits": self.hits, "misses": self.misses}
+
+    def _connection(self) -> sqlite3.Connection:
+        """락을 잡은 상태에서 SQLite 연결을 엽니다."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS books ("
+                "isbn TEXT PRIMARY KEY, title TEXT NOT NULL, normalized_title TEXT NOT NULL, "
+                "author TEXT, publisher TEXT, description TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS books_normalized_title ON books (normalized_title)")
+            self._conn.commit()
+        return self._conn
+
+    def _ensure_loaded(self) -> None:
+        """처음 사용할 때 SQLite 파일의 모든 책을 메모리 색인에 올립니다."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = self._connection().execute(
+                "SELECT isbn, title, author, publisher, description FROM books"
+            ).fetchall()
+            for row in rows:
+                self._index(tuple(row))
+            self._loaded = True
+
+    def _index(self, record: tuple) -> None:
+        """
+        락을 잡은 상태에서 책 하나를 메모리 색인에 넣습니다. 같은 제목이면 먼저 들어온 책을 유지합니다.
+        이미 있는 ISBN 의 제목이 바뀌면 이전 제목의 색인을 지우고 새 제목으로 다시 색인합니다.
+        """
+        previous = self._by_isbn.get(record[0])
+        self._by_isbn[record[0]] = record
+        if previous is not None and previous[1] == record[1]:
+            return
+        if previous is not None:
+            self._unindex_title(previous)
+        self._title_index.add(record[0], normalize_title(record[1]))
+        self._by_title.setdefault(record[1], record[0])
+        self._by_normalized.setdefault(normalize_title(record[1]), record[0])
+
+    def _unindex_title(self, record: tuple) -> None:
+        """락을 잡은 상태에서 책의 이전 제목 색인을 지우고, 같은 제목의 다른 책이 있으면 그 책으로 바꿉니다."""
+        isbn, title, normalized = record[0], record[1], normalize_title(record[1])
+        if self._by_title.get(title) == isbn:
+            del self._by_title[title]
+            replacement = next((r[0] for r in self._by_isbn.values() if r[1] == title), None)
+            if replacement is not None:
+                self._by_title[title] = replacement
+        if self._by_normalized.get(normalized) == isbn:
+            del self._by_normalized[normalized]
+            replacement = next((r[0] for r in self._by_isbn.values() if normalize_title(r[1]) == normalized), None)
+            if replacement is not None:
+                self._by_normalized[normalized] = replacement
+
+    @staticmethod
+    def _as_dict(record: tuple) -> Dict[str, str]:
+        return dict(zip(FIELDS, record))
+
+
+# 서버 전체에서 공유하는 도서 카탈로그
+book_catalog = BookCatalog(os.getenv("BOOK_CATALOG_PATH", os.path.join("data", "book_catalog.sqlite")))
+registry.register_stats("book_catalog", book_catalog.stats)
+
+
+# 사용 예시: python -m utils.catalog books.jsonl
+if __name__ == "__main__":
+    paths: List[str] = sys.argv[1:]
+    for import_path in paths:
+        count = book_catalog.import_file(import_path)
+        print(f"{import_path}: {count}권을 가져왔습니다.")
+    print(f"카탈로그에 {len(book_catalog)}권이 있습니다.")
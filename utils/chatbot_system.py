@@ -1,17 +1,16 @@
+import logging
+import os
+import threading
 from dotenv import load_dotenv
-from langchain.chat_models import ChatOpenAI
-from langchain.agents import initialize_agent, AgentType
-from langchain_community.tools.tavily_search import TavilySearchResults
+from .llm import get_chat_model
+from .llm_scheduler import QueueFullError
+from .replay import wrap_tool
+from .tool_cache import cache_tool
 
 # 환경 변수 로드
 load_dotenv()
 
-# Tavily 도구 초기화
-tool = TavilySearchResults(max_results=5)
-tools = [tool]
-
-# 언어 모델 초기화
-llm = ChatOpenAI(model="chatgpt-4o-latest", temperature=1)
+logger = logging.getLogger(__name__)
 
 # 시스템 메시지 설정
 system_message = """당신은 사용자에게 모든 질문에 대해 자연스럽고 친절하게 답변할 수 있는 비서입니다.
@@ -61,23 +60,68 @@ system_message = """당신은 사용자에게 모든 질문에 대해 자연스
 - 줄 바꿈이 발생할 경우 <br>를 붙여주세요.
 """
 
-# 에이전트 초기화
-agent_executor = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-    verbose=True,
-    agent_kwargs={
-        "system_message": system_message
-    }
-)
+_agent_executor = None
+_agent_lock = threading.Lock()
+
+
+def build_agent_executor():
+    """
+    Tavily 검색 도구를 사용하는 ReAct 에이전트를 생성합니다.
+    LangChain 에이전트와 Tavily 모듈은 임포트 비용이 크고 API 키가 있어야 만들 수 있으므로 처음 필요할 때 불러옵니다.
+    """
+    from langchain.agents import AgentType, initialize_agent
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+    # Tavily 도구 (REPLAY_MODE 가 설정되면 기록/재생 래퍼로 감싸고, 검색 결과는 검색어별로 캐시)
+    tool = cache_tool(wrap_tool(TavilySearchResults(max_results=5)))
+    return initialize_agent(
+        tools=[tool],
+        # 언어 모델 (최적화 단계와 연결 풀을 공유)
+        llm=get_chat_model(temperature=1),
+        agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
+        # 에이전트의 중간 사고 과정을 표준 출력에 쓰는 비용이 크므로 필요할 때만 켬
+        verbose=os.getenv("AGENT_VERBOSE", "0").lower() in ("1", "true", "on", "yes"),
+        agent_kwargs={
+            "system_message": system_message
+        }
+    )
+
+
+def get_agent_executor():
+    """
+    요청 간에 공유하는 에이전트를 반환합니다.
+    처음 호출될 때 한 번만 생성합니다 (API 키가 없으면 이때 오류가 납니다).
+    """
+    global _agent_executor
+    if _agent_executor is None:
+        with _agent_lock:
+            if _agent_executor is None:
+                _agent_executor = build_agent_executor()
+    return _agent_executor
+
 
 class ChatbotSystem:
     """
     Chatbot 시스템을 초기화하고 메시지를 통해 응답을 생성하는 클래스입니다.
+    에이전트를 지정하지 않으면 처음 응답을 생성할 때 공유 에이전트를 만듭니다.
     """
-    def __init__(self):
-        self.agent_executor = agent_executor
+    def __init__(self, agent_executor=None):
+        """
+        Args:
+            agent_executor (AgentExecutor, optional): 사용할 에이전트 (없으면 get_agent_executor)
+        """
+        self._agent_executor = agent_executor
+
+    @property
+    def agent_executor(self):
+        """응답 생성에 사용할 에이전트를 반환합니다."""
+        if self._agent_executor is None:
+            self._agent_executor = get_agent_executor()
+        return self._agent_executor
+
+    @agent_executor.setter
+    def agent_executor(self, agent_executor):
+        self._agent_executor = agent_executor
 
     def generate_response(self, state):
         """
@@ -90,34 +134,78 @@ class ChatbotSystem:
             dict: 업데이트된 상태를 반환합니다.
         """
         last_message = state["messages"][-1]["content"]
-        # 대화 기록 추출 (마지막 메시지 제외)
-        chat_history = [(msg["role"], msg["content"]) for msg in state["messages"][:-1]]
+        # 대화 기록 추출 (history 노드가 줄인 기록, 없으면 마지막 메시지를 제외한 전체)
+        chat_history = self._chat_history(state)
         try:
             # 에이전트를 사용하여 응답 생성
             response = self.agent_executor({
                 "input": last_message,
                 "chat_history": chat_history
             })['output']
-            # 응답 내 줄바꿈을 '<br>'로 변환
-            response = response.replace("\n", "<br>")
-            # 응답을 메시지 리스트에 추가
-            state["messages"].append({
-                "role": "assistant",
-                "content": response
-            })
-            # 상태 업데이트
-            state["response"] = response
+            self._apply_response(state, response)
+        except QueueFullError:
+            # 요청 한도 초과는 사과 문구로 바꾸지 않고 서버가 503 으로 응답하도록 그대로 전달
+            raise
         except Exception as e:
-            # 오류 발생 시 기본 메시지 설정
-            print(f"Chatbot generation error: {e}")
-            error_message = "죄송합니다, 현재 요청을 처리할 수 없습니다. 다시 시도해주세요."
-            state["messages"].append({
-                "role": "assistant",
-                "content": error_message
+            self._apply_error(state, e)
+        return state
+
+    async def agenerate_response(self, state):
+        """
+        generate_response의 비동기 버전입니다. 에이전트를 비동기로 실행하여 워커 스레드를 점유하지 않습니다.
+
+        Args:
+            state (dict): 현재 대화 상태를 담은 딕셔너리
+
+        Returns:
+            dict: 업데이트된 상태를 반환합니다.
+        """
+        last_message = state["messages"][-1]["content"]
+        chat_history = self._chat_history(state)
+        try:
+            result = await self.agent_executor.ainvoke({
+                "input": last_message,
+                "chat_history": chat_history
             })
-            state["response"] = error_message
+            self._apply_response(state, result['output'])
+        except QueueFullError:
+            raise
+        except Exception as e:
+            self._apply_error(state, e)
         return state
 
+    @staticmethod
+    def _chat_history(state):
+        """에이전트에 전달할 (역할, 내용) 형식의 대화 기록을 만듭니다."""
+        messages = state.get("context")
+        if messages is None:
+            messages = state["messages"][:-1]
+        return [(msg["role"], msg["content"]) for msg in messages]
+
+    @staticmethod
+    def _apply_response(state, response):
+        """에이전트 응답을 상태에 반영합니다."""
+        # 응답 내 줄바꿈을 '<br>'로 변환
+        response = response.replace("\n", "<br>")
+        # 응답을 메시지 리스트에 추가
+        state["messages"].append({
+            "role": "assistant",
+            "content": response
+        })
+        # 상태 업데이트
+        state["response"] = response
+
+    @staticmethod
+    def _apply_error(state, e):
+        """오류 발생 시 기본 메시지를 상태에 반영합니다."""
+        logger.error("Chatbot generation error: %s", e)
+        error_message = "죄송합니다, 현재 요청을 처리할 수 없습니다. 다시 시도해주세요."
+        state["messages"].append({
+            "role": "assistant",
+            "content": error_message
+        })
+        state["response"] = error_message
+
 # 챗봇 인스턴스 생성
 chatbot_system = ChatbotSystem()
 
@@ -134,3 +222,16 @@ def chatbot(state):
         dict: 업데이트된 상태를 반환합니다.
     """
     return chatbot_system.generate_response(state)
+
+
+async def achatbot(state):
+    """
+    chatbot 함수의 비동기 버전입니다.
+
+    Args:
+        state (dict): 현재 대화 상태를 담은 딕셔너리
+
+    Returns:
+        dict: 업데이트된 상태를 반환합니다.
+    """
+    return await chatbot_system.agenerate_response(state)
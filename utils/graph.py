@@ -1,10 +1,38 @@
-from typing import List, Dict
+import os
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 from typing_extensions import TypedDict
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, StateGraph, START
 from .custom_types import State
-from .chatbot_system import chatbot
+from .chatbot_system import achatbot, chatbot
 from .judgement import decide_next_node, is_about_author, is_about_books, is_about_negative
-from .optimization import Optimization
+from .llm_scheduler import BATCH, QueueFullError, set_priority
+from .memory.history import history_manager
+from .memory.sqlite_checkpointer import SQLiteCheckpointer
+from .metrics import registry, run_callbacks
+from .optimization import get_optimizer
+from .router import DIRECT_ROUTES, aroute_question, route_question
+from .semantic_cache import normalize_question, semantic_cache
+from .singleflight import SingleFlight
+from .streaming import StreamEventHandler
+from .timing import NodeTimingHandler
+
+logger = logging.getLogger(__name__)
+
+# 오류 시 반환되는 기본 응답 (캐시하지 않음)
+FALLBACK_MESSAGES = (
+    "죄송합니다, 현재 요청을 처리할 수 없습니다. 다시 시도해주세요.",
+    "죄송하지만, 응답을 최적화할 수 없습니다.",
+    "죄송하지만, 답변을 생성할 수 없습니다.",
+)
 
 # GraphState 클래스 정의
 class GraphState(TypedDict):
@@ -17,55 +45,130 @@ class GraphState(TypedDict):
     is_book_question: bool
     is_negative: bool
     documents: List[str]
-    
+    conversation_id: str
+    # history 노드가 만든 토큰 예산 내의 이전 대화 기록 (요약 포함)
+    context: List[Dict[str, str]]
+    # messages 에서 이번 턴이 시작되는 위치
+    turn_start: int
+    # router 노드가 정한 경로 ('book', 'author' 이면 에이전트 없이 최적화 단계에서 바로 답변)
+    route: str
+
+def history_node(state: GraphState) -> GraphState:
+    """이전 대화 기록을 토큰 예산에 맞게 줄여 두 LLM 단계가 함께 쓸 기록을 만듭니다."""
+    previous = state["messages"][:-1]
+    state["context"] = history_manager.window(previous, state.get("conversation_id"))
+    state["turn_start"] = len(previous)
+    return state
+
+def conversation_view(state: GraphState) -> List[Dict[str, str]]:
+    """history 노드가 줄인 이전 기록 뒤에 이번 턴의 메시지를 붙여 반환합니다."""
+    if "context" not in state:
+        return state.get("messages", [])
+    return state["context"] + state["messages"][state.get("turn_start", 0):]
+
+def router_node(state: GraphState) -> GraphState:
+    """사용자의 질문을 분류하여 에이전트를 거칠지, 최적화 단계에서 바로 답변할지 정합니다."""
+    return _apply_route(state, route_question(state["messages"][-1]["content"]))
+
+async def arouter_node(state: GraphState) -> GraphState:
+    """router_node의 비동기 버전입니다."""
+    return _apply_route(state, await aroute_question(state["messages"][-1]["content"]))
+
+def _apply_route(state: GraphState, route: str) -> GraphState:
+    """
+    분류 결과를 상태에 반영합니다.
+    명확한 책/작가 질문은 질문 자체를 최적화 단계의 입력으로 사용합니다.
+    """
+    logger.debug("Question routed to %s", route)
+    state["route"] = route
+    if route in DIRECT_ROUTES:
+        state["response"] = state["messages"][-1]["content"]
+        state["is_book_question"] = route == "book"
+        state["is_author_question"] = route == "author"
+        state["is_negative"] = False
+    return state
+
+def decide_route(state: GraphState) -> str:
+    """router 노드의 분류 결과로 다음 노드('optimization' 또는 'chatbot')를 정합니다."""
+    return "optimization" if state.get("route") in DIRECT_ROUTES else "chatbot"
+
 def judgement_node(state: GraphState) -> GraphState:
     """챗봇의 응답을 기반으로 책 질문인지, 작가 질문인지 및 부정적인 단어 포함 여부를 판단합니다."""
-    print("---JUDGEMENT NODE---")
+    logger.debug("---JUDGEMENT NODE---")
     response = state["response"]
     state["is_negative"] = is_about_negative(response)
     state["is_book_question"] = is_about_books(response)
     state["is_author_question"] = is_about_author(response)
     return state
 
+# 최적화 단계의 요청별 추가 지침
+OPTIMIZATION_INSTRUCTIONS = "응답이 친근하고 환영하는 느낌이 들도록 해주세요."
+
 def optimize_node(state: GraphState) -> GraphState:
     """생성된 응답을 원하는 톤과 스타일로 최적화합니다."""
-    print("---OPTIMIZE RESPONSE---")
+    logger.debug("---OPTIMIZE RESPONSE---")
     try:
         initial_response = state.get("response", "")
         num_books = 2 if state.get("is_author_question", False) else 1
-        optimizer = Optimization(
-            tone="친절한",
-            style="설득력 있는",
-            additional_instructions="응답이 친근하고 환영하는 느낌이 들도록 해주세요.",
-            conversation_history=state.get("messages", []),
+        state["generation"] = get_optimizer().optimize_response(
+            initial_response,
+            num_books=num_books,
+            conversation_history=_optimization_history(state),
+            additional_instructions=OPTIMIZATION_INSTRUCTIONS,
+            # 챗봇 응답에 있는 책 제목은 LLM 이 답변을 만드는 동안 미리 조회
+            candidate_text=initial_response,
         )
-        state["generation"] = optimizer.optimize_response(initial_response, num_books=num_books)
+    except QueueFullError:
+        raise
     except Exception as e:
-        print(f"Optimization failed: {e}")
+        logger.exception("Optimization failed: %s", e)
         state["generation"] = "죄송하지만, 응답을 최적화할 수 없습니다."
     return state
 
-def graph_main(state: State) -> Dict:
-    """그래프를 실행하여 최종 응답을 생성합니다."""
-    # 초기 그래프 상태 설정
-    class State(TypedDict):
-    # 사용자 대화 내역
-        messages: List[Dict[str, str]]
-        question: str
-        response: str
-        generation: str
-        is_author_question: bool
-        is_book_question: bool
-        is_negative: bool
-        documents: List[str]
-    
-    # 그래프 정의 및 실행
+async def aoptimize_node(state: GraphState) -> GraphState:
+    """optimize_node의 비동기 버전입니다."""
+    logger.debug("---OPTIMIZE RESPONSE---")
+    try:
+        initial_response = state.get("response", "")
+        num_books = 2 if state.get("is_author_question", False) else 1
+        state["generation"] = await get_optimizer().aoptimize_response(
+            initial_response,
+            num_books=num_books,
+            conversation_history=_optimization_history(state),
+            additional_instructions=OPTIMIZATION_INSTRUCTIONS,
+            # 챗봇 응답에 있는 책 제목은 LLM 이 답변을 만드는 동안 미리 조회
+            candidate_text=initial_response,
+        )
+    except QueueFullError:
+        raise
+    except Exception as e:
+        logger.exception("Optimization failed: %s", e)
+        state["generation"] = "죄송하지만, 응답을 최적화할 수 없습니다."
+    return state
+
+def _optimization_history(state: GraphState) -> List[Dict[str, str]]:
+    """
+    최적화 단계에 전달할 대화 기록을 만듭니다.
+    에이전트를 건너뛴 경우에는 사용자의 질문이 최적화 입력이 되므로 기록에서는 뺍니다.
+    """
+    history = conversation_view(state)
+    if state.get("route") in DIRECT_ROUTES:
+        return history[:-1]
+    return history
+
+def build_workflow() -> StateGraph:
+    """
+    기본 그래프(history → chatbot → judgement → optimization)를 정의합니다.
+    chatbot, optimization 노드는 동기/비동기 구현을 함께 가지므로 invoke 와 ainvoke 모두 지원합니다.
+    """
     workflow = StateGraph(GraphState)
-    workflow.add_node("chatbot", chatbot)
+    workflow.add_node("history", history_node)
+    workflow.add_node("chatbot", RunnableLambda(chatbot, afunc=achatbot))
     workflow.add_node("judgement", judgement_node)
-    workflow.add_node("optimization", optimize_node)
+    workflow.add_node("optimization", RunnableLambda(optimize_node, afunc=aoptimize_node))
     # 그래프 연결 설정
-    workflow.add_edge(START, "chatbot")
+    workflow.add_edge(START, "history")
+    workflow.add_edge("history", "chatbot")
     workflow.add_edge("chatbot", "judgement")
     workflow.add_conditional_edges(
         "judgement",
@@ -73,8 +176,570 @@ def graph_main(state: State) -> Dict:
         {"optimization": "optimization", "end": END},
     )
     workflow.add_edge("optimization", END)
-    # 그래프 컴파일 및 실행
-    lg_app = workflow.compile()
-    ans = lg_app.invoke(state)
+    return workflow
+
+
+def build_fast_workflow() -> StateGraph:
+    """
+    질문을 먼저 분류하는 그래프(history → router → optimization 또는 chatbot → judgement → optimization)를 정의합니다.
+    명확한 책/작가 질문은 에이전트를 건너뛰고 최적화 단계의 LLM 호출 한 번으로 답변합니다.
+    일반 대화와 최신 정보가 필요한 질문은 기본 그래프와 같이 에이전트가 처리합니다.
+    """
+    workflow = StateGraph(GraphState)
+    workflow.add_node("history", history_node)
+    workflow.add_node("router", RunnableLambda(router_node, afunc=arouter_node))
+    workflow.add_node("chatbot", RunnableLambda(chatbot, afunc=achatbot))
+    workflow.add_node("judgement", judgement_node)
+    workflow.add_node("optimization", RunnableLambda(optimize_node, afunc=aoptimize_node))
+    workflow.add_edge(START, "history")
+    workflow.add_edge("history", "router")
+    workflow.add_conditional_edges(
+        "router",
+        decide_route,
+        {"optimization": "optimization", "chatbot": "chatbot"},
+    )
+    workflow.add_edge("chatbot", "judgement")
+    workflow.add_conditional_edges(
+        "judgement",
+        decide_next_node,
+        {"optimization": "optimization", "end": END},
+    )
+    workflow.add_edge("optimization", END)
+    return workflow
+
+
+class GraphRegistry:
+    """
+    컴파일된 그래프를 이름별로 보관하는 레지스트리입니다.
+
+    그래프는 처음 요청될 때 한 번만 컴파일되고 이후 요청에서 재사용됩니다.
+    컴파일된 그래프는 상태를 갖지 않으므로 여러 스레드에서 동시에 invoke 해도 안전합니다.
+    각 그래프는 체크포인트 저장소 없이 컴파일한 버전과, 대화(thread_id)별로 상태를 저장하는
+    persistent 버전을 따로 가집니다.
+    """
+    def __init__(self, checkpointer_factory: Callable[[], object] = None):
+        """
+        Args:
+            checkpointer_factory (Callable, optional): persistent 그래프에 사용할 체크포인트 저장소를 만드는 함수
+        """
+        self._builders: Dict[str, Callable[[], StateGraph]] = {}
+        self._compiled: Dict[Tuple[str, bool], object] = {}
+        self._checkpointer_factory = checkpointer_factory
+        self._checkpointer = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, builder: Callable[[], StateGraph]) -> None:
+        """
+        그래프 변형을 등록합니다. 같은 이름으로 다시 등록하면 기존 컴파일 결과를 버립니다.
+
+        Args:
+            name (str): 그래프 이름
+            builder (Callable): 컴파일 전의 StateGraph를 반환하는 함수
+        """
+        with self._lock:
+            self._builders[name] = builder
+            self._compiled.pop((name, False), None)
+            self._compiled.pop((name, True), None)
+
+    def get(self, name: str = "default", persistent: bool = False):
+        """
+        컴파일된 그래프를 반환합니다. 아직 컴파일되지 않았다면 지금 컴파일합니다.
+
+        Args:
+            name (str): 그래프 이름
+            persistent (bool, optional): 체크포인트 저장소를 사용하는 버전을 반환할지 여부
+
+        Returns:
+            CompiledStateGraph: 컴파일된 그래프
+        """
+        key = (name, persistent)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is None:
+                if name not in self._builders:
+                    raise KeyError(f"등록되지 않은 그래프입니다: {name}")
+                checkpointer = self._get_checkpointer() if persistent else None
+                compiled = self._builders[name]().compile(checkpointer=checkpointer)
+                self._compiled[key] = compiled
+        return compiled
+
+    @property
+    def checkpointer(self):
+        """persistent 그래프가 사용하는 체크포인트 저장소를 반환합니다."""
+        with self._lock:
+            return self._get_checkpointer()
+
+    def _get_checkpointer(self):
+        """락을 잡은 상태에서 체크포인트 저장소를 처음 한 번만 생성합니다."""
+        if self._checkpointer is None:
+            if self._checkpointer_factory is None:
+                raise RuntimeError("체크포인트 저장소가 설정되지 않았습니다.")
+            self._checkpointer = self._checkpointer_factory()
+        return self._checkpointer
+
+    def warm_up(self, persistent: bool = False) -> None:
+        """등록된 모든 그래프를 미리 컴파일합니다."""
+        for name in list(self._builders):
+            self.get(name)
+            if persistent:
+                self.get(name, persistent=True)
+
+    def names(self) -> List[str]:
+        """등록된 그래프 이름 목록을 반환합니다."""
+        return list(self._builders)
+
+
+def _build_checkpointer() -> SQLiteCheckpointer:
+    """대화별 그래프 상태를 저장할 SQLite 체크포인트 저장소를 생성합니다."""
+    return SQLiteCheckpointer(
+        os.getenv("CHECKPOINT_DB", os.path.join("flask_session", "checkpoints.sqlite")),
+        keep_last=int(os.getenv("CHECKPOINT_KEEP_LAST", "10")),
+    )
+
+
+# 그래프 레지스트리 생성 및 기본 그래프 등록
+graph_registry = GraphRegistry(checkpointer_factory=_build_checkpointer)
+graph_registry.register("default", build_workflow)
+graph_registry.register("fast", build_fast_workflow)
+
+# 요청 처리에 사용하는 그래프 (CHATBOT_GRAPH=fast 이면 질문을 먼저 분류하는 그래프 사용)
+DEFAULT_GRAPH = os.getenv("CHATBOT_GRAPH", "default")
+
+# 동시에 들어온 같은 질문의 그래프 실행을 하나로 묶음
+graph_flight = SingleFlight("graph")
+registry.register_stats("graph_singleflight", graph_flight.stats)
+
+
+def get_graph(name: str = "default", persistent: bool = False):
+    """이름에 해당하는 컴파일된 그래프를 반환합니다."""
+    return graph_registry.get(name, persistent=persistent)
+
+
+def _run_config(thread_id: str = None, callbacks: list = None) -> Dict:
+    """
+    그래프 실행 설정을 만듭니다. thread_id 가 있으면 체크포인트 저장에 사용됩니다.
+    지표 수집이 켜져 있으면 노드/언어 모델/도구 실행 시간을 기록하는 핸들러가 콜백에 추가됩니다.
+    """
+    config = {}
+    if thread_id:
+        config["configurable"] = {"thread_id": thread_id}
+    callbacks = run_callbacks(callbacks)
+    if callbacks:
+        config["callbacks"] = callbacks
+    return config
+
+
+def graph_main(
+    state: State,
+    graph_name: str = DEFAULT_GRAPH,
+    thread_id: str = None,
+    use_cache: bool = True,
+    callbacks: list = None
+) -> Dict:
+    """
+    그래프를 실행하여 최종 응답을 생성합니다.
+    thread_id 가 주어지면 실행 상태를 체크포인트 저장소에 대화별로 저장합니다.
+    use_cache 가 True 이면 비슷한 질문의 캐시된 응답이 있을 때 그래프를 실행하지 않습니다.
+    정규화한 질문과 대화 기록이 같은 요청이 이미 실행 중이면 그 결과를 함께 받습니다 (결과에 coalesced 표시).
+    함께 받은 요청도 실행의 최종 상태를 자기 thread_id 에 체크포인트로 저장하고, 노드별 실행 시간을 콜백에 기록합니다.
+    callbacks 는 그래프 실행에 전달할 콜백 핸들러(예: NodeTimingHandler) 리스트입니다.
+    """
+    # 노드가 messages 를 직접 수정하므로 실행 전에 질문과 기록을 따로 보관
+    question, history = state["messages"][-1]["content"], list(state["messages"][:-1])
+    cached = _cached_generation(graph_name, question, history, use_cache)
+    if cached is not None:
+        return cached
+
+    def run() -> Tuple[Dict, Dict]:
+        timing = NodeTimingHandler()
+        lg_app = get_graph(graph_name, persistent=thread_id is not None)
+        ans = lg_app.invoke(state, config=_run_config(thread_id, [*(callbacks or []), timing]))
+        result = _store_generation(graph_name, question, history, _final_generation(ans), use_cache)
+        return result, {"values": ans, "thread_id": thread_id, "durations": timing.durations}
+
+    if not coalescing_enabled():
+        return run()[0]
+    (result, shared_run), shared = graph_flight.do(_flight_key(graph_name, question, history), run)
+    if not shared:
+        return result
+    _share_timings(callbacks, shared_run)
+    if thread_id is not None and thread_id != shared_run["thread_id"]:
+        try:
+            lg_app = get_graph(graph_name, persistent=True)
+            lg_app.update_state(
+                _run_config(thread_id), _shared_values(state, history, shared_run), as_node=_last_node(lg_app)
+            )
+        except Exception as e:
+            logger.error("함께 받은 실행 결과의 체크포인트 저장 실패 (%s): %s", thread_id, e)
+    return {**result, "coalesced": True}
+
+
+async def graph_main_async(
+    state: State,
+    graph_name: str = DEFAULT_GRAPH,
+    thread_id: str = None,
+    use_cache: bool = True,
+    callbacks: list = None
+) -> Dict:
+    """graph_main의 비동기 버전입니다. 그래프를 ainvoke 로 실행합니다."""
+    # 노드가 messages 를 직접 수정하므로 실행 전에 질문과 기록을 따로 보관
+    question, history = state["messages"][-1]["content"], list(state["messages"][:-1])
+    cached = _cached_generation(graph_name, question, history, use_cache)
+    if cached is not None:
+        return cached
+
+    async def run() -> Tuple[Dict, Dict]:
+        timing = NodeTimingHandler()
+        lg_app = get_graph(graph_name, persistent=thread_id is not None)
+        ans = await lg_app.ainvoke(state, config=_run_config(thread_id, [*(callbacks or []), timing]))
+        result = _store_generation(graph_name, question, history, _final_generation(ans), use_cache)
+        return result, {"values": ans, "thread_id": thread_id, "durations": timing.durations}
+
+    if not coalescing_enabled():
+        return (await run())[0]
+    (result, shared_run), shared = await graph_flight.ado(_flight_key(graph_name, question, history), run)
+    if not shared:
+        return result
+    _share_timings(callbacks, shared_run)
+    if thread_id is not None and thread_id != shared_run["thread_id"]:
+        try:
+            lg_app = get_graph(graph_name, persistent=True)
+            await lg_app.aupdate_state(
+                _run_config(thread_id), _shared_values(state, history, shared_run), as_node=_last_node(lg_app)
+            )
+        except Exception as e:
+            logger.error("함께 받은 실행 결과의 체크포인트 저장 실패 (%s): %s", thread_id, e)
+    return {**result, "coalesced": True}
+
+
+def _shared_values(state: State, history: List[Dict[str, str]], shared_run: Dict) -> Dict:
+    """
+    함께 받은 실행의 최종 상태를 나중 요청의 대화에 맞게 고칩니다.
+    대화 기록은 같고 질문은 정규화한 결과만 같으므로 이번 턴의 질문과 대화 ID 만 바꿉니다.
+    """
+    values = dict(shared_run["values"])
+    messages = list(values.get("messages", []))
+    if len(messages) > len(history):
+        messages[len(history)] = state["messages"][-1]
+    values["messages"] = messages
+    if state.get("conversation_id"):
+        values["conversation_id"] = state["conversation_id"]
+    else:
+        values.pop("conversation_id", None)
+    return values
+
+
+def _share_timings(callbacks: Optional[list], shared_run: Dict) -> None:
+    """함께 받은 실행의 노드별 실행 시간을 나중 요청의 NodeTimingHandler 에 기록합니다."""
+    for handler in callbacks or []:
+        if isinstance(handler, NodeTimingHandler):
+            handler.add_durations(shared_run["durations"])
+
+
+def _last_node(lg_app) -> str:
+    """END 로 바로 이어지는 노드 이름을 반환합니다. 체크포인트를 실행이 끝난 상태로 기록할 때 사용합니다."""
+    return next(start for start, end in sorted(lg_app.builder.edges) if end == END)
+
+
+def coalescing_enabled() -> bool:
+    """COALESCE_REQUESTS 환경 변수가 0/false/off 가 아니면 True 를 반환합니다."""
+    return os.getenv("COALESCE_REQUESTS", "1").lower() not in ("0", "false", "off", "no")
+
+
+def _flight_key(graph_name: str, question: str, history: List[Dict[str, str]]) -> tuple:
+    """동시에 들어온 같은 요청을 묶기 위한 키 (그래프 이름, 정규화한 질문, 전체 대화 기록의 해시)를 만듭니다."""
+    history_hash = hashlib.sha1(json.dumps(history, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest() if history else ""
+    return graph_name, normalize_question(question), history_hash
+
+
+def _cached_generation(graph_name: str, question: str, history: List[Dict[str, str]], use_cache: bool) -> Dict:
+    """의미 기반 캐시에서 같은 그래프가 만든 비슷한 질문의 응답을 찾습니다. 없으면 None 을 반환합니다."""
+    if not use_cache:
+        semantic_cache.record_bypass()
+        return None
+    answer = semantic_cache.lookup(question, history, namespace=graph_name)
+    if answer is None:
+        return None
+    return {"generation": answer, "cached": True}
+
+
+def _store_generation(graph_name: str, question: str, history: List[Dict[str, str]], result: Dict, use_cache: bool) -> Dict:
+    """정상적으로 생성된 응답을 그래프 이름별로 의미 기반 캐시에 저장합니다."""
+    if use_cache and result["generation"] not in FALLBACK_MESSAGES:
+        semantic_cache.store(question, result["generation"], history, namespace=graph_name)
+    return result
+
+
+# 배치 실행의 기본 동시 실행 수 (LLM 호출이 대부분이라 스레드가 기다리는 시간이 대부분임)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+def graph_batch_iter(
+    states: List[State],
+    graph_name: str = DEFAULT_GRAPH,
+    thread_ids: Optional[List[str]] = None,
+    use_cache: bool = True,
+    max_concurrency: Optional[int] = None
+) -> Iterator[Tuple[int, Dict]]:
+    """
+    여러 대화를 최대 max_concurrency 개씩 동시에 graph_main 으로 실행하고, 끝나는 순서대로 결과를 돌려줍니다.
+    LLM 호출은 배치 우선순위로 실행되어 대화형 요청이 먼저 처리됩니다.
+    한 대화가 실패해도 나머지는 계속 실행되며, 실패한 대화의 결과는 {"error": 메시지} 입니다.
+    반복을 중간에 멈추면 아직 시작하지 않은 대화는 실행하지 않습니다.
+
+    Args:
+        states (list): 대화별 그래프 초기 상태 리스트
+        graph_name (str, optional): 실행할 그래프 이름
+        thread_ids (list, optional): 대화별 체크포인트 ID 리스트 (states 와 같은 길이)
+        use_cache (bool, optional): 의미 기반 응답 캐시 사용 여부
+        max_concurrency (int, optional): 동시에 실행할 대화 수 (기본 BATCH_CONCURRENCY)
+
+    Yields:
+        tuple: (states 안에서의 위치, 결과)
+    """
+    if not states:
+        return
+    thread_ids = thread_ids or [None] * len(states)
+    workers = max(1, min(max_concurrency or BATCH_CONCURRENCY, len(states)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="graph-batch")
+    try:
+        futures = {
+            # 요청 ID 와 trace 컨텍스트가 실행 스레드에서도 보이도록 컨텍스트를 복사해 실행
+            executor.submit(_batch_context().run, graph_main, state, graph_name, thread_id, use_cache): index
+            for index, (state, thread_id) in enumerate(zip(states, thread_ids))
+        }
+        for future in as_completed(futures):
+            yield futures[future], _batch_result(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def graph_batch(
+    states: List[State],
+    graph_name: str = DEFAULT_GRAPH,
+    thread_ids: Optional[List[str]] = None,
+    use_cache: bool = True,
+    max_concurrency: Optional[int] = None
+) -> List[Dict]:
+    """
+    graph_batch_iter 로 여러 대화를 동시에 실행하고, 모든 결과를 states 와 같은 순서의 리스트로 반환합니다.
+
+    Returns:
+        list: 대화별 결과 (실패한 대화는 {"error": 메시지})
+    """
+    results: List[Dict] = [None] * len(states)
+    for index, result in graph_batch_iter(states, graph_name, thread_ids, use_cache, max_concurrency):
+        results[index] = result
+    return results
+
+
+async def graph_batch_iter_async(
+    states: List[State],
+    graph_name: str = DEFAULT_GRAPH,
+    thread_ids: Optional[List[str]] = None,
+    use_cache: bool = True,
+    max_concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[int, Dict]]:
+    """graph_batch_iter의 비동기 버전입니다. graph_main_async 를 세마포어로 동시 실행 수를 제한하여 실행합니다."""
+    if not states:
+        return
+    thread_ids = thread_ids or [None] * len(states)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or BATCH_CONCURRENCY))
+
+    async def run(index: int, state: State, thread_id: str) -> Tuple[int, Dict]:
+        # 태스크마다 컨텍스트가 복사되므로 이 태스크의 LLM 호출만 배치 우선순위가 됨
+        set_priority(BATCH)
+        async with semaphore:
+            try:
+                return index, await graph_main_async(state, graph_name, thread_id, use_cache)
+            except QueueFullError as e:
+                logger.warning("Batch item %d rejected: %s", index, e)
+                return index, {"error": str(e)}
+            except Exception as e:
+                logger.exception("Batch item %d failed: %s", index, e)
+                return index, {"error": str(e) or type(e).__name__}
+
+    tasks = [asyncio.ensure_future(run(index, state, thread_id)) for index, (state, thread_id) in enumerate(zip(states, thread_ids))]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _batch_context() -> contextvars.Context:
+    """현재 컨텍스트를 복사하고, LLM 호출이 대화형 요청보다 뒤에 처리되도록 배치 우선순위를 설정합니다."""
+    context = contextvars.copy_context()
+    context.run(set_priority, BATCH)
+    return context
+
+
+def _batch_result(future) -> Dict:
+    """배치 실행 결과를 꺼냅니다. 실행 중 예외가 났으면 오류 결과를 반환합니다."""
+    try:
+        return future.result()
+    except QueueFullError as e:
+        logger.warning("Batch item rejected: %s", e)
+        return {"error": str(e)}
+    except Exception as e:
+        logger.exception("Batch item failed: %s", e)
+        return {"error": str(e) or type(e).__name__}
+
+
+def load_checkpointed_history(thread_id: str) -> List[Dict[str, str]]:
+    """
+    체크포인트 저장소에 남아 있는 대화의 마지막 상태로 대화 기록을 복원합니다.
+    재시작한 워커가 클라이언트의 히스토리 재전송 없이 대화를 이어갈 때 사용합니다.
+
+    Args:
+        thread_id (str): 대화 ID
+
+    Returns:
+        list: 대화 기록 (없으면 빈 리스트)
+    """
+    snapshot = get_graph(DEFAULT_GRAPH, persistent=True).get_state(_run_config(thread_id))
+    values = snapshot.values or {}
+    messages = list(values.get("messages", []))
+    # 챗봇 노드가 추가한 응답을 사용자에게 실제로 보낸 최종 응답으로 교체
+    final_response = values.get("generation")
+    if final_response and messages and messages[-1].get("role") == "assistant":
+        messages[-1] = {"role": "assistant", "content": final_response}
+    elif final_response and messages:
+        # 에이전트를 건너뛴 턴은 챗봇 응답 없이 최종 응답만 있음
+        messages.append({"role": "assistant", "content": final_response})
+    return messages
+
+
+def graph_stream(state: State, graph_name: str = DEFAULT_GRAPH, thread_id: str = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    그래프를 백그라운드 스레드에서 실행하면서 토큰과 진행 상황 이벤트를 발생 순서대로 돌려줍니다.
+    마지막에는 최종 응답을 담은 answer 이벤트와 done 이벤트가 옵니다.
+
+    Args:
+        state (State): 그래프 초기 상태
+        graph_name (str, optional): 실행할 그래프 이름
+        thread_id (str, optional): 체크포인트 저장에 사용할 대화 ID
+
+    Yields:
+        tuple: (이벤트 이름, 데이터)
+    """
+    events: "queue.Queue" = queue.Queue()
+    handler = StreamEventHandler(events)
+    done = object()
+
+    def run():
+        try:
+            final_state = {}
+            lg_app = get_graph(graph_name, persistent=thread_id is not None)
+            config = _run_config(thread_id, callbacks=[handler])
+            for values in lg_app.stream(state, config=config, stream_mode="values"):
+                final_state = values
+            events.put(("answer", {"text": _final_generation(final_state)["generation"]}))
+        except QueueFullError as e:
+            events.put(("error", {"message": "요청이 많아 지금은 답변할 수 없습니다. 잠시 후 다시 시도해주세요.", "retry_after": e.retry_after}))
+        except Exception as e:
+            logger.exception("Graph streaming failed: %s", e)
+            events.put(("error", {"message": "죄송하지만, 답변을 생성할 수 없습니다."}))
+        finally:
+            events.put(done)
+
+    # 요청의 trace 컨텍스트를 그래프 실행 스레드에 넘김
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), name="graph-stream", daemon=True).start()
+    while True:
+        item = events.get()
+        if item is done:
+            yield "done", {}
+            return
+        yield item
+
+
+class _LoopQueue:
+    """다른 스레드에서 호출되어도 이벤트 루프의 asyncio.Queue 에 순서대로 넣는 큐 어댑터입니다. (동기 콜백 핸들러용)"""
+    def __init__(self, loop: asyncio.AbstractEventLoop, events: "asyncio.Queue"):
+        self.loop = loop
+        self.events = events
+
+    def put(self, item) -> None:
+        self.loop.call_soon_threadsafe(self.events.put_nowait, item)
+
+
+async def graph_stream_async(state: State, graph_name: str = DEFAULT_GRAPH, thread_id: str = None) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    graph_stream의 비동기 버전입니다. 그래프를 astream 으로 실행하면서 이벤트를 발생 순서대로 돌려줍니다.
+    이벤트를 다 받기 전에 반복을 멈추면(예: 클라이언트 연결 종료) 그래프 실행을 취소합니다.
+    """
+    events: "asyncio.Queue" = asyncio.Queue()
+    sink = _LoopQueue(asyncio.get_running_loop(), events)
+    handler = StreamEventHandler(sink)
+    done = object()
+
+    async def run():
+        try:
+            final_state = {}
+            lg_app = get_graph(graph_name, persistent=thread_id is not None)
+            config = _run_config(thread_id, callbacks=[handler])
+            async for values in lg_app.astream(state, config=config, stream_mode="values"):
+                final_state = values
+            sink.put(("answer", {"text": _final_generation(final_state)["generation"]}))
+        except QueueFullError as e:
+            sink.put(("error", {"message": "요청이 많아 지금은 답변할 수 없습니다. 잠시 후 다시 시도해주세요.", "retry_after": e.retry_after}))
+        except Exception as e:
+            logger.exception("Graph streaming failed: %s", e)
+            sink.put(("error", {"message": "죄송하지만, 답변을 생성할 수 없습니다."}))
+        finally:
+            sink.put(done)
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            item = await events.get()
+            if item is done:
+                yield "done", {}
+                return
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def build_initial_state(question: str, history: List[Dict[str, str]] = None, conversation_id: str = None) -> Dict:
+    """
+    클라이언트가 보낸 메시지와 히스토리로 그래프의 초기 상태를 만듭니다.
+
+    Args:
+        question (str): 사용자의 새 메시지
+        history (list, optional): 이전 대화 기록
+        conversation_id (str, optional): 대화 ID (대화 요약 캐시 키로 사용)
+
+    Returns:
+        dict: 그래프 초기 상태 (체크포인트에 남은 이전 턴의 generation, route 를 덮어쓰도록 비워 둠)
+    """
+    if history:
+        state = {
+            "messages": [
+                *history,
+                {"role": "user", "content": question}
+            ]
+        }
+    else:
+        state = {
+            "messages": [
+                {"role": "user", "content": question}
+            ]
+        }
+    state["generation"] = ""
+    state["route"] = ""
+    if conversation_id:
+        state["conversation_id"] = conversation_id
+    return state
+
+
+def _final_generation(ans: Dict) -> Dict:
+    """그래프 실행 결과에서 최종 응답을 꺼냅니다."""
     final_response = ans.get("generation") or ans.get("response", "죄송하지만, 답변을 생성할 수 없습니다.")
     return {"generation": final_response}
@@ -78,6 +78,63 @@ def decide_next_node(state: Dict) -> str:
     else:
         return "end"
 
+# 질문 분류에 사용하는 책 관련 단어 (응답 판단용 목록보다 좁게 잡아 일상 대화를 책 질문으로 보지 않도록 함)
+QUESTION_BOOK_KEYWORDS = [
+    '책', '소설', '에세이', '시집', '문학', '도서', '서적', '작가', '저자',
+    '베스트셀러', '만화책', '동화', '자기계발서', '인문서', '그림책'
+]
+
+# 다른 낱말의 일부로도 쓰이는 단어는 책을 뜻하는 경우에만 맞도록 패턴으로 찾음
+# (예: '산책', '책임', '책상' 의 '책', '시집가다' 의 '시집')
+QUESTION_KEYWORD_PATTERNS = {
+    '책': r'(?:만화|그림|소설|전자|동화|요리|종이)책|(?<![가-힣])책(?!임|상|략|정|망)',
+    '시집': r'시집(?!\s*가|살이)',
+}
+QUESTION_BOOK_PATTERN = re.compile('|'.join(
+    QUESTION_KEYWORD_PATTERNS.get(keyword, re.escape(keyword)) for keyword in QUESTION_BOOK_KEYWORDS
+))
+
+# 추천이나 책 정보를 요청하는 표현
+REQUEST_PATTERNS = [
+    r'추천',
+    r'알려\s*(줘|주세요|줄래|달라)',
+    r'소개\s*(해|좀)',
+    r'읽을\s*(만한|만 한|거|것)',
+    r'읽고\s*싶',
+    r'골라\s*(줘|주세요)',
+    r'뭐\s*(가|를)?\s*(읽|볼)'
+]
+
+# 웹 검색이 필요한 최신 정보 요청 (에이전트가 검색 도구로 처리해야 함)
+TIME_SENSITIVE_KEYWORDS = [
+    '요즘', '최근', '최신', '신간', '이번 주', '이번 달', '올해', '오늘', '뉴스',
+    '순위', '수상', '출간 예정', '가격', '할인', '재고', '이벤트'
+]
+
+def classify_question(question: str) -> str:
+    """
+    사용자의 질문을 규칙으로 분류합니다.
+    검색 없이 바로 추천할 수 있는 명확한 질문만 'book' 또는 'author' 로 분류합니다.
+
+    Args:
+        question (str): 사용자의 질문 문자열
+
+    Returns:
+        str: 'author'(작가 질문), 'book'(명확한 책 추천 요청), 'chat'(일반 대화), 'unknown'(규칙으로 판단할 수 없음) 중 하나
+    """
+    if any(keyword in question for keyword in TIME_SENSITIVE_KEYWORDS):
+        return "chat"
+    mentions_book = QUESTION_BOOK_PATTERN.search(question) is not None
+    requests_book = any(re.search(pattern, question) for pattern in REQUEST_PATTERNS)
+    # 작가를 묻거나 특정 작가의 책을 요청하는 질문은 2권을 추천하는 작가 질문으로 처리
+    if is_about_author(question) or (requests_book and re.search(r'작가|저자', question)):
+        return "author"
+    if mentions_book and requests_book:
+        return "book"
+    if not mentions_book and not requests_book:
+        return "chat"
+    return "unknown"
+
 # 예시로 상태 딕셔너리를 생성하여 함수 동작을 확인합니다.
 if __name__ == "__main__":
     # 테스트 응답 문자열
@@ -0,0 +1,92 @@
+import os
+import threading
+from typing import Dict, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from .llm_scheduler import schedule_chat_model
+from .metrics import httpx_event_hooks, metrics_enabled
+from .replay import wrap_chat_model
+from .tracing import trace_enabled
+
+# 환경 변수 로드
+load_dotenv()
+
+# 챗봇과 최적화 단계에서 사용하는 기본 모델
+DEFAULT_MODEL = "chatgpt-4o-latest"
+
+_lock = threading.Lock()
+_clients = None
+_models: Dict[Tuple[str, float, bool], BaseChatModel] = {}
+
+
+def _openai_clients() -> tuple:
+    """
+    모든 모델이 공유하는 OpenAI 클라이언트(동기/비동기)를 반환합니다.
+    클라이언트마다 HTTP 연결 풀을 가지므로, 한 쌍만 만들어 keep-alive 연결을 재사용합니다.
+    """
+    global _clients
+    if _clients is None:
+        # openai 는 임포트 비용이 크므로 처음 클라이언트를 만들 때 불러옴
+        import openai
+
+        # 호출하는 쪽(get_chat_model)이 _lock 을 잡고 있음
+        pool_size = int(os.getenv("LLM_POOL_SIZE", "32"))
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        # 지표 수집이나 trace 전파가 꺼져 있으면 훅을 달지 않아 요청마다 드는 비용이 없음
+        instrumented = metrics_enabled() or trace_enabled()
+        hooks = httpx_event_hooks("openai") if instrumented else None
+        async_hooks = httpx_event_hooks("openai", asynchronous=True) if instrumented else None
+        _clients = (
+            # 재시도는 스케줄러(llm_scheduler)가 요청 한도를 고려하여 처리
+            openai.OpenAI(max_retries=0, http_client=openai.DefaultHttpxClient(limits=limits, event_hooks=hooks)),
+            openai.AsyncOpenAI(max_retries=0, http_client=openai.DefaultAsyncHttpxClient(limits=limits, event_hooks=async_hooks)),
+        )
+    return _clients
+
+
+def warm_up_clients(connect: bool = False) -> None:
+    """
+    공유 OpenAI 클라이언트(연결 풀)를 미리 만듭니다.
+    connect 가 True 이면 모델 목록을 한 번 조회하여 첫 요청 전에 TLS 연결을 열어 둡니다.
+    """
+    with _lock:
+        client, _ = _openai_clients()
+    if connect:
+        client.models.list()
+
+
+def get_chat_model(temperature: float, model: str = DEFAULT_MODEL, streaming: bool = True) -> BaseChatModel:
+    """
+    공유 연결 풀을 사용하는 ChatOpenAI 인스턴스를 반환합니다.
+    같은 설정의 모델은 한 번만 만들어 모든 요청에서 재사용합니다 (ChatOpenAI 는 상태를 갖지 않음).
+    REPLAY_MODE 가 설정되면 호출을 기록하거나 재생하는 래퍼로 감싸서 반환합니다.
+    모든 호출은 모델별 공유 스케줄러(llm_scheduler)를 거쳐 요청 한도 안에서 실행됩니다.
+
+    Args:
+        temperature (float): 샘플링 온도
+        model (str, optional): 모델 이름
+        streaming (bool, optional): 토큰 스트리밍 사용 여부
+
+    Returns:
+        BaseChatModel: 언어 모델
+    """
+    key = (model, temperature, streaming)
+    chat_model = _models.get(key)
+    if chat_model is not None:
+        return chat_model
+    with _lock:
+        if key not in _models:
+            from langchain.chat_models import ChatOpenAI
+
+            client, async_client = _openai_clients()
+            _models[key] = schedule_chat_model(wrap_chat_model(ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                streaming=streaming,
+                client=client.chat.completions,
+                async_client=async_client.chat.completions,
+            )), model)
+        return _models[key]
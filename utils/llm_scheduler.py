@@ -0,0 +1,466 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+from .memory.history import count_tokens
+from .metrics import registry
+
+# 요청 우선순위 (값이 작을수록 먼저 처리)
+INTERACTIVE = 0
+BATCH = 1
+
+# 현재 요청의 우선순위 (배치 실행은 BATCH 로 설정)
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+# 토큰 버킷에 한 번에 쌓일 수 있는 양 (몇 초 분량의 한도까지 몰아서 보낼 수 있는지)
+BURST_SECONDS = 10.0
+
+
+class QueueFullError(RuntimeError):
+    """LLM 호출 대기열이 가득 차서 요청을 받을 수 없을 때 발생하는 예외입니다."""
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM 호출 대기열이 가득 찼습니다. {retry_after:.0f}초 후에 다시 시도해주세요.")
+        self.retry_after = retry_after
+
+
+def set_priority(priority: int) -> None:
+    """현재 컨텍스트에서 실행되는 LLM 호출의 우선순위를 설정합니다."""
+    _priority.set(priority)
+
+
+def current_priority() -> int:
+    """현재 컨텍스트의 LLM 호출 우선순위를 반환합니다."""
+    return _priority.get()
+
+
+class _Waiter:
+    """대기열에서 차례를 기다리는 호출 하나입니다. 동기 호출은 event, 비동기 호출은 future 로 깨웁니다."""
+    __slots__ = ("tokens", "event", "loop", "future", "admitted", "cancelled")
+
+    def __init__(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tokens = tokens
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.admitted = False
+        self.cancelled = False
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMScheduler:
+    """
+    한 모델에 대한 모든 LLM 호출이 거쳐 가는 스케줄러입니다.
+
+    분당 요청 수(rpm)와 분당 토큰 수(tpm)를 토큰 버킷으로 관리하고, 동시에 진행 중인 호출 수를 제한합니다.
+    한도를 넘는 호출은 우선순위 대기열에서 기다리며(대화형 요청이 배치 작업보다 먼저),
+    대기열이 가득 차면 기다리지 않고 바로 QueueFullError 를 발생시킵니다.
+    제공자가 429 를 돌려주면 penalize 로 Retry-After 동안 새 호출을 보내지 않습니다.
+    """
+    def __init__(
+        self,
+        rpm: float,
+        tpm: float,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            rpm (float): 분당 최대 요청 수
+            tpm (float): 분당 최대 토큰 수
+            max_concurrency (int): 동시에 진행할 수 있는 최대 호출 수
+            max_queue (int): 대기열의 최대 길이
+            queue_timeout (float): 대기열에서 기다릴 수 있는 최대 시간(초)
+            clock (Callable, optional): 토큰 버킷과 일시 정지에 쓰는 현재 시각(초) 함수 (테스트에서 시간을 고정할 때 사용)
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self._request_capacity = max(1.0, rpm / 60 * BURST_SECONDS)
+        self._token_capacity = max(1.0, tpm / 60 * BURST_SECONDS)
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity
+        self._refilled_at = clock()
+        self._paused_until = 0.0
+        self._inflight = 0
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    def acquire(self, tokens: int, priority: int = INTERACTIVE) -> None:
+        """
+        호출을 보낼 차례가 될 때까지 기다립니다.
+
+        Args:
+            tokens (int): 이 호출이 사용할 것으로 예상되는 토큰 수
+            priority (int, optional): 우선순위 (INTERACTIVE 또는 BATCH)
+
+        Raises:
+            QueueFullError: 대기열이 가득 찼거나 queue_timeout 안에 차례가 오지 않은 경우
+        """
+        waiter = self._enqueue(_Waiter(tokens), priority)
+        if not waiter.event.wait(self.queue_timeout):
+            with self._lock:
+                if not waiter.admitted:
+                    waiter.cancelled = True
+                    self.rejected += 1
+                    raise QueueFullError(self._retry_after())
+
+    async def aacquire(self, tokens: int, priority: int = INTERACTIVE) -> None:
+        """acquire 의 비동기 버전입니다. 기다리는 동안 이벤트 루프를 막지 않습니다."""
+        waiter = self._enqueue(_Waiter(tokens, asyncio.get_running_loop()), priority)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if not waiter.admitted:
+                    waiter.cancelled = True
+                    self.rejected += 1
+                    raise QueueFullError(self._retry_after())
+        except asyncio.CancelledError:
+            # 요청이 취소되면 대기열에서 빼거나, 이미 차례를 받았으면 돌려줌
+            with self._lock:
+                admitted = waiter.admitted
+                waiter.cancelled = True
+            if admitted:
+                self.release(tokens, 0)
+            raise
+
+    def release(self, estimated_tokens: int, used_tokens: Optional[int] = None) -> None:
+        """
+        호출이 끝났음을 알립니다. 실제 사용량을 알면 예상치와의 차이만큼 토큰 버킷을 조정합니다.
+
+        Args:
+            estimated_tokens (int): acquire 에 넘긴 예상 토큰 수
+            used_tokens (int, optional): 실제 사용한 토큰 수 (모르면 None)
+        """
+        with self._lock:
+            self._inflight -= 1
+            if used_tokens is not None:
+                self._tokens = min(self._token_capacity, self._tokens + estimated_tokens - used_tokens)
+            self._dispatch()
+
+    def penalize(self, retry_after: float) -> None:
+        """제공자가 요청 한도 초과(429)를 알렸을 때 retry_after 초 동안 새 호출을 보내지 않습니다."""
+        with self._lock:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, self.clock() + retry_after)
+            self._requests = min(self._requests, 0.0)
+
+    def record_retry(self) -> None:
+        """실패한 호출을 다시 시도한 횟수를 셉니다."""
+        with self._lock:
+            self.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        스케줄러 통계를 반환합니다.
+
+        Returns:
+            dict: 대기 중(queued)·진행 중(inflight) 호출 수와 누적 허용/거절/재시도/429 횟수
+        """
+        with self._lock:
+            return {
+                "queued": sum(1 for _, _, waiter in self._queue if not waiter.cancelled),
+                "inflight": self._inflight,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+            }
+
+    def _enqueue(self, waiter: _Waiter, priority: int) -> _Waiter:
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self._queue = [entry for entry in self._queue if not entry[2].cancelled]
+                heapq.heapify(self._queue)
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(self._retry_after())
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            self._dispatch()
+        return waiter
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._requests = min(self._request_capacity, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self._token_capacity, self._tokens + elapsed * self.tpm / 60)
+
+    def _dispatch(self) -> None:
+        """락을 잡은 상태에서 차례가 된 호출을 대기열 앞에서부터 깨웁니다."""
+        now = self.clock()
+        self._refill(now)
+        while self._queue:
+            waiter = self._queue[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if self._inflight >= self.max_concurrency:
+                return
+            # 버킷보다 큰 호출도 버킷이 가득 차면 보낼 수 있도록 필요한 양을 버킷 크기로 제한
+            tokens = min(waiter.tokens, self._token_capacity)
+            wait = max(
+                self._paused_until - now,
+                (1 - self._requests) * 60 / self.rpm,
+                (tokens - self._tokens) * 60 / self.tpm,
+            )
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._queue)
+            self._requests -= 1
+            self._tokens -= waiter.tokens
+            self._inflight += 1
+            self.admitted += 1
+            waiter.admitted = True
+            waiter.wake()
+
+    def _schedule(self, delay: float) -> None:
+        """버킷이 다시 찰 때 대기열을 확인하도록 타이머를 겁니다."""
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _retry_after(self) -> float:
+        """대기열이 빌 때까지 걸릴 것으로 예상되는 시간(초)을 계산합니다."""
+        pending = len(self._queue) + self._inflight
+        return max(1.0, math.ceil(max(pending * 60 / self.rpm, self._paused_until - self.clock())))
+
+
+def retry_delay(error: Exception, attempt: int, base: float = 0.5, cap: float = 8.0) -> Optional[float]:
+    """
+    재시도할 수 있는 오류이면 기다릴 시간(초)을, 아니면 None 을 반환합니다.
+    429 응답에 Retry-After 가 있으면 그 값을, 없으면 지수 백오프에 무작위 지연(full jitter)을 사용합니다.
+
+    Args:
+        error (Exception): 발생한 예외
+        attempt (int): 지금까지 재시도한 횟수 (0부터)
+        base (float, optional): 첫 백오프 시간(초)
+        cap (float, optional): 최대 백오프 시간(초)
+
+    Returns:
+        float: 기다릴 시간(초) 또는 None
+    """
+    # openai 는 임포트 비용이 크므로 오류를 분류할 때 불러옴 (이미 호출이 실패했으므로 로드되어 있음)
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        retry_after = error.response.headers.get("retry-after") if error.response is not None else None
+        try:
+            return float(retry_after) + random.uniform(0, base)
+        except (TypeError, ValueError):
+            pass
+    elif not isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return None
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    언어 모델 호출이 스케줄러의 차례를 받은 뒤에만 실행되도록 감싸는 래퍼입니다.
+    429, 연결 오류, 5xx 오류는 백오프 후 max_retries 번까지 다시 시도합니다.
+    """
+    inner: BaseChatModel
+    scheduler: Any
+    max_retries: int = 3
+    completion_tokens: int = 600
+
+    @property
+    def _llm_type(self) -> str:
+        return f"scheduled-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # 지표(모델 이름 레이블)와 캐시 키에 감싼 모델의 설정을 그대로 사용
+        return self.inner._identifying_params
+
+    @staticmethod
+    def _prompt_tokens(messages: List[BaseMessage]) -> int:
+        """프롬프트의 토큰 수를 셉니다."""
+        return sum(count_tokens(message.content) for message in messages if isinstance(message.content, str))
+
+    def _estimate(self, prompt_tokens: int) -> int:
+        """프롬프트 길이와 예상 응답 길이로 이 호출의 토큰 사용량을 추정합니다."""
+        return prompt_tokens + (getattr(self.inner, "max_tokens", None) or self.completion_tokens)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt_tokens = self._prompt_tokens(messages)
+        estimate = self._estimate(prompt_tokens)
+        for attempt in itertools.count():
+            self.scheduler.acquire(estimate, current_priority())
+            try:
+                result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt, estimate)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # KeyboardInterrupt 등으로 중단되어도 차례를 돌려줌
+                self.scheduler.release(estimate)
+                raise
+            self.scheduler.release(estimate, _used_tokens(result, prompt_tokens))
+            return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt_tokens = self._prompt_tokens(messages)
+        estimate = self._estimate(prompt_tokens)
+        for attempt in itertools.count():
+            await self.scheduler.aacquire(estimate, current_priority())
+            try:
+                result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt, estimate)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # 취소(CancelledError)나 KeyboardInterrupt 로 중단되어도 차례를 돌려줌
+                self.scheduler.release(estimate)
+                raise
+            self.scheduler.release(estimate, _used_tokens(result, prompt_tokens))
+            return result
+
+    def _on_error(self, error: Exception, attempt: int, estimate: int) -> Optional[float]:
+        """실패한 호출의 차례를 돌려주고, 다시 시도할 경우 기다릴 시간을 반환합니다."""
+        import openai
+
+        rate_limited = isinstance(error, openai.RateLimitError)
+        delay = retry_delay(error, attempt) if attempt < self.max_retries else None
+        # 차례를 돌려주기 전에 멈춰야 대기 중인 다른 호출이 바로 429 를 받지 않음
+        if rate_limited:
+            self.scheduler.penalize(delay or 1.0)
+        # 한도 초과로 거절된 호출은 토큰을 쓰지 않았으므로 돌려받음
+        self.scheduler.release(estimate, 0 if rate_limited else None)
+        if delay is not None:
+            self.scheduler.record_retry()
+        return delay
+
+
+def _used_tokens(result: ChatResult, prompt_tokens: int) -> int:
+    """
+    호출이 실제로 사용한 토큰 수를 반환합니다.
+    스트리밍 응답처럼 응답에 사용량이 기록되지 않았으면 프롬프트 토큰 수에 생성된 메시지의 토큰 수를 더해 셉니다.
+
+    Args:
+        result (ChatResult): 언어 모델 응답
+        prompt_tokens (int): 프롬프트의 토큰 수
+
+    Returns:
+        int: 사용한 토큰 수
+    """
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    if usage.get("total_tokens") is not None:
+        return usage["total_tokens"]
+    completion = sum(
+        count_tokens(generation.message.content)
+        for generation in result.generations
+        if isinstance(generation.message.content, str)
+    )
+    return prompt_tokens + completion
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(model: str) -> LLMScheduler:
+    """
+    모델별 공유 스케줄러를 반환합니다. (OpenAI 의 요청 한도는 모델마다 따로 적용됨)
+    설정은 LLM_RPM, LLM_TPM, LLM_MAX_CONCURRENCY, LLM_QUEUE_SIZE, LLM_QUEUE_TIMEOUT 환경 변수로 바꿀 수 있습니다.
+
+    Args:
+        model (str): 모델 이름
+
+    Returns:
+        LLMScheduler: 스케줄러
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(model)
+        if scheduler is None:
+            scheduler = _schedulers[model] = LLMScheduler(
+                rpm=float(os.getenv("LLM_RPM", "500")),
+                tpm=float(os.getenv("LLM_TPM", "200000")),
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", os.getenv("LLM_POOL_SIZE", "32"))),
+                max_queue=int(os.getenv("LLM_QUEUE_SIZE", "100")),
+                queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "30")),
+            )
+            registry.register_stats(f"llm_scheduler_{_metric_name(model)}", scheduler.stats)
+        return scheduler
+
+
+def _metric_name(model: str) -> str:
+    return "".join(char if char.isalnum() else "_" for char in model)
+
+
+def schedule_chat_model(chat_model: BaseChatModel, model: str) -> BaseChatModel:
+    """
+    언어 모델을 모델별 공유 스케줄러를 거치도록 감쌉니다. LLM_SCHEDULER=0 이면 그대로 반환합니다.
+
+    Args:
+        chat_model (BaseChatModel): 감쌀 언어 모델
+        model (str): 모델 이름 (스케줄러 선택에 사용)
+
+    Returns:
+        BaseChatModel: 스케줄러를 거치는 언어 모델
+    """
+    if os.getenv("LLM_SCHEDULER", "1").lower() in ("0", "false", "off", "no"):
+        return chat_model
+    return ScheduledChatModel(
+        inner=chat_model,
+        scheduler=get_scheduler(model),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+    )
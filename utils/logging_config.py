@@ -0,0 +1,203 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from .metrics import registry
+from .tracing import current_trace_id
+
+# 현재 요청의 ID (요청을 받을 때 set_request_id 로 설정)
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# LogRecord 의 기본 속성 (이외의 속성은 extra 로 넘어온 값으로 보고 JSON 에 포함)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "trace_id", "request_tag"}
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def set_request_id(request_id: Optional[str] = None) -> str:
+    """
+    현재 컨텍스트의 요청 ID 를 설정합니다. 값이 없으면 새로 만듭니다.
+
+    Args:
+        request_id (str, optional): 클라이언트가 보낸 요청 ID (예: X-Request-ID 헤더)
+
+    Returns:
+        str: 설정된 요청 ID
+    """
+    request_id = (request_id or "").strip()[:64] or uuid.uuid4().hex
+    _request_id.set(request_id)
+    return request_id
+
+
+def get_request_id() -> Optional[str]:
+    """현재 컨텍스트의 요청 ID 를 반환합니다."""
+    return _request_id.get()
+
+
+class Payload:
+    """
+    프롬프트나 LLM 출력처럼 큰 텍스트를 로그 인자로 넘길 때 감싸는 클래스입니다.
+    로그가 실제로 출력될 때만 문자열로 바뀌며, LOG_PAYLOAD_LIMIT 자를 넘으면 잘라서 출력합니다.
+
+    사용 예: logger.debug("Formatted prompt: %s", Payload(prompt))
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __len__(self) -> int:
+        return len(str(self.value))
+
+    def __str__(self) -> str:
+        text = str(self.value)
+        limit = int(os.getenv("LOG_PAYLOAD_LIMIT", "2000"))
+        if len(text) <= limit:
+            return text
+        return f"{text[:limit]}...(+{len(text) - limit}자)"
+
+
+class PayloadSampler(logging.Filter):
+    """
+    인자에 LOG_PAYLOAD_LIMIT 자를 넘는 Payload 가 있는 로그를 sample_rate 비율로만 남기는 필터입니다.
+    같은 요청의 큰 로그는 모두 남기거나 모두 버리도록 요청 ID 로 표본을 정합니다.
+    """
+    def __init__(self, sample_rate: float, limit: int):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.limit = limit
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate >= 1.0 or not isinstance(record.args, tuple):
+            return True
+        if not any(isinstance(arg, Payload) and len(arg) > self.limit for arg in record.args):
+            return True
+        request_id = getattr(record, "request_id", None)
+        sample = (hash(request_id) % 10000) / 10000 if request_id else random.random()
+        return sample < self.sample_rate
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    요청 스레드에서는 요청 ID 와 trace ID 만 기록에 붙여 큐에 넣고,
+    메시지 포맷과 출력은 QueueListener 스레드에서 처리하는 핸들러입니다.
+    """
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자는 출력 시점에 문자열로 바뀌므로, 로그를 남긴 뒤 바뀌는 객체는 인자로 넘기지 않아야 함
+        record.request_id = _request_id.get()
+        record.trace_id = current_trace_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # 출력이 밀려 큐가 가득 차면 요청 스레드를 막지 않고 버림
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            ContextQueueHandler.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 기록을 한 줄의 JSON 으로 만드는 포매터입니다."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "trace_id"):
+            if getattr(record, key, None):
+                entry[key] = getattr(record, key)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """개발용 한 줄 텍스트 포매터입니다. 요청 ID 가 있으면 함께 출력합니다."""
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(request_tag)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        request_id = getattr(record, "request_id", None)
+        record.request_tag = f" [{request_id}]" if request_id else ""
+        return super().format(record)
+
+
+def _parse_levels(spec: str) -> dict:
+    """'httpx=WARNING,utils.optimization=DEBUG' 형식의 로거별 레벨 설정을 읽습니다."""
+    levels = {}
+    for part in spec.split(","):
+        name, _, level = part.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    애플리케이션 로깅을 설정합니다. 여러 번 호출해도 한 번만 설정됩니다.
+
+    로그는 요청 스레드에서 큐에 넣기만 하고, 백그라운드 스레드가 포맷하여 표준 에러로 씁니다.
+    설정은 환경 변수로 바꿀 수 있습니다.
+        LOG_LEVEL: 루트 레벨 (기본 INFO)
+        LOG_LEVELS: 로거별 레벨 (예: "utils.optimization=DEBUG,httpx=WARNING")
+        LOG_FORMAT: json 또는 text (기본 json)
+        LOG_PAYLOAD_LIMIT: Payload 로 감싼 큰 텍스트의 최대 출력 길이 (기본 2000자)
+        LOG_PAYLOAD_SAMPLE_RATE: 최대 길이를 넘는 Payload 로그를 남기는 비율 (기본 1.0)
+        LOG_QUEUE_SIZE: 출력 대기 큐 크기, 가득 차면 새 로그를 버림 (기본 10000)
+
+    Args:
+        level (str, optional): LOG_LEVEL 대신 사용할 루트 레벨
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        formatter = TextFormatter() if os.getenv("LOG_FORMAT", "json").lower() == "text" else JsonFormatter()
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(formatter)
+        stream_handler.addFilter(PayloadSampler(
+            sample_rate=float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "1.0")),
+            limit=int(os.getenv("LOG_PAYLOAD_LIMIT", "2000")),
+        ))
+
+        log_queue: "queue.Queue" = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(ContextQueueHandler(log_queue))
+        root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+        for name, logger_level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(logger_level)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        registry.register_stats("log_queue", lambda: {"dropped": ContextQueueHandler.dropped, "size": log_queue.qsize()})
+
+
+def shutdown_logging() -> None:
+    """큐에 남은 로그를 모두 쓰고 백그라운드 스레드를 멈춥니다."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
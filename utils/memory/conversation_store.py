@@ -0,0 +1,165 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .session_backend import SessionBackend, session_backend
+
+logger = logging.getLogger(__name__)
+
+# 대화 ID는 uuid4 hex 형식만 허용 (파일 경로로 쓰이므로)
+_CONVERSATION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ConversationStore:
+    """
+    대화 기록을 서버에 보관하는 저장소입니다.
+
+    최근에 사용한 대화는 메모리에 두고, 모든 대화는 세션 저장소(SessionBackend)에 저장합니다.
+    메모리에는 최대 max_in_memory 개의 대화만 유지하며, idle_timeout 동안 사용되지 않은 대화는
+    메모리에서 내보냅니다. 내보낸 대화는 다음 요청 때 저장소에서 다시 읽습니다.
+    저장소에도 없으면 fallback_loader(예: 그래프 체크포인트 저장소)에서 복원을 시도합니다.
+    """
+    def __init__(
+        self,
+        backend: SessionBackend,
+        max_in_memory: int = 1000,
+        idle_timeout: float = 1800,
+        fallback_loader: Optional[Callable[[str], List[Dict[str, str]]]] = None
+    ):
+        """
+        Args:
+            backend (SessionBackend): 대화를 저장할 세션 저장소 (만료, 크기 제한, 정리 담당)
+            max_in_memory (int, optional): 메모리에 유지할 최대 대화 수
+            idle_timeout (float, optional): 메모리에서 내보내기까지의 유휴 시간(초)
+            fallback_loader (Callable, optional): 저장소에 없는 대화를 복원할 함수
+        """
+        self.backend = backend
+        self.fallback_loader = fallback_loader
+        self.max_in_memory = max_in_memory
+        self.idle_timeout = idle_timeout
+        # conversation_id -> (메시지 리스트, 마지막 사용 시각)
+        self._conversations: "OrderedDict[str, Tuple[List[Dict[str, str]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        """새 대화 ID를 만듭니다."""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def is_valid_id(conversation_id: Optional[str]) -> bool:
+        """대화 ID 형식이 올바른지 확인합니다."""
+        return bool(conversation_id) and bool(_CONVERSATION_ID_PATTERN.match(conversation_id))
+
+    def resolve(self, conversation_id: Optional[str], history: Optional[list] = None) -> Tuple[str, list]:
+        """
+        요청에 쓸 대화 ID와 대화 기록을 정합니다.
+        클라이언트가 history를 직접 보낸 경우 그것을 우선 사용합니다 (이전 방식 호환).
+
+        Args:
+            conversation_id (str, optional): 클라이언트가 보낸 대화 ID
+            history (list, optional): 클라이언트가 보낸 대화 기록
+
+        Returns:
+            tuple: (대화 ID, 대화 기록)
+        """
+        if not self.is_valid_id(conversation_id):
+            return self.new_id(), list(history or [])
+        if history:
+            return conversation_id, list(history)
+        return conversation_id, self.get_history(conversation_id)
+
+    def get_history(self, conversation_id: str) -> List[Dict[str, str]]:
+        """
+        대화 기록을 가져옵니다. 메모리에 없으면 저장소에서 읽습니다.
+
+        Args:
+            conversation_id (str): 대화 ID
+
+        Returns:
+            list: 대화 기록 (없으면 빈 리스트)
+        """
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._conversations.get(conversation_id)
+            if entry is not None:
+                self._conversations[conversation_id] = (entry[0], now)
+                self._conversations.move_to_end(conversation_id)
+                return list(entry[0])
+
+        messages = self._read(conversation_id)
+        if not messages and self.fallback_loader is not None:
+            try:
+                messages = self.fallback_loader(conversation_id)
+            except Exception as e:
+                logger.warning("Conversation restore failed: %s", e)
+                messages = []
+        if messages:
+            with self._lock:
+                self._remember(conversation_id, messages, now)
+        return list(messages)
+
+    def record_turn(self, conversation_id: str, question: str, answer: str, history: Optional[list] = None) -> None:
+        """
+        한 턴(사용자 질문과 챗봇 답변)을 대화 기록에 추가하고 저장소에 저장합니다. (저장할 때마다 만료 시각이 연장됨)
+
+        Args:
+            conversation_id (str): 대화 ID
+            question (str): 사용자 질문
+            answer (str): 챗봇 답변
+            history (list, optional): 이번 요청에 사용한 대화 기록 (없으면 저장소의 기록 사용)
+        """
+        messages = list(history) if history is not None else self.get_history(conversation_id)
+        messages.append({"role": "user", "content": question})
+        messages.append({"role": "assistant", "content": answer})
+        with self._lock:
+            self._remember(conversation_id, messages, time.time())
+        self._write(conversation_id, messages)
+
+    def delete(self, conversation_id: str) -> None:
+        """대화를 메모리와 저장소에서 삭제합니다."""
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+        self.backend.delete(conversation_id)
+
+    def _remember(self, conversation_id: str, messages: list, now: float) -> None:
+        """락을 잡은 상태에서 대화를 메모리에 넣고 크기 제한을 넘는 대화를 내보냅니다."""
+        self._conversations[conversation_id] = (messages, now)
+        self._conversations.move_to_end(conversation_id)
+        while len(self._conversations) > self.max_in_memory:
+            self._conversations.popitem(last=False)
+
+    def _evict_idle(self, now: float) -> None:
+        """락을 잡은 상태에서 오래 사용되지 않은 대화를 메모리에서 내보냅니다."""
+        while self._conversations:
+            conversation_id, (_, last_used) = next(iter(self._conversations.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            self._conversations.popitem(last=False)
+
+    def _read(self, conversation_id: str) -> List[Dict[str, str]]:
+        """저장소에서 대화 기록을 읽습니다."""
+        try:
+            value = self.backend.get(conversation_id)
+        except Exception as e:
+            logger.warning("Conversation read failed: %s", e)
+            return []
+        return value.get("messages", []) if isinstance(value, dict) else []
+
+    def _write(self, conversation_id: str, messages: list) -> None:
+        """대화 기록을 저장소에 저장합니다."""
+        self.backend.set(conversation_id, {"messages": messages})
+
+
+# 서버 전체에서 공유하는 대화 저장소
+conversation_store = ConversationStore(
+    backend=session_backend,
+    max_in_memory=int(os.getenv("CONVERSATION_MAX_IN_MEMORY", "1000")),
+    idle_timeout=float(os.getenv("CONVERSATION_IDLE_TIMEOUT", "1800")),
+)
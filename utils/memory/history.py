@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from ..cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# 요약 메시지 앞에 붙는 머리말
+SUMMARY_PREFIX = "이전 대화 요약: "
+
+SUMMARY_INSTRUCTIONS = """다음은 사용자와 책 추천 비서의 이전 대화입니다.
+이후 대화에 필요한 정보(사용자의 취향, 언급된 책 제목과 작가, 이미 추천한 책)만 남기고 한국어로 간결하게 요약하세요.
+요약은 5문장을 넘지 않게 작성하세요."""
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수를 계산합니다.
+    tiktoken을 사용할 수 없으면 한국어 기준 대략적인 추정치(2글자당 1토큰)를 사용합니다.
+
+    Args:
+        text (str): 토큰 수를 셀 텍스트
+
+    Returns:
+        int: 토큰 수
+    """
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text) // 2 + 1
+
+
+def _default_summarizer(previous_summary: str, messages: List[Dict[str, str]]) -> str:
+    """LLM을 사용하여 이전 요약과 새로 밀려난 대화를 합쳐 새 요약을 만듭니다."""
+    from ..llm import get_chat_model
+
+    llm = get_chat_model(temperature=0, model=os.getenv("HISTORY_SUMMARY_MODEL", "gpt-4o-mini"), streaming=False)
+    transcript = "\n".join(f"{msg.get('role', '')}: {msg.get('content', '')}" for msg in messages)
+    prompt = SUMMARY_INSTRUCTIONS
+    if previous_summary:
+        prompt += f"\n\n[기존 요약]\n{previous_summary}"
+    prompt += f"\n\n[추가된 대화]\n{transcript}"
+    return llm.invoke([("human", prompt)]).content.strip()
+
+
+class HistoryManager:
+    """
+    LLM에 전달할 대화 기록을 토큰 예산 안으로 줄이는 클래스입니다.
+
+    최근 max_turns 턴은 원문 그대로 두고, 예산을 넘는 오래된 턴은 누적 요약 하나로 바꿉니다.
+    요약은 대화별로 캐시되며, 새로 밀려난 턴만 기존 요약에 더해 갱신합니다.
+    """
+    def __init__(
+        self,
+        max_turns: int = 6,
+        token_budget: int = 1500,
+        summarizer: Optional[Callable[[str, List[Dict[str, str]]], str]] = None,
+        summary_cache: Optional[TTLCache] = None
+    ):
+        """
+        Args:
+            max_turns (int, optional): 원문으로 유지할 최대 턴 수 (1턴 = 사용자 + 비서 메시지)
+            token_budget (int, optional): 원문으로 유지할 메시지의 최대 토큰 수
+            summarizer (Callable, optional): (기존 요약, 추가 메시지) -> 새 요약
+            summary_cache (TTLCache, optional): 대화별 요약 캐시
+        """
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summarizer = summarizer or _default_summarizer
+        self.summary_cache = summary_cache or TTLCache(maxsize=2048, ttl=6 * 3600)
+
+    def window(self, messages: List[Dict[str, str]], conversation_id: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        대화 기록을 토큰 예산에 맞춘 형태로 반환합니다.
+
+        Args:
+            messages (list): 이전 대화 기록 (이번 사용자 메시지 제외)
+            conversation_id (str, optional): 요약 캐시 키로 사용할 대화 ID
+
+        Returns:
+            list: 필요하면 맨 앞에 요약(system) 메시지가 붙은 최근 대화 기록
+        """
+        cut = self._window_start(messages)
+        if cut == 0:
+            return list(messages)
+
+        older = messages[:cut]
+        summary = self._summary_for(older, conversation_id)
+        recent = list(messages[cut:])
+        if not summary:
+            return recent
+        return [{"role": "system", "content": f"{SUMMARY_PREFIX}{summary}"}] + recent
+
+    def _window_start(self, messages: List[Dict[str, str]]) -> int:
+        """원문으로 유지할 메시지가 시작되는 인덱스를 계산합니다."""
+        max_messages = self.max_turns * 2
+        used_tokens = 0
+        start = len(messages)
+        for index in range(len(messages) - 1, -1, -1):
+            tokens = count_tokens(messages[index].get("content", ""))
+            if len(messages) - index > max_messages or used_tokens + tokens > self.token_budget:
+                break
+            used_tokens += tokens
+            start = index
+        # 턴이 중간에서 잘리지 않도록 비서 메시지로 시작하면 한 칸 뒤로
+        if start < len(messages) and messages[start].get("role") == "assistant":
+            start += 1
+        return start
+
+    def _summary_for(self, older: List[Dict[str, str]], conversation_id: Optional[str]) -> str:
+        """
+        밀려난 메시지들의 요약을 반환합니다.
+        캐시된 요약이 앞부분을 이미 덮고 있으면 나머지 메시지만 더해 갱신합니다.
+        """
+        key = conversation_id or self._digest(older[:2])
+        cached = self.summary_cache.get(key)
+        covered, covered_digest, summary = 0, "", ""
+        if cached is not MISSING:
+            covered, covered_digest, summary = cached
+            # 대화가 바뀐 경우(앞부분이 다름) 처음부터 다시 요약
+            if covered > len(older) or self._digest(older[:covered]) != covered_digest:
+                covered, summary = 0, ""
+
+        if covered == len(older):
+            return summary
+
+        try:
+            summary = self.summarizer(summary, older[covered:])
+        except Exception as e:
+            logger.error("대화 요약 실패: %s", e)
+            return summary
+
+        self.summary_cache.set(key, [len(older), self._digest(older), summary])
+        return summary
+
+    @staticmethod
+    def _digest(messages: List[Dict[str, str]]) -> str:
+        hasher = hashlib.sha1()
+        for msg in messages:
+            hasher.update(msg.get("role", "").encode("utf-8"))
+            hasher.update(b"\0")
+            hasher.update(msg.get("content", "").encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+
+# 두 LLM 단계(챗봇, 최적화)가 공유하는 대화 기록 관리자
+history_manager = HistoryManager(
+    max_turns=int(os.getenv("HISTORY_MAX_TURNS", "6")),
+    token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "1500")),
+)
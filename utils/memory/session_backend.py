@@ -0,0 +1,573 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..metrics import registry, session_store_duration
+
+logger = logging.getLogger(__name__)
+
+# 세션 키는 파일 이름으로도 쓰이므로 영문, 숫자, '-', '_' 만 허용
+_KEY_PATTERN = re.compile(r"^[0-9A-Za-z_-]{1,128}$")
+# Flask-Session(cachelib) 이 남긴 세션 파일 이름 (키의 md5 hex)
+_LEGACY_NAME_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _valid_key(key: str) -> bool:
+    return bool(key) and bool(_KEY_PATTERN.match(key))
+
+
+class SessionBackend:
+    """
+    서버 측 세션(대화 기록 등)을 보관하는 저장소의 공통 부분입니다.
+
+    값은 JSON으로 직렬화할 수 있어야 하며 키마다 만료 시각(TTL)을 함께 저장합니다.
+    만료된 항목과 깨진 항목은 조회 시 없는 것으로 취급하고, compact() 가 실제로 지웁니다.
+    compact() 는 항목 수(max_entries)와 전체 크기(max_bytes) 제한을 넘으면 오래 갱신되지 않은 항목부터 지우며,
+    start_compaction() 으로 백그라운드 스레드에서 주기적으로 실행할 수 있습니다.
+    legacy_dir 가 주어지면 Flask-Session 이 남긴 파일 중 만료되었거나 비어 있는 파일도 함께 정리합니다.
+    """
+    name = "base"
+
+    def __init__(
+        self,
+        ttl: float = 30 * 24 * 3600,
+        max_entries: int = 100000,
+        max_bytes: int = 512 * 1024 * 1024,
+        legacy_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            ttl (float, optional): 항목의 기본 만료 시간(초)
+            max_entries (int, optional): 보관할 최대 항목 수 (0 이면 제한 없음)
+            max_bytes (int, optional): 보관할 최대 전체 크기(바이트, 0 이면 제한 없음)
+            legacy_dir (str, optional): 정리할 Flask-Session 파일 디렉토리
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.legacy_dir = legacy_dir
+        self._lock = threading.Lock()
+        self._entries = 0
+        self._bytes = 0
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "expired", "writes", "deletes", "evictions", "removed", "legacy_removed", "compactions"), 0)
+        self._compactor: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        저장된 값을 가져옵니다.
+
+        Args:
+            key (str): 세션 키
+
+        Returns:
+            Any: 저장된 값 (없거나 만료된 경우 None)
+        """
+        if not _valid_key(key):
+            return None
+        started = time.perf_counter()
+        record = self._read(key)
+        session_store_duration.observe(time.perf_counter() - started, backend=self.name, operation="get")
+        if record is None:
+            self._count("misses")
+            return None
+        value, expires_at = record
+        if expires_at <= time.time():
+            self._count("misses")
+            self._count("expired")
+            return None
+        self._count("hits")
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        값을 저장합니다. 크기 제한을 넘으면 백그라운드 정리를 앞당깁니다.
+
+        Args:
+            key (str): 세션 키
+            value (Any): JSON으로 직렬화할 수 있는 값
+            ttl (float, optional): 만료 시간(초, 기본값은 생성 시 설정)
+        """
+        if not _valid_key(key):
+            raise ValueError(f"Invalid session key: {key!r}")
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        payload = json.dumps({"value": value, "updated_at": now, "expires_at": expires_at}, ensure_ascii=False).encode("utf-8")
+        with session_store_duration.time(backend=self.name, operation="set"):
+            self._write(key, payload, now, expires_at)
+        self._count("writes")
+        if self._over_limit():
+            self._wake.set()
+
+    def delete(self, key: str) -> None:
+        """값을 삭제합니다."""
+        if not _valid_key(key):
+            return
+        with session_store_duration.time(backend=self.name, operation="delete"):
+            self._remove(key)
+        self._count("deletes")
+
+    def compact(self) -> Dict[str, int]:
+        """
+        만료되었거나 깨진 항목을 지우고, 크기 제한을 넘으면 오래 갱신되지 않은 항목부터 지웁니다.
+
+        Returns:
+            dict: 지운 항목 수 (removed: 만료/깨진 항목, evictions: 크기 제한, legacy_removed: Flask-Session 파일)
+        """
+        started = time.perf_counter()
+        removed, evictions = self._compact(time.time())
+        legacy_removed = self._sweep_legacy() if self.legacy_dir else 0
+        session_store_duration.observe(time.perf_counter() - started, backend=self.name, operation="compact")
+        self._count("removed", removed)
+        self._count("evictions", evictions)
+        self._count("legacy_removed", legacy_removed)
+        self._count("compactions")
+        if removed or evictions or legacy_removed:
+            logger.info("Session store compacted: %d stale, %d evicted, %d legacy files removed", removed, evictions, legacy_removed)
+        return {"removed": removed, "evictions": evictions, "legacy_removed": legacy_removed}
+
+    def start_compaction(self, interval: float) -> None:
+        """
+        백그라운드 스레드에서 바로 한 번, 이후 interval 초마다 compact() 를 실행합니다.
+        이미 실행 중이거나 interval 이 0 이하이면 아무것도 하지 않습니다.
+
+        Args:
+            interval (float): 정리 주기(초)
+        """
+        if interval <= 0:
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._stop.clear()
+            self._compactor = threading.Thread(
+                target=self._compaction_loop, args=(interval,), name=f"session-compactor-{self.name}", daemon=True)
+            self._compactor.start()
+
+    def stop_compaction(self) -> None:
+        """백그라운드 정리 스레드를 멈춥니다."""
+        self._stop.set()
+        self._wake.set()
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout=5)
+        self._compactor = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        저장소 통계를 반환합니다.
+
+        Returns:
+            dict: 조회 적중/실패, 쓰기/삭제, 정리 횟수와 항목 수(entries), 전체 크기(bytes)
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = self._entries
+            stats["bytes"] = self._bytes
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+    def close(self) -> None:
+        """정리 스레드를 멈춥니다."""
+        self.stop_compaction()
+
+    def _compaction_loop(self, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.compact()
+            except Exception as e:
+                logger.warning("Session store compaction failed: %s", e)
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _over_limit(self) -> bool:
+        with self._lock:
+            return bool(
+                (self.max_entries and self._entries > self.max_entries)
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            )
+
+    def _evict_order(self, items: List[Tuple[float, int, Any]]) -> List[Any]:
+        """
+        크기 제한을 맞추기 위해 지울 항목을 고릅니다.
+
+        Args:
+            items (list): (마지막 갱신 시각, 크기, 항목 식별자) 리스트
+
+        Returns:
+            list: 지울 항목 식별자 (오래 갱신되지 않은 순)
+        """
+        entries, total = len(items), sum(size for _, size, _ in items)
+        victims = []
+        for _, size, item in sorted(items, key=lambda item: item[0]):
+            if not ((self.max_entries and entries > self.max_entries) or (self.max_bytes and total > self.max_bytes)):
+                break
+            victims.append(item)
+            entries -= 1
+            total -= size
+        return victims
+
+    def _sweep_legacy(self) -> int:
+        """
+        Flask-Session(cachelib FileSystemCache) 이 남긴 파일 중 비어 있거나, 만료되었거나, 읽을 수 없는 파일을 지웁니다.
+        파일은 4바이트 만료 시각(0 이면 만료 없음) 뒤에 pickle 데이터가 오는 형식입니다.
+        """
+        try:
+            entries = list(os.scandir(self.legacy_dir))
+        except OSError:
+            return 0
+        now = time.time()
+        removed = 0
+        for entry in entries:
+            if not _LEGACY_NAME_PATTERN.match(entry.name) or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    header = f.read(4)
+                expires_at = struct.unpack("I", header)[0] if len(header) == 4 else None
+                if expires_at is None or (expires_at and expires_at <= now):
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(값, 만료 시각)을 읽습니다. 없거나 깨진 경우 None"""
+        raise NotImplementedError
+
+    def _write(self, key: str, payload: bytes, updated_at: float, expires_at: float) -> None:
+        raise NotImplementedError
+
+    def _remove(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _compact(self, now: float) -> Tuple[int, int]:
+        """만료/깨진 항목과 크기 제한을 넘는 항목을 지우고 (지운 항목 수, 제한으로 지운 항목 수)를 반환합니다."""
+        raise NotImplementedError
+
+
+def _decode(data: bytes, modified_at: float, ttl: float) -> Optional[Tuple[Any, float]]:
+    """
+    저장된 레코드를 (값, 만료 시각)으로 바꿉니다. 빈 파일이나 깨진 레코드는 None 을 반환합니다.
+    value 키가 없는 레코드(예전 ConversationStore 의 {"messages": ..., "updated_at": ...})는
+    updated_at 을 뺀 나머지를 값으로, 마지막 갱신 시각 + ttl 을 만료 시각으로 봅니다.
+    """
+    try:
+        record = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    if "value" in record and "expires_at" in record:
+        return record["value"], float(record["expires_at"])
+    updated_at = float(record.pop("updated_at", modified_at))
+    return record, updated_at + ttl
+
+
+class ShardedFileBackend(SessionBackend):
+    """
+    키마다 JSON 파일 하나에 저장하되, 키의 앞 두 글자로 나눈 하위 디렉토리(최대 수천 개)에 분산하는 저장소입니다.
+    한 디렉토리에 파일이 수만 개 쌓이면 조회가 느려지는 파일 시스템에서도 디렉토리마다 파일 수가 적게 유지됩니다.
+    directory 바로 아래에 있는 예전 형식의 파일({키}.json)은 조회할 때 하위 디렉토리로 옮깁니다.
+    """
+    name = "file"
+
+    def __init__(self, directory: str, **kwargs):
+        """
+        Args:
+            directory (str): 세션 파일을 저장할 디렉토리
+            **kwargs: SessionBackend 설정 (ttl, max_entries, max_bytes, legacy_dir)
+        """
+        super().__init__(**kwargs)
+        self.directory = directory
+        # 예전 형식의 파일이 남아 있을 수 있는지 여부 (정리 때 없음을 확인하면 조회 실패 시 찾지 않음)
+        self._has_flat = True
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _flat_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+                modified_at = os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return self._migrate(key) if self._has_flat else None
+        except OSError:
+            return None
+        return _decode(data, modified_at, self.ttl)
+
+    def _migrate(self, key: str) -> Optional[Tuple[Any, float]]:
+        """예전 형식의 파일이 있으면 하위 디렉토리로 옮기고 그 내용을 반환합니다."""
+        flat_path = self._flat_path(key)
+        try:
+            with open(flat_path, "rb") as f:
+                data = f.read()
+                modified_at = os.fstat(f.fileno()).st_mtime
+        except OSError:
+            return None
+        record = _decode(data, modified_at, self.ttl)
+        if record is not None:
+            try:
+                os.makedirs(os.path.dirname(self._path(key)), exist_ok=True)
+                os.replace(flat_path, self._path(key))
+            except OSError as e:
+                logger.warning("Session file migration failed: %s", e)
+        return record
+
+    def _write(self, key: str, payload: bytes, updated_at: float, expires_at: float) -> None:
+        """임시 파일에 쓴 뒤 교체하여 원자적으로 저장합니다."""
+        path = self._path(key)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = None
+        tmp_path = self._write_temp(os.path.dirname(path), key, payload)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if previous is None:
+                self._entries += 1
+                previous = 0
+            self._bytes += len(payload) - previous
+
+    @staticmethod
+    def _write_temp(directory: str, key: str, payload: bytes) -> str:
+        """
+        payload 를 directory 안의 새 임시 파일에 쓰고 그 경로를 반환합니다.
+        임시 파일 이름은 포크된 워커끼리도 겹치지 않도록 tempfile.mkstemp 로 만듭니다.
+        """
+        os.makedirs(directory, exist_ok=True)
+        try:
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=f"{key}.", dir=directory)
+        except FileNotFoundError:
+            # 다른 워커의 정리 작업이 그 사이에 빈 하위 디렉토리를 지운 경우 한 번 더 시도
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=f"{key}.", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _remove(self, key: str) -> None:
+        for path in (self._path(key), self._flat_path(key)):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            with self._lock:
+                self._entries -= 1
+                self._bytes -= size
+
+    def _compact(self, now: float) -> Tuple[int, int]:
+        removed = 0
+        has_flat = False
+        live: List[Tuple[float, int, str]] = []
+        for path, stat in self._scan():
+            has_flat = has_flat or os.path.dirname(path) == self.directory
+            if path.endswith(".tmp"):
+                # 쓰다가 중단된 임시 파일 (진행 중인 쓰기를 건드리지 않도록 1분 이상 지난 것만)
+                if now - stat.st_mtime > 60 and self._unlink(path):
+                    removed += 1
+                continue
+            record = None
+            if stat.st_size:
+                try:
+                    with open(path, "rb") as f:
+                        record = _decode(f.read(), stat.st_mtime, self.ttl)
+                except OSError:
+                    continue
+            if record is None or record[1] <= now:
+                if self._unlink(path):
+                    removed += 1
+                continue
+            live.append((stat.st_mtime, stat.st_size, path))
+
+        victims = self._evict_order(live)
+        evictions = sum(1 for path in victims if self._unlink(path))
+        victim_set = set(victims)
+        remaining = [(size, path) for _, size, path in live if path not in victim_set]
+        with self._lock:
+            self._entries = len(remaining)
+            self._bytes = sum(size for size, _ in remaining)
+        self._has_flat = has_flat
+        self._remove_empty_shards()
+        return removed, evictions
+
+    def _scan(self):
+        """저장소의 모든 세션 파일(예전 형식 포함)과 stat 결과를 나열합니다."""
+        try:
+            top = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in top:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    for child in os.scandir(entry.path):
+                        if child.is_file(follow_symlinks=False):
+                            yield child.path, child.stat(follow_symlinks=False)
+                elif entry.is_file(follow_symlinks=False) and (entry.name.endswith(".json") or entry.name.endswith(".tmp")):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+    def _remove_empty_shards(self) -> None:
+        try:
+            shards = [entry.path for entry in os.scandir(self.directory) if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for shard in shards:
+            try:
+                os.rmdir(shard)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _unlink(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    모든 세션을 SQLite 파일 하나에 저장하는 저장소입니다. 여러 워커가 같은 파일을 공유할 수 있습니다.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str, **kwargs):
+        """
+        Args:
+            path (str): SQLite 파일 경로
+            **kwargs: SessionBackend 설정 (ttl, max_entries, max_bytes, legacy_dir)
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, updated_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        self._conn.commit()
+        self._refresh_size()
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT value, updated_at FROM sessions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return _decode(row[0], row[1], self.ttl)
+
+    def _write(self, key: str, payload: bytes, updated_at: float, expires_at: float) -> None:
+        with self._db_lock:
+            previous = self._conn.execute("SELECT length(value) FROM sessions WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, updated_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, payload, updated_at, expires_at),
+            )
+            self._conn.commit()
+        with self._lock:
+            if previous is None:
+                self._entries += 1
+            self._bytes += len(payload) - (previous[0] if previous else 0)
+
+    def _remove(self, key: str) -> None:
+        with self._db_lock:
+            previous = self._conn.execute("SELECT length(value) FROM sessions WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+            self._conn.commit()
+        if previous is not None:
+            with self._lock:
+                self._entries -= 1
+                self._bytes -= previous[0]
+
+    def _compact(self, now: float) -> Tuple[int, int]:
+        with self._db_lock:
+            removed = self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,)).rowcount
+            self._conn.commit()
+            entries, total = self._conn.execute("SELECT count(*), coalesce(sum(length(value)), 0) FROM sessions").fetchone()
+            evictions = 0
+            if (self.max_entries and entries > self.max_entries) or (self.max_bytes and total > self.max_bytes):
+                rows = self._conn.execute("SELECT updated_at, length(value), key FROM sessions").fetchall()
+                victims = self._evict_order(rows)
+                self._conn.executemany("DELETE FROM sessions WHERE key = ?", [(key,) for key in victims])
+                self._conn.commit()
+                evictions = len(victims)
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._refresh_size()
+        return removed, evictions
+
+    def _refresh_size(self) -> None:
+        with self._db_lock:
+            entries, total = self._conn.execute("SELECT count(*), coalesce(sum(length(value)), 0) FROM sessions").fetchone()
+        with self._lock:
+            self._entries = entries
+            self._bytes = total
+
+    def close(self) -> None:
+        """정리 스레드를 멈추고 연결을 닫습니다."""
+        super().close()
+        with self._db_lock:
+            self._conn.close()
+
+
+def build_session_backend() -> SessionBackend:
+    """
+    환경 변수 설정으로 세션 저장소를 생성합니다.
+
+    - SESSION_BACKEND: file(기본, 하위 디렉토리로 나눈 JSON 파일) 또는 sqlite(파일 하나)
+    - SESSION_DIR: file 저장소의 디렉토리 (기본 CONVERSATION_DIR 또는 flask_session/conversations)
+    - SESSION_DB: sqlite 저장소의 파일 경로 (기본 flask_session/sessions.sqlite)
+    - SESSION_TTL: 만료 시간(초, 기본 30일)
+    - SESSION_MAX_ENTRIES, SESSION_MAX_MB: 항목 수와 전체 크기 제한 (0 이면 제한 없음)
+    - SESSION_LEGACY_DIR: 함께 정리할 Flask-Session 파일 디렉토리 (예: flask_session, 기본값은 빈 문자열로 정리하지 않음)
+    """
+    options = dict(
+        ttl=float(os.getenv("SESSION_TTL", str(30 * 24 * 3600))),
+        max_entries=int(os.getenv("SESSION_MAX_ENTRIES", "100000")),
+        max_bytes=int(float(os.getenv("SESSION_MAX_MB", "512")) * 1024 * 1024),
+        legacy_dir=os.getenv("SESSION_LEGACY_DIR", "") or None,
+    )
+    kind = os.getenv("SESSION_BACKEND", "file").lower()
+    if kind == "sqlite":
+        return SQLiteSessionBackend(os.getenv("SESSION_DB", os.path.join("flask_session", "sessions.sqlite")), **options)
+    if kind != "file":
+        logger.warning("Unknown SESSION_BACKEND %r, using file backend", kind)
+    directory = os.getenv("SESSION_DIR") or os.getenv("CONVERSATION_DIR", os.path.join("flask_session", "conversations"))
+    return ShardedFileBackend(directory, **options)
+
+
+# 정리 주기(초, 0 이면 백그라운드 정리를 하지 않음)
+COMPACT_INTERVAL = float(os.getenv("SESSION_COMPACT_INTERVAL", "600"))
+
+# 서버 전체에서 공유하는 세션 저장소
+session_backend = build_session_backend()
+registry.register_stats("session_store", session_backend.stats)
@@ -0,0 +1,412 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver):
+    """
+    LangGraph 체크포인트 저장소(BaseCheckpointSaver)를 SQLite로 구현한 클래스입니다.
+
+    - thread_id(대화 ID)별로 체크포인트를 저장하므로 재시작한 워커도 대화를 이어갈 수 있습니다.
+    - 체크포인트 하나는 하나의 트랜잭션으로 저장되어 중간에 끊겨도 깨지지 않습니다.
+    - WAL 모드와 synchronous=NORMAL 을 사용하고, sync_every 번 저장할 때마다 WAL 을 디스크에
+      반영(fsync, PASSIVE)하여 저장마다 fsync 하는 비용을 줄입니다.
+    - compact_every 번 저장할 때마다 백그라운드 스레드에서 대화별로 최근 keep_last 개만 남기고
+      오래된 체크포인트를 지웁니다. 저장한 요청은 압축을 기다리지 않습니다.
+    """
+    def __init__(
+        self,
+        path: str,
+        keep_last: int = 10,
+        sync_every: int = 50,
+        compact_every: int = 200,
+        serde=None
+    ):
+        """
+        Args:
+            path (str): SQLite 파일 경로
+            keep_last (int, optional): 압축 시 대화별로 남길 체크포인트 수
+            sync_every (int, optional): WAL 체크포인트(fsync)를 수행할 저장 간격
+            compact_every (int, optional): 자동 압축을 수행할 저장 간격 (0이면 자동 압축 안 함)
+            serde (SerializerProtocol, optional): 직렬화 도구
+        """
+        super().__init__(serde=serde)
+        self.path = path
+        self.keep_last = keep_last
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._puts_since_sync = 0
+        self._puts_since_compact = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        """락을 잡고 하나의 트랜잭션 안에서 커서를 제공합니다."""
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            else:
+                cur.execute("COMMIT")
+            finally:
+                cur.close()
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        체크포인트를 가져옵니다. checkpoint_id 가 없으면 해당 대화의 가장 최근 체크포인트를 반환합니다.
+
+        Args:
+            config (RunnableConfig): thread_id (와 선택적으로 checkpoint_id)를 담은 설정
+
+        Returns:
+            CheckpointTuple: 체크포인트 (없으면 None)
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self.lock:
+            if checkpoint_id:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            writes = self.conn.execute(
+                "SELECT task_id, channel, type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, row[0]),
+            ).fetchall()
+        return self._to_tuple(thread_id, checkpoint_ns, row, writes)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """
+        체크포인트를 최신 순으로 나열합니다.
+
+        Args:
+            config (RunnableConfig, optional): thread_id 로 범위를 좁힐 설정
+            filter (dict, optional): 메타데이터가 일치해야 하는 값
+            before (RunnableConfig, optional): 이 체크포인트보다 이전 것만 나열
+            limit (int, optional): 최대 개수
+
+        Yields:
+            CheckpointTuple: 체크포인트
+        """
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            if "checkpoint_ns" in config["configurable"]:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before is not None and get_checkpoint_id(before):
+            clauses.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC"
+        )
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        count = 0
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and count >= limit:
+                break
+            with self.lock:
+                writes = self.conn.execute(
+                    "SELECT task_id, channel, type, value FROM writes "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                    (thread_id, checkpoint_ns, row[0]),
+                ).fetchall()
+            checkpoint_tuple = self._to_tuple(thread_id, checkpoint_ns, row, writes)
+            if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            count += 1
+            yield checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """
+        체크포인트를 저장합니다.
+
+        Returns:
+            RunnableConfig: 저장한 체크포인트를 가리키는 설정
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(dict(metadata))
+        with self._transaction() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    checkpoint_type,
+                    checkpoint_blob,
+                    metadata_type,
+                    metadata_blob,
+                ),
+            )
+        self._after_put()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """체크포인트에 연결된 중간 쓰기(pending writes)를 저장합니다."""
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel,
+             *self.serde.dumps_typed(value))
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._transaction() as cur:
+            cur.executemany(
+                f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """대화의 모든 체크포인트를 삭제합니다."""
+        with self._transaction() as cur:
+            cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (str(thread_id),))
+            cur.execute("DELETE FROM writes WHERE thread_id = ?", (str(thread_id),))
+
+    def compact(self, keep_last: Optional[int] = None, vacuum: bool = False) -> int:
+        """
+        대화별로 최근 keep_last 개의 체크포인트만 남기고 나머지를 삭제합니다.
+
+        Args:
+            keep_last (int, optional): 남길 체크포인트 수 (기본값은 생성 시 설정)
+            vacuum (bool, optional): 삭제 후 파일 크기를 줄일지 여부
+
+        Returns:
+            int: 삭제된 체크포인트 수
+        """
+        keep_last = keep_last or self.keep_last
+        with self._transaction() as cur:
+            cur.execute(
+                "DELETE FROM checkpoints WHERE rowid IN ("
+                "  SELECT rowid FROM ("
+                "    SELECT rowid, ROW_NUMBER() OVER ("
+                "      PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rn"
+                "    FROM checkpoints)"
+                "  WHERE rn > ?)",
+                (keep_last,),
+            )
+            deleted = cur.rowcount
+            cur.execute(
+                "DELETE FROM writes WHERE NOT EXISTS ("
+                "  SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id"
+                "  AND c.checkpoint_ns = writes.checkpoint_ns AND c.checkpoint_id = writes.checkpoint_id)"
+            )
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if vacuum:
+                self.conn.execute("VACUUM")
+        return deleted
+
+    def flush(self) -> None:
+        """WAL 내용을 데이터베이스 파일에 반영(fsync)합니다."""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self._puts_since_sync = 0
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        """진행 중인 백그라운드 압축이 끝날 때까지 기다립니다."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def close(self) -> None:
+        """진행 중인 압축을 기다린 뒤 남은 내용을 반영하고 연결을 닫습니다."""
+        self.wait_for_compaction()
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+    def _after_put(self) -> None:
+        """
+        저장 횟수를 세어 sync_every 번마다 WAL 을 반영(PASSIVE, 읽기를 기다리지 않음)하고,
+        compact_every 번마다 백그라운드 압축을 시작합니다.
+        """
+        with self.lock:
+            self._puts_since_sync += 1
+            self._puts_since_compact += 1
+            compact = bool(self.compact_every) and self._puts_since_compact >= self.compact_every
+            if compact:
+                self._puts_since_compact = 0
+            if self._puts_since_sync >= self.sync_every:
+                self._puts_since_sync = 0
+                self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        if compact:
+            self._start_compaction()
+
+    def _start_compaction(self) -> None:
+        """백그라운드 압축 스레드를 시작합니다. 이미 실행 중이면 이번 압축은 건너뜁니다."""
+        with self.lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self._compact_in_background, name="checkpoint-compactor", daemon=True)
+            self._compactor.start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.warning("Checkpoint compaction failed: %s", e)
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence, writes: Sequence) -> CheckpointTuple:
+        """조회한 행을 CheckpointTuple 로 변환합니다."""
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint_blob, metadata_type, metadata_blob = row
+        return CheckpointTuple(
+            {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            self.serde.loads_typed((checkpoint_type, checkpoint_blob)),
+            self.serde.loads_typed((metadata_type, metadata_blob)) if metadata_type else {},
+            {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }
+            } if parent_checkpoint_id else None,
+            [
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
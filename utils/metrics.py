@@ -0,0 +1,315 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .tracing import outbound_headers
+
+# 지연 시간 히스토그램의 기본 구간(초): 네이버 조회(수십 ms)부터 에이전트 실행(수십 초)까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# register_stats 로 등록한 통계 중 gauge 로 내보내는 키 (나머지는 누적 counter)
+GAUGE_KEYS = ("size", "hit_rate", "entries", "inflight", "queued", "bytes")
+
+# /metrics 응답의 Content-Type (Prometheus 텍스트 형식)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_enabled() -> bool:
+    """METRICS_ENABLED 환경 변수가 0/false/off 가 아니면 True 를 반환합니다."""
+    return os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "off", "no")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """레이블별로 누적되는 Prometheus 카운터입니다."""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram:
+    """레이블별로 관측값 분포를 구간별 누적 개수로 기록하는 Prometheus 히스토그램입니다."""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 값 -> [구간별 개수..., +Inf 개수, 합계]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """with 블록의 실행 시간을 관측합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        counts = self._values.get(key)
+        return int(sum(counts[:-1])) if counts else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        lines = []
+        for key, counts in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, bucket_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {counts[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    지표를 모아 Prometheus 텍스트 형식(0.0.4)으로 내보내는 레지스트리입니다.
+
+    Counter/Histogram 외에, 기존 캐시의 stats() 처럼 호출 시점의 값을 돌려주는 함수를
+    register_stats 로 등록하면 /metrics 요청 때마다 값을 읽어 함께 내보냅니다.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._stats: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_stats(self, prefix: str, stats: Callable[[], Dict[str, float]]) -> None:
+        """
+        stats() 가 돌려주는 숫자 값을 {prefix}_{키} 지표로 내보냅니다.
+        size, hit_rate 처럼 증가만 하지 않는 값(GAUGE_KEYS)은 gauge, 나머지는 counter 로 내보냅니다.
+
+        Args:
+            prefix (str): 지표 이름 접두사 (예: book_search_cache)
+            stats (Callable): 숫자 값 딕셔너리를 반환하는 함수
+        """
+        with self._lock:
+            self._stats[prefix] = stats
+
+    def render(self) -> str:
+        """등록된 모든 지표를 Prometheus 텍스트 형식으로 만듭니다."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            stats = list(self._stats.items())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        for prefix, stats_fn in stats:
+            try:
+                values = stats_fn()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                gauge = key in GAUGE_KEYS
+                name = f"{prefix}_{key}" if gauge else f"{prefix}_{key}_total"
+                lines.append(f"# TYPE {name} {'gauge' if gauge else 'counter'}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+
+# 서버 전체에서 공유하는 지표 레지스트리와 지표
+registry = MetricsRegistry()
+graph_node_duration = registry.histogram(
+    "chatbot_graph_node_duration_seconds", "그래프 노드 실행 시간", ("node", "status"))
+llm_request_duration = registry.histogram(
+    "chatbot_llm_request_duration_seconds", "언어 모델 호출 시간", ("node", "model", "status"))
+llm_tokens = registry.counter(
+    "chatbot_llm_tokens_total", "언어 모델 토큰 사용량", ("model", "kind"))
+tool_duration = registry.histogram(
+    "chatbot_tool_duration_seconds", "에이전트 도구 호출 시간", ("tool", "status"))
+tool_upstream_duration = registry.histogram(
+    "chatbot_tool_upstream_duration_seconds", "캐시를 거치지 않은 에이전트 도구의 외부 호출 시간", ("tool", "status"))
+tool_cache_requests = registry.counter(
+    "chatbot_tool_cache_requests_total", "에이전트 도구 결과 캐시 조회 수", ("tool", "result"))
+http_client_duration = registry.histogram(
+    "chatbot_http_client_request_duration_seconds", "외부 HTTP 요청 시간 (응답 헤더 수신까지)", ("service", "status"))
+session_store_duration = registry.histogram(
+    "chatbot_session_store_duration_seconds", "세션 저장소 조회, 저장, 정리 시간", ("backend", "operation"),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0))
+http_server_duration = registry.histogram(
+    "chatbot_http_server_request_duration_seconds", "서버 요청 처리 시간", ("route", "method", "status"))
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    그래프 노드, 언어 모델, 도구 호출의 실행 시간을 지표로 기록하는 콜백 핸들러입니다.
+    run_id 별 시작 시각만 보관하므로 한 인스턴스를 모든 요청이 공유해도 됩니다.
+    """
+    def __init__(self):
+        # run_id -> (종류, 레이블, 시작 시각)
+        self._runs: Dict[UUID, tuple] = {}
+        self._nodes: Dict[UUID, str] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None, metadata=None, **kwargs) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # 노드 함수 이름이 노드 이름과 같으면 같은 이름의 실행이 중첩되므로 바깥쪽만 기록
+        if node and not node.startswith("__") and kwargs.get("name") == node and parent_run_id not in self._runs:
+            self._runs[run_id] = ("node", {"node": node}, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, "ok")
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, "error")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, invocation_params=None, **kwargs) -> None:
+        self._llm_start(run_id, metadata, invocation_params)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata=None, invocation_params=None, **kwargs) -> None:
+        self._llm_start(run_id, metadata, invocation_params)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        run = self._runs.get(run_id)
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        if run is not None:
+            for kind in ("prompt_tokens", "completion_tokens"):
+                if usage.get(kind):
+                    llm_tokens.inc(usage[kind], model=run[1]["model"], kind=kind.split("_")[0])
+        self._finish(run_id, "ok")
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, "error")
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs) -> None:
+        tool = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._runs[run_id] = ("tool", {"tool": tool}, time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, "ok")
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, "error")
+
+    def _llm_start(self, run_id: UUID, metadata, invocation_params) -> None:
+        params = invocation_params or {}
+        model = params.get("model_name") or params.get("model") or "unknown"
+        node = (metadata or {}).get("langgraph_node", "")
+        self._runs[run_id] = ("llm", {"node": node, "model": model}, time.perf_counter())
+
+    def _finish(self, run_id: UUID, status: str) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        kind, labels, start = run
+        elapsed = time.perf_counter() - start
+        if kind == "node":
+            graph_node_duration.observe(elapsed, status=status, **labels)
+        elif kind == "llm":
+            llm_request_duration.observe(elapsed, status=status, **labels)
+        else:
+            tool_duration.observe(elapsed, status=status, **labels)
+
+
+# 그래프 실행에 붙이는 공유 핸들러
+metrics_handler = MetricsCallbackHandler()
+
+
+def run_callbacks(callbacks: Optional[list] = None) -> Optional[list]:
+    """지표 수집이 켜져 있으면 그래프 실행 콜백에 공유 지표 핸들러를 추가합니다."""
+    if not metrics_enabled():
+        return callbacks
+    return list(callbacks or []) + [metrics_handler]
+
+
+def observe_requests_response(service: str) -> Callable:
+    """requests 세션의 response 훅으로 외부 HTTP 요청 시간을 기록하는 함수를 만듭니다."""
+    def hook(response, *args, **kwargs):
+        http_client_duration.observe(response.elapsed.total_seconds(), service=service, status=response.status_code)
+        return response
+    return hook
+
+
+def httpx_event_hooks(service: str, asynchronous: bool = False) -> Dict[str, list]:
+    """
+    httpx 클라이언트의 event_hooks 로 외부 HTTP 요청 시간을 기록하는 훅을 만듭니다.
+    trace-context 전파가 켜져 있으면 요청에 traceparent 헤더도 붙입니다.
+    """
+    def on_request(request):
+        request.extensions["metrics_start"] = time.perf_counter()
+        request.headers.update(outbound_headers())
+
+    def on_response(response):
+        start = response.request.extensions.get("metrics_start")
+        if start is not None:
+            http_client_duration.observe(time.perf_counter() - start, service=service, status=response.status_code)
+
+    if not asynchronous:
+        return {"request": [on_request], "response": [on_response]}
+
+    async def aon_request(request):
+        on_request(request)
+
+    async def aon_response(response):
+        on_response(response)
+
+    return {"request": [aon_request], "response": [aon_response]}
@@ -0,0 +1,175 @@
+import math
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def ngram_text(text: str) -> str:
+    """n-gram 을 만들기 전에 태그, 띄어쓰기, 문장 부호, 대소문자 차이를 제거합니다."""
+    text = re.sub(r"<[^<]+?>", "", text or "")
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def ngrams(text: str, n: int = 2) -> Set[str]:
+    """
+    음절 단위 n-gram 집합을 만듭니다.
+    한글은 한 음절이 한 글자이므로 띄어쓰기를 지운 뒤 글자 단위로 자르면 음절 n-gram 이 됩니다.
+    n 보다 짧은 텍스트는 텍스트 자체를 하나의 n-gram 으로 사용합니다.
+
+    Args:
+        text (str): 원본 텍스트
+        n (int, optional): n-gram 길이
+
+    Returns:
+        set: n-gram 집합
+    """
+    normalized = ngram_text(text)
+    if len(normalized) <= n:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + n] for i in range(len(normalized) - n + 1)}
+
+
+def title_similarity(a: str, b: str) -> float:
+    """
+    두 제목의 음절 bigram Jaccard 유사도를 계산합니다.
+
+    Args:
+        a (str): 제목
+        b (str): 제목
+
+    Returns:
+        float: 0~1 사이의 유사도
+    """
+    grams_a, grams_b = ngrams(a), ngrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    overlap = len(grams_a & grams_b)
+    return overlap / (len(grams_a) + len(grams_b) - overlap)
+
+
+class NgramIndex:
+    """
+    음절 n-gram 역색인으로 비슷한 제목을 찾는 클래스입니다.
+
+    검색 시 질의 n-gram 중 드문 것부터 최소 필요 개수만큼의 posting list 로 후보를 모은 뒤
+    (prefix filtering), 후보마다 겹치는 n-gram 수를 NumPy 로 계산하여 Jaccard 유사도로 정렬합니다.
+    posting list, 문서 길이, 삭제 여부는 늘려 가며 쓰는 NumPy 버퍼에 바로 추가하므로
+    문서를 추가한 직후의 검색도 전체 배열을 다시 만들지 않습니다.
+    검색은 버퍼에서 이미 채워진 부분만 가리키는 배열(view)을 읽고, 문서 길이는 문서가 posting 에
+    나타나기 전에 기록되므로 추가와 동시에 실행되어도 길이가 없는 문서를 만나지 않습니다.
+    """
+    def __init__(self, n: int = 2):
+        """
+        Args:
+            n (int, optional): n-gram 길이
+        """
+        self.n = n
+        self._lock = threading.Lock()
+        # n-gram 별 posting 버퍼와 채워진 길이, 검색용으로 채워진 부분만 가리키는 배열
+        self._postings: Dict[str, np.ndarray] = {}
+        self._posting_sizes: Dict[str, int] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+        # 문서 ID 별 n-gram 수와 삭제 여부 (문서 수보다 크게 잡아 두고 가득 차면 두 배로 늘림)
+        self._doc_lengths = np.zeros(1024, dtype=np.int32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._keys: List[str] = []
+        self._doc_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def add(self, key: str, text: str) -> None:
+        """
+        색인에 문서를 추가합니다. 이미 있는 키이면 이전 문서를 지운 것으로 표시(tombstone)하고 새로 넣습니다.
+
+        Args:
+            key (str): 검색 결과로 돌려줄 문서 키 (예: ISBN)
+            text (str): 색인할 텍스트 (예: 책 제목)
+        """
+        grams = ngrams(text, self.n)
+        with self._lock:
+            previous = self._doc_ids.get(key)
+            if previous is not None:
+                self._alive[previous] = False
+            doc_id = len(self._keys)
+            if doc_id == self._doc_lengths.size:
+                self._doc_lengths = _grown(self._doc_lengths)
+                self._alive = _grown(self._alive)
+            # 문서 길이를 먼저 기록한 뒤 posting 에 문서 ID 를 넣어야 검색이 길이 없는 문서를 만나지 않음
+            self._doc_lengths[doc_id] = len(grams)
+            self._alive[doc_id] = True
+            self._keys.append(key)
+            self._doc_ids[key] = doc_id
+            for gram in grams:
+                self._append_posting(gram, doc_id)
+
+    def _append_posting(self, gram: str, doc_id: int) -> None:
+        """락을 잡은 상태에서 n-gram 의 posting 버퍼 끝에 문서 ID 를 넣고 검색용 배열을 바꿔 끼웁니다."""
+        posting = self._postings.get(gram)
+        size = self._posting_sizes.get(gram, 0)
+        if posting is None:
+            posting = self._postings[gram] = np.empty(4, dtype=np.int32)
+        elif size == posting.size:
+            posting = self._postings[gram] = _grown(posting)
+        # 문서 ID 는 늘어나기만 하므로 끝에 넣어도 정렬 순서가 유지됨
+        posting[size] = doc_id
+        self._posting_sizes[gram] = size + 1
+        self._arrays[gram] = posting[:size + 1]
+
+    def search(self, text: str, limit: int = 5, min_similarity: float = 0.3) -> List[Tuple[str, float]]:
+        """
+        비슷한 문서를 찾습니다.
+
+        Args:
+            text (str): 검색할 텍스트
+            limit (int, optional): 최대 결과 수
+            min_similarity (float, optional): 결과에 포함할 최소 Jaccard 유사도
+
+        Returns:
+            list: (문서 키, 유사도) 리스트 (유사도 내림차순)
+        """
+        query = ngrams(text, self.n)
+        if not query:
+            return []
+        arrays = self._arrays
+        known = sorted((gram for gram in query if gram in arrays), key=lambda gram: len(arrays[gram]))
+        # 유사도가 min_similarity 이상이려면 최소 required 개의 n-gram 이 겹쳐야 함
+        required = max(1, math.ceil(min_similarity * len(query)))
+        if len(known) < required:
+            return []
+        prefix = known[:len(known) - required + 1]
+        candidates = np.unique(np.concatenate([arrays[gram] for gram in prefix]))
+        # posting 을 읽은 뒤에 가져와야 후보 문서의 길이와 삭제 여부가 모두 들어 있음
+        doc_length_array, alive_array = self._doc_lengths, self._alive
+        candidates = candidates[alive_array[candidates]]
+        if candidates.size == 0:
+            return []
+
+        overlap = np.zeros(candidates.size, dtype=np.int32)
+        for gram in known:
+            posting = arrays[gram]
+            positions = np.searchsorted(posting, candidates)
+            positions[positions >= posting.size] = posting.size - 1
+            overlap += posting[positions] == candidates
+
+        similarity = overlap / (len(query) + doc_length_array[candidates] - overlap)
+        matched = np.flatnonzero(similarity >= min_similarity)
+        if matched.size == 0:
+            return []
+        if matched.size > limit:
+            top = np.argpartition(-similarity[matched], limit - 1)[:limit]
+            matched = matched[top]
+        order = matched[np.argsort(-similarity[matched], kind="stable")]
+        return [(self._keys[candidates[i]], float(similarity[i])) for i in order]
+
+
+def _grown(buffer: np.ndarray) -> np.ndarray:
+    """버퍼를 두 배 크기로 늘린 복사본을 반환합니다. (원래 버퍼는 그대로 두어 읽고 있던 검색에 영향이 없음)"""
+    grown = np.zeros(buffer.size * 2, dtype=buffer.dtype)
+    grown[:buffer.size] = buffer
+    return grown
@@ -1,52 +1,133 @@
 import os
 import re
+import asyncio
+import contextvars
 import logging
+import threading
+import httpx
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-from langchain.prompts import ChatPromptTemplate
-from langchain.chat_models import ChatOpenAI
-
-# 로깅 설정
-logging.basicConfig(level=logging.DEBUG)
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from .cache import MISSING, SQLiteStore, TTLCache
+from .catalog import book_catalog
+from .llm import get_chat_model
+from .logging_config import Payload
+from .metrics import httpx_event_hooks, metrics_enabled, observe_requests_response, registry
+from .ngram_index import title_similarity
+from .render import book_card_renderer, format_authors, purchase_links, summarize
+from .singleflight import SingleFlight
+from .replay import async_transport, mount_http
+from .streaming import aemit_event, emit_event
+from .tracing import outbound_headers
+
+# 모듈 로거 (레벨과 출력 형식은 logging_config.configure_logging 에서 설정)
+logger = logging.getLogger(__name__)
 
 # 환경 변수 로드
 load_dotenv()
 
+# 네이버 책 검색 API 주소 (NAVER_BOOK_API_URL 로 로컬 스텁 서버를 지정할 수 있음)
+NAVER_BOOK_API_URL = "https://openapi.naver.com/v1/search/book.json"
 
-class Optimization:
+
+def _build_book_search_cache() -> TTLCache:
     """
-    사용자의 질문에 대해 최적화된 응답을 생성하는 클래스입니다.
+    네이버 책 검색 결과 캐시를 생성합니다.
+    BOOK_CACHE_PATH 가 설정되면 SQLite 파일에 저장하여 재시작 후에도, 워커 간에도 공유합니다.
     """
+    cache_path = os.getenv("BOOK_CACHE_PATH")
+    store = SQLiteStore(cache_path, table="naver_book_search") if cache_path else None
+    return TTLCache(
+        maxsize=int(os.getenv("BOOK_CACHE_SIZE", "2048")),
+        ttl=float(os.getenv("BOOK_CACHE_TTL", "86400")),
+        negative_ttl=float(os.getenv("BOOK_CACHE_NEGATIVE_TTL", "600")),
+        store=store,
+    )
 
-    def __init__(
-        self,
-        tone: str,
-        style: str,
-        additional_instructions: str = None,
-        conversation_history: list = None
-    ):
-        """
-        초기화 메서드로, 필요한 설정과 언어 모델을 준비합니다.
 
-        Args:
-            tone (str): 응답의 어조
-            style (str): 응답의 스타일
-            additional_instructions (str, optional): 추가 지침
-            conversation_history (list, optional): 대화 기록
-        """
-        self.tone = tone
-        self.style = style
-        self.additional_instructions = additional_instructions or "한국어로만 답변해주세요."
-        self.conversation_history = conversation_history or []
+# 네이버 책 검색 결과 캐시 (모든 요청이 공유)
+book_search_cache = _build_book_search_cache()
 
-        # 네이버 API 자격 증명 로드
-        self.naver_client_id = os.getenv('NAVER_CLIENT_ID')
-        self.naver_client_secret = os.getenv('NAVER_CLIENT_SECRET')
-        if not self.naver_client_id or not self.naver_client_secret:
-            raise ValueError("NAVER_CLIENT_ID 및 NAVER_CLIENT_SECRET 환경 변수를 설정해주세요.")
 
-        # 시스템 프롬프트 설정
-        self.optimization_system = """당신은 사용자의 질문에 대해 전문적으로 친절하게 답변하는 도서 전문가입니다.
+def _build_http_session() -> requests.Session:
+    """네이버 API 호출에 사용할 keep-alive 연결 풀 세션을 생성합니다."""
+    pool_size = int(os.getenv("NAVER_POOL_SIZE", "16"))
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if metrics_enabled():
+        session.hooks["response"].append(observe_requests_response("naver"))
+    # REPLAY_MODE 가 설정되면 기록/재생 어댑터로 교체
+    return mount_http(session, "naver", pool_connections=4, pool_maxsize=pool_size)
+
+
+# 같은 검색어의 동시 네이버 API 호출을 하나로 묶음
+naver_flight = SingleFlight("naver")
+
+# /metrics 에 캐시 통계를 함께 내보냄
+registry.register_stats("book_search_cache", book_search_cache.stats)
+registry.register_stats("naver_singleflight", naver_flight.stats)
+
+# 네이버 API 호출용 공유 세션과 동시 조회용 스레드 풀
+http_session = _build_http_session()
+lookup_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("NAVER_MAX_WORKERS", "8")),
+    thread_name_prefix="naver-lookup",
+)
+
+def open_naver_connection() -> None:
+    """첫 요청 전에 네이버 API 서버와의 keep-alive 연결을 공유 세션에 미리 열어 둡니다."""
+    http_session.head(os.getenv("NAVER_BOOK_API_URL", NAVER_BOOK_API_URL), timeout=5)
+
+
+# 최적화 LLM 이 답변을 만드는 동안 미리 조회할 후보 제목의 최대 개수
+PREFETCH_MAX_TITLES = int(os.getenv("PREFETCH_MAX_TITLES", "4"))
+# 후보 텍스트에서 "제목: '...'" 형식으로 적힌 책 제목 (작가, 출판사도 따옴표로 감싸므로 제목 항목을 우선 사용)
+_LABELED_TITLE_PATTERN = re.compile(r"제목\s*:\s*'([^']+)'")
+
+
+def prefetch_enabled() -> bool:
+    """SPECULATIVE_PREFETCH 환경 변수가 0/false/off 가 아니면 True 를 반환합니다."""
+    return os.getenv("SPECULATIVE_PREFETCH", "1").lower() not in ("0", "false", "off", "no")
+
+
+def _discard_result(task: asyncio.Task) -> None:
+    """사용하지 않은 미리 조회 태스크의 예외를 가져가서 "예외를 가져가지 않았다"는 경고가 나오지 않게 합니다."""
+    if not task.cancelled():
+        task.exception()
+
+
+# 비동기 서빙 경로에서 사용하는 HTTP 클라이언트 (이벤트 루프 안에서 처음 사용할 때 생성)
+_async_http_client = None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """네이버 API 호출에 사용할 공유 비동기 HTTP 클라이언트를 반환합니다."""
+    global _async_http_client
+    if _async_http_client is None or _async_http_client.is_closed:
+        pool_size = int(os.getenv("NAVER_POOL_SIZE", "16"))
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        _async_http_client = httpx.AsyncClient(
+            limits=limits,
+            transport=async_transport("naver", limits=limits),
+            event_hooks=httpx_event_hooks("naver", asynchronous=True) if metrics_enabled() else None,
+        )
+    return _async_http_client
+
+
+async def close_async_http_client() -> None:
+    """공유 비동기 HTTP 클라이언트를 닫습니다."""
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+
+
+# 최적화 단계의 시스템 프롬프트
+OPTIMIZATION_SYSTEM_PROMPT = """당신은 사용자의 질문에 대해 전문적으로 친절하게 답변하는 도서 전문가입니다.
 
 **언어 관련 필수 지침:**
 * 모든 상황에서 반드시 한국어로만 답변하세요.
@@ -115,84 +196,251 @@ class Optimization:
   - 예시: "책 추천 외에 다른 도움이 필요하신가요?" 또는 "다른 주제에 대해 이야기해볼까요?"
 """
 
-        # 메시지 템플릿 리스트 생성
-        self.messages = [("system", self.optimization_system)]
-        self.add_conversation_history()
+# 미리 컴파일한 프롬프트 템플릿 (대화 기록과 질문만 요청마다 채움)
+OPTIMIZATION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", OPTIMIZATION_SYSTEM_PROMPT),
+    MessagesPlaceholder("history"),
+    ("human", "{question}\n\n{instructions}"),
+])
 
-        # 언어 모델 초기화
-        self.structured_optimizer = ChatOpenAI(
-            model="chatgpt-4o-latest",
-            temperature=0.7
-        )
 
-    def add_conversation_history(self):
-        """대화 기록을 메시지 리스트에 추가합니다."""
-        for msg in self.conversation_history:
+class Optimization:
+    """
+    사용자의 질문에 대해 최적화된 응답을 생성하는 클래스입니다.
+
+    인스턴스는 요청 간에 공유할 수 있습니다. 생성자에 준 대화 기록과 추가 지침은 기본값으로만 쓰이고,
+    요청별 값은 optimize_response 의 인자로 전달합니다.
+    """
+
+    def __init__(
+        self,
+        tone: str,
+        style: str,
+        additional_instructions: str = None,
+        conversation_history: list = None
+    ):
+        """
+        초기화 메서드로, 필요한 설정과 언어 모델을 준비합니다.
+
+        Args:
+            tone (str): 응답의 어조
+            style (str): 응답의 스타일
+            additional_instructions (str, optional): 기본 추가 지침
+            conversation_history (list, optional): 기본 대화 기록
+        """
+        self.tone = tone
+        self.style = style
+        self.additional_instructions = additional_instructions or "한국어로만 답변해주세요."
+        self.conversation_history = conversation_history or []
+
+        # 네이버 API 자격 증명 로드
+        self.naver_client_id = os.getenv('NAVER_CLIENT_ID')
+        self.naver_client_secret = os.getenv('NAVER_CLIENT_SECRET')
+        if not self.naver_client_id or not self.naver_client_secret:
+            raise ValueError("NAVER_CLIENT_ID 및 NAVER_CLIENT_SECRET 환경 변수를 설정해주세요.")
+        self.naver_api_url = os.getenv("NAVER_BOOK_API_URL", NAVER_BOOK_API_URL)
+        self.naver_timeout = float(os.getenv("NAVER_TIMEOUT", "3"))
+
+        # 시스템 프롬프트 (모듈 로드 시 한 번만 만든 문자열을 공유)
+        self.optimization_system = OPTIMIZATION_SYSTEM_PROMPT
+
+        # 언어 모델 (챗봇 단계와 연결 풀을 공유하는 인스턴스)
+        self.structured_optimizer = get_chat_model(temperature=0.7)
+
+    @staticmethod
+    def history_messages(conversation_history: list) -> list:
+        """
+        대화 기록을 프롬프트 메시지 리스트로 변환합니다.
+
+        Args:
+            conversation_history (list): {"role", "content"} 형식의 대화 기록
+
+        Returns:
+            list: (역할, 내용) 튜플 리스트
+        """
+        messages = []
+        for msg in conversation_history:
             role = msg.get("role", "")
             content = msg.get("content", "")
             if role == "user":
-                self.messages.append(("human", content))
+                messages.append(("human", content))
             elif role == "assistant":
-                self.messages.append(("ai", content))
+                messages.append(("ai", content))
+            elif role == "system":
+                # 오래된 대화의 요약
+                messages.append(("system", content))
+        return messages
 
-    def optimize_response(self, question: str, num_books: int = 1) -> str:
+    def optimize_response(
+        self,
+        question: str,
+        num_books: int = 1,
+        conversation_history: list = None,
+        additional_instructions: str = None,
+        candidate_text: str = None
+    ) -> str:
         """
         사용자의 질문에 최적화된 응답을 생성합니다.
+        candidate_text 가 주어지면 그 안의 책 제목을 LLM 이 답변을 만드는 동안 미리 조회해 두고,
+        최종 응답에 같은 제목이 나오면 그 결과를 사용합니다. 쓰이지 않은 조회는 취소합니다.
 
         Args:
             question (str): 사용자의 질문
             num_books (int, optional): 추천할 책의 수
+            conversation_history (list, optional): 이번 요청의 대화 기록 (없으면 생성자에 준 기록)
+            additional_instructions (str, optional): 이번 요청의 추가 지침 (없으면 생성자에 준 지침)
+            candidate_text (str, optional): 최종 응답에 나올 책 제목이 담겨 있을 가능성이 높은 텍스트 (예: 에이전트의 답변)
 
         Returns:
             str: 최적화된 응답
         """
-        logging.debug(f"Optimizing response for question: {question} with num_books={num_books}")
+        logger.debug("Optimizing response for question: %s with num_books=%s", Payload(question), num_books)
+
+        prefetched = self.prefetch_book_info(self.candidate_titles(candidate_text)) if candidate_text and prefetch_enabled() else {}
+        try:
+            # 최적화된 응답 생성
+            optimized_response = self.structured_optimizer(
+                self.build_prompt_messages(question, num_books, conversation_history, additional_instructions)
+            ).content.strip()
+            logger.debug("Optimized response from LLM: %s", Payload(optimized_response))
+
+            # 네이버 API를 사용하여 책 정보 가져오기
+            unique_book_titles = self.unique_book_titles(optimized_response)
+            book_info_list, valid_titles = [], []
+            if unique_book_titles:
+                emit_event("progress", {"stage": "book_lookup", "message": "책 정보를 찾고 있습니다.", "titles": unique_book_titles})
+                book_info_list, valid_titles = self.get_valid_book_info(unique_book_titles, num_books, prefetched)
+        finally:
+            # 최종 응답에 나오지 않은 제목의 조회는 취소 (이미 시작된 조회는 결과가 캐시에 남음)
+            for pending in prefetched.values():
+                pending.cancel()
+        return self.compose_final_response(optimized_response, unique_book_titles, book_info_list, valid_titles)
+
+    async def aoptimize_response(
+        self,
+        question: str,
+        num_books: int = 1,
+        conversation_history: list = None,
+        additional_instructions: str = None,
+        candidate_text: str = None
+    ) -> str:
+        """
+        optimize_response의 비동기 버전입니다. LLM 호출과 네이버 조회를 모두 비동기로 수행합니다.
 
-        # 메시지 리스트에 새로운 질문 추가
-        prompt_messages = self.messages + [
-            ("human", f"{question}\n\n{self.additional_instructions}")
-        ]
+        Args:
+            question (str): 사용자의 질문
+            num_books (int, optional): 추천할 책의 수
+            conversation_history (list, optional): 이번 요청의 대화 기록
+            additional_instructions (str, optional): 이번 요청의 추가 지침
+            candidate_text (str, optional): 미리 조회할 책 제목이 담긴 텍스트
+
+        Returns:
+            str: 최적화된 응답
+        """
+        logger.debug("Optimizing response (async) for question: %s with num_books=%s", Payload(question), num_books)
+
+        prefetched = self.aprefetch_book_info(self.candidate_titles(candidate_text)) if candidate_text and prefetch_enabled() else {}
+        try:
+            optimized_message = await self.structured_optimizer.ainvoke(
+                self.build_prompt_messages(question, num_books, conversation_history, additional_instructions)
+            )
+            optimized_response = optimized_message.content.strip()
+            logger.debug("Optimized response from LLM: %s", Payload(optimized_response))
+
+            unique_book_titles = self.unique_book_titles(optimized_response)
+            book_info_list, valid_titles = [], []
+            if unique_book_titles:
+                await aemit_event("progress", {"stage": "book_lookup", "message": "책 정보를 찾고 있습니다.", "titles": unique_book_titles})
+                book_info_list, valid_titles = await self.aget_valid_book_info(unique_book_titles, num_books, prefetched)
+        finally:
+            for pending in prefetched.values():
+                pending.cancel()
+        return self.compose_final_response(optimized_response, unique_book_titles, book_info_list, valid_titles)
+
+    def build_prompt_messages(
+        self,
+        question: str,
+        num_books: int,
+        conversation_history: list = None,
+        additional_instructions: str = None
+    ) -> list:
+        """
+        미리 컴파일한 프롬프트 템플릿으로 LLM에 전달할 메시지 리스트를 생성합니다.
 
-        # 새로운 프롬프트 템플릿 생성
-        prompt = ChatPromptTemplate.from_messages(prompt_messages)
+        Args:
+            question (str): 사용자의 질문
+            num_books (int): 추천할 책의 수
+            conversation_history (list, optional): 대화 기록 (없으면 생성자에 준 기록)
+            additional_instructions (str, optional): 추가 지침 (없으면 생성자에 준 지침)
 
-        # 프롬프트 포맷팅
-        prompt_data = prompt.format_prompt(num_books=num_books)
-        logging.debug(f"Formatted prompt: {prompt_data}")
+        Returns:
+            list: 포맷팅된 메시지 리스트
+        """
+        if conversation_history is None:
+            conversation_history = self.conversation_history
+        prompt_data = OPTIMIZATION_PROMPT.format_prompt(
+            history=self.history_messages(conversation_history),
+            question=question,
+            instructions=additional_instructions or self.additional_instructions,
+        )
+        logger.debug("Formatted prompt: %s", Payload(prompt_data))
+        return prompt_data.to_messages()
 
-        # 최적화된 응답 생성
-        optimized_response = self.structured_optimizer(
-            prompt_data.to_messages()
-        ).content.strip()
-        logging.debug(f"Optimized response from LLM: {optimized_response}")
+    def unique_book_titles(self, optimized_response: str) -> list:
+        """
+        최적화된 응답에서 중복 없는 책 제목 리스트를 추출합니다.
 
+        Args:
+            optimized_response (str): LLM이 생성한 응답
+
+        Returns:
+            list: 중복 제거된 책 제목 리스트
+        """
         # 최적화된 응답에서 책 제목 추출
         book_titles = self.extract_book_titles(optimized_response)
-        logging.debug(f"Extracted book titles: {book_titles}")
+        logger.debug("Extracted book titles: %s", book_titles)
 
         # 중복된 책 제목 제거
         unique_book_titles = list(set(book_titles))
-        logging.debug(f"Unique book titles: {unique_book_titles}")
+        logger.debug("Unique book titles: %s", unique_book_titles)
+        return unique_book_titles
 
-        # 네이버 API를 사용하여 책 정보 가져오기
+    def compose_final_response(
+        self,
+        optimized_response: str,
+        unique_book_titles: list,
+        book_info_list: list,
+        valid_titles: list
+    ) -> str:
+        """
+        조회한 책 정보를 바탕으로 최종 응답을 구성합니다.
+
+        Args:
+            optimized_response (str): LLM이 생성한 응답
+            unique_book_titles (list): 응답에서 추출한 책 제목 리스트
+            book_info_list (list): 조회된 책 정보 리스트
+            valid_titles (list): 유효한 책 제목 리스트
+
+        Returns:
+            str: 최종 응답
+        """
         if unique_book_titles:
-            book_info_list, valid_titles = self.get_valid_book_info(unique_book_titles, num_books)
             if book_info_list:
-                # 존재하는 책들로 응답을 재작성
-                optimized_text = self.rewrite_response(optimized_response, valid_titles)
-                logging.debug(f"Rewritten optimized text: {optimized_text}")
+                # 최종 응답은 책 카드로만 구성되므로, 존재하는 책들로 재작성한 본문은 디버그 로그에만 남김
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Rewritten optimized text: %s", Payload(book_card_renderer.body_lines(optimized_response, valid_titles)))
 
                 # 책 정보를 응답에 통합
-                final_response = self.insert_book_info(optimized_text, book_info_list)
-                logging.debug(f"Final response after inserting book info: {final_response}")
+                final_response = self.insert_book_info(optimized_response, book_info_list)
+                logger.debug("Final response after inserting book info: %s", Payload(final_response))
             else:
-                logging.warning("관련된 책을 찾을 수 없었습니다.")
+                logger.warning("관련된 책을 찾을 수 없었습니다.")
                 final_response = "죄송하지만 관련된 책을 찾을 수 없었습니다. 질문을 더 구체적으로 만들어주실 수 있으신가요?"
         else:
-            logging.debug("No book titles extracted; returning optimized response as is.")
+            logger.debug("No book titles extracted; returning optimized response as is.")
             final_response = optimized_response
 
-        logging.debug(f"Final response to return: {final_response}")
+        logger.debug("Final response to return: %s", Payload(final_response))
         return final_response
 
     def extract_book_titles(self, text: str) -> list:
@@ -207,15 +455,161 @@ class Optimization:
         """
         titles = re.findall(r"'([^']+)'", text)
         unique_titles = list(set(titles))
-        logging.debug(f"Extracted unique titles from text: {unique_titles}")
+        logger.debug("Extracted unique titles from text: %s", unique_titles)
         return unique_titles
 
-    def get_valid_book_info(self, titles: list, num_books: int) -> tuple:
+    def candidate_titles(self, text: str) -> list:
+        """
+        미리 조회할 후보 책 제목을 나온 순서대로 최대 PREFETCH_MAX_TITLES 개 추출합니다.
+        "제목: '...'" 형식의 항목이 있으면 그것만 사용하고, 없으면 따옴표로 감싼 모든 문자열을 사용합니다.
+
+        Args:
+            text (str): 에이전트의 답변 등 후보 제목이 담긴 텍스트
+
+        Returns:
+            list: 후보 책 제목 리스트
+        """
+        titles = _LABELED_TITLE_PATTERN.findall(text) or re.findall(r"'([^']+)'", text)
+        return list(dict.fromkeys(title.strip() for title in titles if title.strip()))[:PREFETCH_MAX_TITLES]
+
+    @staticmethod
+    def _search_key(title: str) -> str:
+        """search_book_info 가 실제로 검색하는 한글 제목을 반환합니다. (미리 조회한 결과를 찾는 키)"""
+        return title.split("(")[0].strip() if "(" in title else title
+
+    def prefetch_book_info(self, titles: list) -> dict:
+        """
+        책 정보 조회를 조회 스레드 풀에서 미리 시작합니다.
+
+        Args:
+            titles (list): 미리 조회할 책 제목 리스트
+
+        Returns:
+            dict: 검색 키별 조회 Future (get_valid_book_info 의 prefetched 인자로 전달)
+        """
+        if titles:
+            logger.debug("Prefetching book info: %s", titles)
+        return {
+            self._search_key(title): lookup_executor.submit(contextvars.copy_context().run, self.search_book_info, title)
+            for title in titles
+        }
+
+    def aprefetch_book_info(self, titles: list) -> dict:
+        """
+        prefetch_book_info의 비동기 버전입니다. 실행 중인 이벤트 루프에서 조회 태스크를 시작합니다.
+
+        Args:
+            titles (list): 미리 조회할 책 제목 리스트
+
+        Returns:
+            dict: 검색 키별 조회 태스크 (aget_valid_book_info 의 prefetched 인자로 전달)
+        """
+        if titles:
+            logger.debug("Prefetching book info (async): %s", titles)
+        tasks = {}
+        for title in titles:
+            task = tasks[self._search_key(title)] = asyncio.ensure_future(self.asearch_book_info(title))
+            task.add_done_callback(_discard_result)
+        return tasks
+
+    def get_valid_book_info(self, titles: list, num_books: int, prefetched: dict = None) -> tuple:
         """
         유효한 책 정보를 가져옵니다.
+        모든 후보 제목을 동시에 조회하고, 중복되지 않은 결과가 num_books 개 모이면 나머지 조회는 기다리지 않습니다.
+        prefetched 에 같은 제목의 조회가 있으면 새로 조회하지 않고 그 결과를 사용합니다.
+
+        Args:
+            titles (list): 책 제목 리스트
+            num_books (int): 추천할 책의 수
+            prefetched (dict, optional): prefetch_book_info 가 반환한 미리 조회 Future (사용한 항목은 꺼냄)
+
+        Returns:
+            tuple: 책 정보 리스트와 유효한 책 제목 리스트
+        """
+        if not titles:
+            return [], []
+
+        prefetched = prefetched if prefetched is not None else {}
+        futures = {
+            # 요청의 trace 컨텍스트가 조회 스레드에서도 보이도록 컨텍스트를 복사해 실행
+            prefetched.pop(self._search_key(title), None)
+            or lookup_executor.submit(contextvars.copy_context().run, self.search_book_info, title): index
+            for index, title in enumerate(titles)
+        }
+        found = {}
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    search_results = future.result()
+                except Exception as e:
+                    logger.error("'%s' 조회 중 오류가 발생했습니다: %s", titles[index], e)
+                    continue
+                if not search_results:
+                    logger.warning("'%s'에 대한 검색 결과가 없습니다.", titles[index])
+                    continue
+                found[index] = search_results[0]
+                if len({book['title'] for book in found.values()}) >= num_books:
+                    break
+        finally:
+            # 아직 시작하지 않은 조회는 취소
+            for future in futures:
+                future.cancel()
+
+        return self._select_books(titles, found, num_books)
+
+    async def aget_valid_book_info(self, titles: list, num_books: int, prefetched: dict = None) -> tuple:
+        """
+        get_valid_book_info의 비동기 버전입니다.
+
+        Args:
+            titles (list): 책 제목 리스트
+            num_books (int): 추천할 책의 수
+            prefetched (dict, optional): aprefetch_book_info 가 반환한 미리 조회 태스크 (사용한 항목은 꺼냄)
+
+        Returns:
+            tuple: 책 정보 리스트와 유효한 책 제목 리스트
+        """
+        if not titles:
+            return [], []
+
+        prefetched = prefetched if prefetched is not None else {}
+
+        async def lookup(index: int, pending):
+            return index, await pending
+
+        tasks = [
+            asyncio.ensure_future(lookup(index, prefetched.pop(self._search_key(title), None) or self.asearch_book_info(title)))
+            for index, title in enumerate(titles)
+        ]
+        found = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    index, search_results = await next_done
+                except Exception as e:
+                    logger.error("책 정보 조회 중 오류가 발생했습니다: %s", e)
+                    continue
+                if not search_results:
+                    logger.warning("'%s'에 대한 검색 결과가 없습니다.", titles[index])
+                    continue
+                found[index] = search_results[0]
+                if len({book['title'] for book in found.values()}) >= num_books:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return self._select_books(titles, found, num_books)
+
+    @staticmethod
+    def _select_books(titles: list, found: dict, num_books: int) -> tuple:
+        """
+        조회 결과를 후보 순서대로 정렬하고 중복을 제거하여 num_books 개를 고릅니다.
 
         Args:
             titles (list): 책 제목 리스트
+            found (dict): 후보 인덱스별 조회 결과
             num_books (int): 추천할 책의 수
 
         Returns:
@@ -223,14 +617,14 @@ class Optimization:
         """
         book_info_list = []
         valid_titles = []
-        for title in titles[:num_books]:
-            search_results = self.search_book_info(title)
-            if search_results:
-                if search_results[0]['title'] not in [book['title'] for book in book_info_list]:
-                    book_info_list.append(search_results[0])
-                    valid_titles.append(title)
-            else:
-                logging.warning(f"'{title}'에 대한 검색 결과가 없습니다.")
+        for index in sorted(found):
+            book = found[index]
+            if book['title'] in [b['title'] for b in book_info_list]:
+                continue
+            book_info_list.append(book)
+            valid_titles.append(titles[index])
+            if len(book_info_list) >= num_books:
+                break
         return book_info_list, valid_titles
 
     def rewrite_response(self, text: str, valid_titles: list) -> str:
@@ -244,19 +638,14 @@ class Optimization:
         Returns:
             str: 재작성된 응답 텍스트
         """
-        lines = text.split('\n')
-        new_lines = []
-        for line in lines:
-            title_in_line = re.findall(r"'([^']+)'", line)
-            if not title_in_line or title_in_line[0] in valid_titles:
-                new_lines.append(line)
-        rewritten_text = '\n'.join(new_lines)
-        logging.debug(f"Rewritten response: {rewritten_text}")
+        rewritten_text = book_card_renderer.filter_lines(text, valid_titles)
+        logger.debug("Rewritten response: %s", Payload(rewritten_text))
         return rewritten_text
 
     def insert_book_info(self, text: str, book_info_list: list) -> str:
         """
         책 정보를 텍스트에 삽입합니다.
+        최종 응답은 책 카드와 맺음말로만 구성되므로 text 의 내용은 결과에 쓰이지 않습니다.
 
         Args:
             text (str): 원본 텍스트
@@ -265,38 +654,8 @@ class Optimization:
         Returns:
             str: 책 정보가 삽입된 최종 응답 텍스트
         """
-        # 기존 응답에서 불필요한 항목 제거
-        keys_to_remove = ['책 제목', '작가', '출판사', '추천 이유']
-        for key in keys_to_remove:
-            pattern = f"^{key}:.*$"
-            text = re.sub(pattern, '', text, flags=re.MULTILINE)
-
-        # 책 세부사항 생성
-        book_details_list = []
-        for book_info in book_info_list:
-            title = re.sub('<[^<]+?>', '', book_info['title']).split('(')[0].strip()
-            author = self.format_author_names(book_info['author'])
-            publisher = book_info.get("publisher", "출판사 정보 없음")
-            description = book_info.get("description", "상세 설명을 찾을 수 없습니다.")
-            summary = self.summarize_text(description, 3)
-
-            # 구매 링크 생성
-            purchase_links = self.generate_purchase_links(title, book_info.get('isbn', ''))
-
-            book_details = (
-                f"책 제목: '{title}' <br>"
-                f"작가: {author} <br>"
-                f"출판사: {publisher} <br>"
-                f"추천 이유: {summary} <br>"
-                f"구매 링크:<br> {purchase_links} "
-            )
-            book_details_list.append(book_details)
-
-        # 최종 응답 생성
-        book_details_text = '<br><br>'.join(book_details_list)
-        follow_up = "<br>즐거운 독서 되세요!"
-        final_response = f"{book_details_text}{follow_up}"
-        logging.debug(f"Final response constructed: {final_response}")
+        final_response = book_card_renderer.render(book_info_list)
+        logger.debug("Final response constructed: %s", Payload(final_response))
         return final_response
 
     def format_author_names(self, author_str: str) -> str:
@@ -309,11 +668,7 @@ class Optimization:
         Returns:
             str: 포맷팅된 작가 이름
         """
-        authors = [a.strip() for a in author_str.split(',')]
-        formatted_authors = []
-        for author_name in authors:
-            formatted_authors.append(author_name)
-        return ', '.join(formatted_authors)
+        return format_authors(author_str)
 
     def summarize_text(self, text: str, num_sentences: int) -> str:
         """
@@ -326,11 +681,8 @@ class Optimization:
         Returns:
             str: 요약된 텍스트
         """
-        if not text:
-            return "상세한 내용은 링크를 참고해주세요."
-        sentences = re.split(r'(?<=[.!?]) +', text)
-        short_description = ' '.join(sentences[:num_sentences])
-        logging.debug(f"Summarized text: {short_description}")
+        short_description = summarize(text, num_sentences)
+        logger.debug("Summarized text: %s", short_description)
         return short_description
 
     def search_book_info(self, query: str) -> list:
@@ -343,50 +695,186 @@ class Optimization:
         Returns:
             list: 책 정보 리스트
         """
-        headers = {
-            "X-Naver-Client-Id": self.naver_client_id,
-            "X-Naver-Client-Secret": self.naver_client_secret,
-        }
+        # 한글 제목으로 검색
+        korean_title = query.split("(")[0].strip() if "(" in query else query
 
-        def get_search_results(search_query: str, display_count: int = 10) -> list:
-            params = {
-                "query": search_query,
-                "display": display_count,
-                "sort": "sim"
-            }
-            try:
-                response = requests.get(
-                    "https://openapi.naver.com/v1/search/book.json",
-                    headers=headers,
-                    params=params
-                )
-                response.raise_for_status()
-                return response.json().get("items", [])
-            except requests.exceptions.RequestException as e:
-                logging.error(f"네이버 API 요청 실패: {e}")
-                return []
+        # 로컬 카탈로그에 같은 제목이 있으면 바로 사용하고, 없을 때만 네이버 API 호출
+        catalog_entry = self._catalog_lookup(korean_title)
+        if catalog_entry:
+            return [catalog_entry]
 
-        # 한글 제목으로 검색
+        results = self.get_search_results(korean_title)
+        return self._best_result(results, korean_title, self._catalog_candidate(korean_title))
+
+    async def asearch_book_info(self, query: str) -> list:
+        """
+        search_book_info의 비동기 버전입니다.
+
+        Args:
+            query (str): 검색할 책 제목
+
+        Returns:
+            list: 책 정보 리스트
+        """
         korean_title = query.split("(")[0].strip() if "(" in query else query
-        results = get_search_results(korean_title)
+        catalog_entry = self._catalog_lookup(korean_title)
+        if catalog_entry:
+            return [catalog_entry]
+
+        results = await self.aget_search_results(korean_title)
+        return self._best_result(results, korean_title, self._catalog_candidate(korean_title))
+
+    @staticmethod
+    def _catalog_lookup(title: str) -> dict:
+        """
+        로컬 카탈로그에서 제목이 같은 책(정확히 같거나 정규화한 제목이 같은 책)을 찾습니다.
+        카탈로그를 사용할 수 없으면 None 을 반환합니다.
+        """
+        try:
+            return book_catalog.lookup(title)
+        except Exception as e:
+            logger.error("도서 카탈로그 조회 실패: %s", e)
+            return None
 
+    @staticmethod
+    def _catalog_candidate(title: str) -> str:
+        """
+        로컬 카탈로그에서 제목이 비슷한 책의 ISBN 을 찾습니다.
+        비슷한 제목은 다른 책일 수 있으므로 검증에는 쓰지 않고 네이버 검색 결과의 순위에만 반영합니다.
+        """
+        try:
+            entry = book_catalog.fuzzy_lookup(title)
+        except Exception as e:
+            logger.error("도서 카탈로그 조회 실패: %s", e)
+            return ""
+        return entry["isbn"] if entry else ""
+
+    @staticmethod
+    def _catalog_add(items: list) -> None:
+        """네이버 API 응답을 로컬 카탈로그에 추가합니다."""
+        try:
+            book_catalog.add_many(items)
+        except Exception as e:
+            logger.error("도서 카탈로그 저장 실패: %s", e)
+
+    def _best_result(self, results: list, korean_title: str, catalog_isbn: str = "") -> list:
+        """검색 결과를 필터링하고 가장 적절한 결과 하나만 담은 리스트를 반환합니다."""
         # 결과 필터링 및 정렬
-        filtered_results = self.filter_and_sort_results(results, korean_title)
+        filtered_results = self.filter_and_sort_results(results, korean_title, catalog_isbn)
 
         # 결과가 없을 경우 빈 리스트 반환
         if not filtered_results:
-            logging.debug("한글 도서 검색 결과가 없습니다.")
+            logger.debug("한글 도서 검색 결과가 없습니다.")
             return []
 
         return filtered_results[:1]  # 가장 적절한 결과 하나만 반환
 
-    def filter_and_sort_results(self, results: list, query: str) -> list:
+    def get_search_results(self, search_query: str, display_count: int = 10) -> list:
+        """
+        네이버 검색 API 결과를 가져옵니다. 결과는 캐시되며, 검색 결과가 없는 경우도
+        짧은 시간 동안 캐시합니다. 요청 실패는 캐시하지 않습니다.
+        같은 검색어의 조회가 동시에 여러 개 들어오면 API 는 한 번만 호출합니다.
+
+        Args:
+            search_query (str): 검색어
+            display_count (int, optional): 가져올 결과 수
+
+        Returns:
+            list: 네이버 API의 items 리스트
+        """
+        cache_key = f"{display_count}:{search_query.strip()}"
+        cached = book_search_cache.get(cache_key)
+        if cached is not MISSING:
+            logger.debug("네이버 검색 캐시 적중: %s", search_query)
+            return cached
+
+        # 같은 검색어를 조회 중인 요청이 있으면 그 응답을 함께 사용
+        items, _ = naver_flight.do(cache_key, self._fetch_search_results, search_query, display_count, cache_key)
+        return items
+
+    def _fetch_search_results(self, search_query: str, display_count: int, cache_key: str) -> list:
+        """네이버 검색 API 를 호출하고 결과를 캐시와 카탈로그에 저장합니다."""
+        try:
+            response = http_session.get(
+                self.naver_api_url,
+                headers=self._naver_headers(),
+                params=self._naver_params(search_query, display_count),
+                timeout=self.naver_timeout
+            )
+            response.raise_for_status()
+            items = response.json().get("items", [])
+        except requests.exceptions.RequestException as e:
+            logger.error("네이버 API 요청 실패: %s", e)
+            return []
+
+        book_search_cache.set(cache_key, items)
+        self._catalog_add(items)
+        return items
+
+    async def aget_search_results(self, search_query: str, display_count: int = 10) -> list:
+        """
+        get_search_results의 비동기 버전입니다. 같은 캐시를 공유합니다.
+
+        Args:
+            search_query (str): 검색어
+            display_count (int, optional): 가져올 결과 수
+
+        Returns:
+            list: 네이버 API의 items 리스트
+        """
+        cache_key = f"{display_count}:{search_query.strip()}"
+        cached = book_search_cache.get(cache_key)
+        if cached is not MISSING:
+            logger.debug("네이버 검색 캐시 적중: %s", search_query)
+            return cached
+
+        items, _ = await naver_flight.ado(cache_key, self._afetch_search_results, search_query, display_count, cache_key)
+        return items
+
+    async def _afetch_search_results(self, search_query: str, display_count: int, cache_key: str) -> list:
+        """_fetch_search_results의 비동기 버전입니다."""
+        try:
+            response = await get_async_http_client().get(
+                self.naver_api_url,
+                headers=self._naver_headers(),
+                params=self._naver_params(search_query, display_count),
+                timeout=self.naver_timeout
+            )
+            response.raise_for_status()
+            items = response.json().get("items", [])
+        except httpx.HTTPError as e:
+            logger.error("네이버 API 요청 실패: %s", e)
+            return []
+
+        book_search_cache.set(cache_key, items)
+        self._catalog_add(items)
+        return items
+
+    def _naver_headers(self) -> dict:
+        """네이버 API 인증 헤더를 반환합니다."""
+        return {
+            "X-Naver-Client-Id": self.naver_client_id,
+            "X-Naver-Client-Secret": self.naver_client_secret,
+            **outbound_headers(),
+        }
+
+    @staticmethod
+    def _naver_params(search_query: str, display_count: int) -> dict:
+        """네이버 API 검색 파라미터를 반환합니다."""
+        return {
+            "query": search_query,
+            "display": display_count,
+            "sort": "sim"
+        }
+
+    def filter_and_sort_results(self, results: list, query: str, catalog_isbn: str = "") -> list:
         """
         검색 결과를 필터링하고 정렬합니다.
 
         Args:
             results (list): 검색 결과 리스트
             query (str): 검색어
+            catalog_isbn (str, optional): 로컬 카탈로그에서 찾은 비슷한 제목의 책 ISBN
 
         Returns:
             list: 필터링되고 정렬된 결과 리스트
@@ -406,12 +894,17 @@ class Optimization:
             # 출판사가 한글인 경우 가산점
             if self.contains_korean(publisher):
                 score += 2
-            # 검색어와 제목의 유사도 점수 추가
+            # 검색어와 제목의 유사도 점수 추가 (음절 bigram 유사도, 최대 4점)
+            similarity = title_similarity(query, title)
+            score += 4 * similarity
             if query.lower() in title.lower():
-                score += 2
+                score += 1
             # 작가 이름이 검색어에 포함되면 추가 점수
             if query.lower() in author.lower():
                 score += 2
+            # 로컬 카탈로그에서 찾은 비슷한 제목의 책이면 추가 점수 (같은 점수일 때 앞에 오도록)
+            if catalog_isbn and isbn == catalog_isbn:
+                score += 0.5
 
             filtered_results.append({
                 "title": title,
@@ -432,26 +925,12 @@ class Optimization:
 
         Args:
             title (str): 책 제목
-            isbn (str): ISBN 번호
+            isbn (str): ISBN 번호 (현재 링크는 제목으로 검색하므로 사용하지 않음)
 
         Returns:
             str: 구매 링크 문자열
         """
-        # ISBN에서 숫자만 추출 (ISBN13 사용)
-        isbn_num = isbn.split(' ')[1] if ' ' in isbn else isbn
-        isbn_num = isbn_num.strip()
-
-        # URL 인코딩된 제목
-        encoded_title = requests.utils.quote(title)
-
-        # 구매 링크 생성 (마크다운 형식으로 변경)
-        yes24_link = f"<a href='https://www.yes24.com/Product/Search?query={encoded_title}' target='_blank'>예스24</a>"
-        aladin_link = f"<a href='https://www.aladin.co.kr/search/wsearchresult.aspx?SearchTarget=All&SearchWord={encoded_title}' target='_blank'>알라딘</a>"
-        kyobo_link = f"<a href='https://search.kyobobook.co.kr/search?keyword={encoded_title}' target='_blank'>교보문고</a>"
-
-        purchase_links = f"- {yes24_link}<br>- {aladin_link}<br>- {kyobo_link}"
-
-        return purchase_links
+        return purchase_links(title)
 
     @staticmethod
     def contains_korean(text: str) -> bool:
@@ -467,8 +946,28 @@ class Optimization:
         return any('\u3131' <= c <= '\uD7A3' for c in text)
 
 
+_optimizer = None
+_optimizer_lock = threading.Lock()
+
+
+def get_optimizer() -> Optimization:
+    """
+    요청 간에 공유하는 Optimization 인스턴스를 반환합니다.
+    처음 호출될 때 한 번만 생성합니다 (네이버 자격 증명이 없으면 ValueError).
+    """
+    global _optimizer
+    if _optimizer is None:
+        with _optimizer_lock:
+            if _optimizer is None:
+                _optimizer = Optimization(tone="친절한", style="설득력 있는")
+    return _optimizer
+
+
 # 사용 예시 (테스트용)
 if __name__ == "__main__":
+    from .logging_config import configure_logging
+    configure_logging("DEBUG")
+
     # 환경 변수 설정 예시 (실제 값으로 대체해야 함)
     os.environ['NAVER_CLIENT_ID'] = 'your_naver_client_id'
     os.environ['NAVER_CLIENT_SECRET'] = 'your_naver_client_secret'
@@ -0,0 +1,214 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from .catalog import book_catalog
+from .metrics import registry
+
+# 미리 컴파일한 패턴
+TITLE_PATTERN = re.compile(r"'([^']+)'")
+TAG_PATTERN = re.compile(r"<[^<]+?>")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?]) +")
+# 책 카드로 대체되는 LLM 응답의 항목 줄
+FIELD_LINE_PATTERN = re.compile(r"^(?:책 제목|작가|출판사|추천 이유):")
+
+# 책 카드 템플릿
+CARD_TEMPLATE = "책 제목: '{title}' <br>작가: {author} <br>출판사: {publisher} <br>추천 이유: {summary} <br>구매 링크:<br> {links} "
+LINKS_TEMPLATE = (
+    "- <a href='https://www.yes24.com/Product/Search?query={query}' target='_blank'>예스24</a>"
+    "<br>- <a href='https://www.aladin.co.kr/search/wsearchresult.aspx?SearchTarget=All&SearchWord={query}' target='_blank'>알라딘</a>"
+    "<br>- <a href='https://search.kyobobook.co.kr/search?keyword={query}' target='_blank'>교보문고</a>"
+)
+CARD_SEPARATOR = "<br><br>"
+FOLLOW_UP = "<br>즐거운 독서 되세요!"
+
+NO_PUBLISHER = "출판사 정보 없음"
+NO_DESCRIPTION = "상세 설명을 찾을 수 없습니다."
+EMPTY_SUMMARY = "상세한 내용은 링크를 참고해주세요."
+
+
+def summarize(text: str, num_sentences: int = 3) -> str:
+    """
+    텍스트의 앞 num_sentences 문장을 반환합니다.
+
+    Args:
+        text (str): 요약할 텍스트
+        num_sentences (int, optional): 남길 문장 수
+
+    Returns:
+        str: 요약된 텍스트 (텍스트가 비어 있으면 안내 문구)
+    """
+    if not text:
+        return EMPTY_SUMMARY
+    # 필요한 문장 수만큼만 나눔
+    return " ".join(SENTENCE_PATTERN.split(text, num_sentences)[:num_sentences])
+
+
+def purchase_links(title: str) -> str:
+    """
+    예스24, 알라딘, 교보문고의 검색 링크를 만듭니다. 제목은 한 번만 URL 인코딩합니다.
+
+    Args:
+        title (str): 책 제목
+
+    Returns:
+        str: 구매 링크 HTML 조각
+    """
+    return LINKS_TEMPLATE.format(query=quote(title))
+
+
+def format_authors(author: str) -> str:
+    """쉼표로 구분된 작가 이름의 앞뒤 공백을 정리합니다."""
+    return ", ".join(name.strip() for name in author.split(","))
+
+
+def clean_card_title(title: str) -> str:
+    """검색 결과 제목에서 HTML 태그와 괄호로 시작하는 부제를 제거합니다."""
+    return TAG_PATTERN.sub("", title).split("(")[0].strip()
+
+
+class BookCardRenderer:
+    """
+    최적화 단계의 최종 응답(책 카드)을 만드는 렌더러입니다.
+
+    카드마다 다시 계산하던 구매 링크와 설명 요약은 ISBN 별로 보관하여 재사용합니다.
+    보관한 조각은 제목과 설명이 같을 때만 사용하므로 결과는 항상 새로 만든 것과 같습니다.
+    """
+    def __init__(self, maxsize: int = 4096):
+        """
+        Args:
+            maxsize (int, optional): ISBN 별로 보관할 최대 카드 조각 수
+        """
+        self.maxsize = maxsize
+        self._fragments: "OrderedDict[str, Tuple[str, str, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def filter_lines(self, text: str, valid_titles: Iterable[str]) -> str:
+        """
+        조회에 실패한 책의 줄을 응답에서 제거합니다. 줄에서 처음 나오는 따옴표 안의 제목이
+        valid_titles 에 없으면 그 줄을 뺍니다. (Optimization.rewrite_response)
+
+        Args:
+            text (str): LLM 응답
+            valid_titles (Iterable): 유효한 책 제목
+
+        Returns:
+            str: 재작성된 응답
+        """
+        valid = set(valid_titles)
+        kept = []
+        for line in text.split("\n"):
+            match = TITLE_PATTERN.search(line)
+            if match is None or match.group(1) in valid:
+                kept.append(line)
+        return "\n".join(kept)
+
+    def body_lines(self, text: str, valid_titles: Iterable[str]) -> str:
+        """
+        응답을 한 번 훑어, 조회에 실패한 책의 줄과 책 카드로 대체되는 항목 줄을 지운 본문을 반환합니다.
+        (rewrite_response 후 항목 줄을 지우던 처리와 같은 결과)
+
+        Args:
+            text (str): LLM 응답
+            valid_titles (Iterable): 유효한 책 제목
+
+        Returns:
+            str: 항목 줄이 빈 줄로 바뀐 본문
+        """
+        valid = set(valid_titles)
+        kept = []
+        for line in text.split("\n"):
+            match = TITLE_PATTERN.search(line)
+            if match is None or match.group(1) in valid:
+                kept.append("" if FIELD_LINE_PATTERN.match(line) else line)
+        return "\n".join(kept)
+
+    def card(self, book_info: Dict[str, str]) -> str:
+        """
+        책 정보 하나로 카드 HTML 조각을 만듭니다.
+        설명이 비어 있으면 카탈로그에 저장된 정보로 보완합니다.
+
+        Args:
+            book_info (dict): 네이버 검색 결과 형식의 책 정보
+
+        Returns:
+            str: 책 카드
+        """
+        isbn = book_info.get("isbn", "")
+        if not book_info.get("description"):
+            catalog_entry = book_catalog.get(isbn)
+            if catalog_entry:
+                book_info = {**catalog_entry, **{k: v for k, v in book_info.items() if v}}
+        title = clean_card_title(book_info["title"])
+        description = book_info.get("description", NO_DESCRIPTION)
+        links, summary = self._fragment(isbn, title, description)
+        return CARD_TEMPLATE.format(
+            title=title,
+            author=format_authors(book_info["author"]),
+            publisher=book_info.get("publisher", NO_PUBLISHER),
+            summary=summary,
+            links=links,
+        )
+
+    def render(self, book_info_list: List[Dict[str, str]]) -> str:
+        """
+        책 카드들과 맺음말로 최종 응답을 만듭니다. (Optimization.insert_book_info)
+
+        Args:
+            book_info_list (list): 책 정보 리스트
+
+        Returns:
+            str: 최종 응답
+        """
+        return CARD_SEPARATOR.join(self.card(book_info) for book_info in book_info_list) + FOLLOW_UP
+
+    def _fragment(self, isbn: str, title: str, description: str) -> Tuple[str, str]:
+        """ISBN 별로 보관한 (구매 링크, 요약) 조각을 반환합니다. 없거나 제목/설명이 바뀌었으면 새로 만듭니다."""
+        if isbn:
+            with self._lock:
+                cached = self._fragments.get(isbn)
+                if cached is not None and cached[0] == title and cached[1] == description:
+                    self._fragments.move_to_end(isbn)
+                    self.hits += 1
+                    return cached[2], cached[3]
+                self.misses += 1
+        links, summary = purchase_links(title), summarize(description, 3)
+        if isbn:
+            with self._lock:
+                self._fragments[isbn] = (title, description, links, summary)
+                self._fragments.move_to_end(isbn)
+                while len(self._fragments) > self.maxsize:
+                    self._fragments.popitem(last=False)
+        return links, summary
+
+    def clear(self) -> None:
+        """보관한 카드 조각과 통계를 지웁니다."""
+        with self._lock:
+            self._fragments.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        카드 조각 재사용 통계를 반환합니다.
+
+        Returns:
+            dict: 적중/실패 횟수, 적중률, 보관 중인 조각 수
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._fragments),
+            }
+
+
+# 서버 전체에서 공유하는 렌더러
+book_card_renderer = BookCardRenderer(maxsize=int(os.getenv("BOOK_CARD_CACHE_SIZE", "4096")))
+registry.register_stats("book_card_cache", book_card_renderer.stats)
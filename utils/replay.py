@@ -0,0 +1,394 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import requests
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import BaseTool
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# 외부 호출 기록/재생 모드 (off: 실제 호출, record: 실제 호출 후 기록, replay: 기록된 응답만 사용)
+REPLAY_MODES = ("off", "record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """replay 모드에서 기록되지 않은 요청이 들어왔을 때 발생하는 예외입니다."""
+
+
+def replay_mode() -> str:
+    """REPLAY_MODE 환경 변수 값을 반환합니다 (기본값 off)."""
+    mode = os.getenv("REPLAY_MODE", "off").lower()
+    if mode not in REPLAY_MODES:
+        raise ValueError(f"REPLAY_MODE 는 {', '.join(REPLAY_MODES)} 중 하나여야 합니다: {mode}")
+    return mode
+
+
+def request_key(*parts: Any) -> str:
+    """요청 내용을 JSON 으로 직렬화한 sha1 해시를 카세트 키로 사용합니다."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class LatencyModel:
+    """
+    재생할 때 응답 전에 기다릴 시간을 정하는 지연 시간 분포입니다.
+
+    설정 문자열 형식:
+        recorded[:배율]          기록된 지연 시간 (배율을 곱함, 기본 1)
+        none                     지연 없음
+        fixed:ms                 고정 지연
+        uniform:min_ms,max_ms    균등 분포
+        lognormal:median_ms,sigma  로그 정규 분포 (LLM 응답 시간처럼 꼬리가 긴 분포)
+    """
+    def __init__(self, spec: str = "recorded", seed: Optional[int] = None):
+        """
+        Args:
+            spec (str, optional): 분포 설정 문자열
+            seed (int, optional): 난수 시드
+        """
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(value) for value in args.split(",") if value.strip()]
+        if self.kind not in ("recorded", "none", "fixed", "uniform", "lognormal"):
+            raise ValueError(f"알 수 없는 지연 시간 분포입니다: {spec}")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, recorded_ms: float = 0.0) -> float:
+        """
+        지연 시간(초)을 하나 뽑습니다.
+
+        Args:
+            recorded_ms (float, optional): 기록할 때 측정한 지연 시간(밀리초)
+
+        Returns:
+            float: 기다릴 시간(초)
+        """
+        with self._lock:
+            if self.kind == "none":
+                ms = 0.0
+            elif self.kind == "recorded":
+                ms = recorded_ms * (self.args[0] if self.args else 1.0)
+            elif self.kind == "fixed":
+                ms = self.args[0]
+            elif self.kind == "uniform":
+                ms = self._random.uniform(self.args[0], self.args[1])
+            else:
+                ms = self._random.lognormvariate(0.0, self.args[1]) * self.args[0]
+        return max(ms, 0.0) / 1000
+
+    @classmethod
+    def from_env(cls, kind: str) -> "LatencyModel":
+        """REPLAY_LATENCY_<KIND>, 없으면 REPLAY_LATENCY 환경 변수로 분포를 만듭니다."""
+        spec = os.getenv(f"REPLAY_LATENCY_{kind.upper()}", os.getenv("REPLAY_LATENCY", "recorded"))
+        seed = os.getenv("REPLAY_SEED")
+        return cls(spec, seed=int(seed) if seed else None)
+
+
+class Cassette:
+    """
+    외부 호출 기록을 JSON Lines 파일에 저장하고 재생하는 클래스입니다.
+
+    한 줄에 {"key", "response", "latency_ms"} 하나가 기록됩니다.
+    같은 키로 여러 번 기록된 응답은 재생할 때 순서대로 돌아가며 사용합니다.
+    """
+    def __init__(self, path: str, latency: Optional[LatencyModel] = None):
+        """
+        Args:
+            path (str): 카세트 파일 경로
+            latency (LatencyModel, optional): 재생 시 지연 시간 분포
+        """
+        self.path = path
+        self.latency = latency or LatencyModel()
+        self._entries: Dict[str, List[dict]] = {}
+        self._cursors: Dict[str, itertools.cycle] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def record(self, key: str, response: Any, latency_ms: float) -> None:
+        """
+        응답을 기록합니다.
+
+        Args:
+            key (str): 요청 키
+            response (Any): JSON 으로 저장할 응답
+            latency_ms (float): 실제 호출에 걸린 시간(밀리초)
+        """
+        entry = {"key": key, "response": response, "latency_ms": round(latency_ms, 1)}
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            self._cursors.pop(key, None)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.recorded += 1
+
+    def lookup(self, key: str) -> dict:
+        """
+        기록된 응답을 찾습니다.
+
+        Args:
+            key (str): 요청 키
+
+        Returns:
+            dict: {"response", "latency_ms"} 기록
+
+        Raises:
+            CassetteMissError: 기록이 없을 때
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.missed += 1
+                raise CassetteMissError(f"{os.path.basename(self.path)} 에 기록되지 않은 요청입니다: {key}")
+            if key not in self._cursors:
+                self._cursors[key] = itertools.cycle(entries)
+            self.replayed += 1
+            return next(self._cursors[key])
+
+    def replay(self, key: str) -> Any:
+        """기록된 응답을 지연 시간만큼 기다린 뒤 반환합니다."""
+        entry = self.lookup(key)
+        time.sleep(self.latency.sample(entry["latency_ms"]))
+        return entry["response"]
+
+    async def areplay(self, key: str) -> Any:
+        """replay의 비동기 버전입니다."""
+        entry = self.lookup(key)
+        await asyncio.sleep(self.latency.sample(entry["latency_ms"]))
+        return entry["response"]
+
+    def stats(self) -> Dict[str, int]:
+        """기록/재생/실패 횟수를 반환합니다."""
+        return {"entries": len(self), "recorded": self.recorded, "replayed": self.replayed, "missed": self.missed}
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(kind: str) -> Cassette:
+    """
+    종류(llm, naver, tavily)별 공유 카세트를 반환합니다.
+    파일은 CASSETTE_DIR(기본값 cassettes) 아래 <kind>.jsonl 입니다.
+    """
+    with _cassettes_lock:
+        if kind not in _cassettes:
+            directory = os.getenv("CASSETTE_DIR", "cassettes")
+            _cassettes[kind] = Cassette(os.path.join(directory, f"{kind}.jsonl"), LatencyModel.from_env(kind))
+        return _cassettes[kind]
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    언어 모델 호출을 카세트에 기록하거나 기록된 응답을 재생하는 래퍼입니다.
+    재생할 때도 streaming 이 켜져 있으면 응답을 나눠 on_llm_new_token 콜백을 보냅니다.
+    """
+    inner: BaseChatModel
+    mode: str = "replay"
+    kind: str = "llm"
+    streaming: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return f"replay-{self.inner._llm_type}"
+
+    def _key(self, messages: List[BaseMessage], stop: Optional[List[str]]) -> str:
+        params = {name: getattr(self.inner, name, None) for name in ("model_name", "temperature")}
+        return request_key(params, [(message.type, message.content) for message in messages], stop)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        cassette, key = get_cassette(self.kind), self._key(messages, stop)
+        if self.mode == "record":
+            start = time.perf_counter()
+            result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            cassette.record(key, result.generations[0].message.content, (time.perf_counter() - start) * 1000)
+            return result
+        content = cassette.replay(key)
+        if self.streaming and run_manager:
+            for token in _tokens(content):
+                run_manager.on_llm_new_token(token)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        cassette, key = get_cassette(self.kind), self._key(messages, stop)
+        if self.mode == "record":
+            start = time.perf_counter()
+            result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            cassette.record(key, result.generations[0].message.content, (time.perf_counter() - start) * 1000)
+            return result
+        content = await cassette.areplay(key)
+        if self.streaming and run_manager:
+            for token in _tokens(content):
+                await run_manager.on_llm_new_token(token)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+def _tokens(content: str) -> List[str]:
+    """재생한 응답을 스트리밍 토큰처럼 공백 단위로 나눕니다."""
+    return [token for token in content.replace(" ", " \0").split("\0") if token]
+
+
+class ReplayTool(BaseTool):
+    """에이전트 도구(예: Tavily 검색) 호출을 카세트에 기록하거나 재생하는 래퍼입니다."""
+    inner: BaseTool
+    mode: str = "replay"
+    kind: str = "tool"
+
+    def _run(self, *args: Any, run_manager: Any = None, **kwargs: Any) -> Any:
+        # 문자열 입력과 {"query": ...} 입력이 같은 키가 되도록 인자 값만 사용
+        values = list(args) + [kwargs[name] for name in sorted(kwargs)]
+        cassette, key = get_cassette(self.kind), request_key(self.inner.name, values)
+        if self.mode == "record":
+            start = time.perf_counter()
+            result = self.inner.invoke(kwargs or (args[0] if args else ""))
+            cassette.record(key, result, (time.perf_counter() - start) * 1000)
+            return result
+        return cassette.replay(key)
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    requests 세션에 마운트하여 HTTP 응답을 기록하거나 재생하는 어댑터입니다.
+    요청 키는 메서드와 URL(쿼리 포함)만 사용하며, 인증 헤더는 기록하지 않습니다.
+    """
+    def __init__(self, mode: str, kind: str, **kwargs):
+        self.mode = mode
+        self.kind = kind
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        cassette, key = get_cassette(self.kind), request_key(request.method, request.url)
+        if self.mode == "record":
+            start = time.perf_counter()
+            response = super().send(request, **kwargs)
+            if response.status_code < 500:
+                cassette.record(key, _http_record(response.status_code, response.headers, response.text),
+                                (time.perf_counter() - start) * 1000)
+            return response
+        try:
+            recorded = cassette.replay(key)
+        except CassetteMissError as e:
+            raise requests.exceptions.ConnectionError(str(e), request=request)
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.headers = CaseInsensitiveDict({"Content-Type": recorded["content_type"]})
+        response._content = recorded["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+class ReplayAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx.AsyncClient 용 기록/재생 전송 계층입니다. ReplayAdapter 와 같은 카세트를 공유합니다."""
+    def __init__(self, mode: str, kind: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.mode = mode
+        self.kind = kind
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cassette, key = get_cassette(self.kind), request_key(request.method, str(request.url))
+        if self.mode == "record":
+            start = time.perf_counter()
+            response = await self.inner.handle_async_request(request)
+            body = await response.aread()
+            if response.status_code < 500:
+                cassette.record(key, _http_record(response.status_code, response.headers, body.decode("utf-8")),
+                                (time.perf_counter() - start) * 1000)
+            return httpx.Response(response.status_code, headers=response.headers, content=body, request=request)
+        try:
+            recorded = await cassette.areplay(key)
+        except CassetteMissError as e:
+            raise httpx.ConnectError(str(e), request=request)
+        return httpx.Response(
+            recorded["status"],
+            headers={"Content-Type": recorded["content_type"]},
+            content=recorded["body"].encode("utf-8"),
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def _http_record(status: int, headers, body: str) -> dict:
+    return {"status": status, "content_type": headers.get("Content-Type", "application/json"), "body": body}
+
+
+def wrap_chat_model(model: BaseChatModel, kind: str = "llm") -> BaseChatModel:
+    """REPLAY_MODE 가 off 가 아니면 언어 모델을 기록/재생 래퍼로 감쌉니다."""
+    mode = replay_mode()
+    if mode == "off":
+        return model
+    logging.info("언어 모델 호출을 %s 모드로 실행합니다.", mode)
+    return ReplayChatModel(inner=model, mode=mode, kind=kind, streaming=getattr(model, "streaming", True))
+
+
+def wrap_tool(tool: BaseTool, kind: str = "tavily") -> BaseTool:
+    """REPLAY_MODE 가 off 가 아니면 에이전트 도구를 기록/재생 래퍼로 감쌉니다."""
+    mode = replay_mode()
+    if mode == "off":
+        return tool
+    return ReplayTool(
+        inner=tool, mode=mode, kind=kind,
+        name=tool.name, description=tool.description, args_schema=tool.args_schema,
+    )
+
+
+def mount_http(session: requests.Session, kind: str = "naver", **adapter_kwargs) -> requests.Session:
+    """REPLAY_MODE 가 off 가 아니면 세션에 기록/재생 어댑터를 마운트합니다."""
+    mode = replay_mode()
+    if mode != "off":
+        adapter = ReplayAdapter(mode, kind, **adapter_kwargs)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+def async_transport(kind: str = "naver", **transport_kwargs) -> Optional[httpx.AsyncBaseTransport]:
+    """REPLAY_MODE 가 off 가 아니면 httpx.AsyncClient 에 넘길 기록/재생 전송 계층을 반환합니다."""
+    mode = replay_mode()
+    if mode == "off":
+        return None
+    return ReplayAsyncTransport(mode, kind, httpx.AsyncHTTPTransport(**transport_kwargs))
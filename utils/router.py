@@ -0,0 +1,96 @@
+import logging
+import os
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from .cache import TTLCache
+from .judgement import classify_question
+from .llm import get_chat_model
+from .metrics import registry
+from .semantic_cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+# 라우팅 결과 (book, author 는 에이전트를 건너뛰고 최적화 단계로 바로 감)
+ROUTES = ("book", "author", "chat")
+DIRECT_ROUTES = ("book", "author")
+
+# 규칙으로 분류하지 못한 질문에만 사용하는 작은 분류 모델
+ROUTER_MODEL = os.getenv("ROUTER_MODEL", "gpt-4o-mini")
+
+ROUTER_PROMPT = """사용자의 메시지를 다음 중 하나로 분류하고 분류 이름만 답하세요.
+- book: 웹 검색 없이 바로 책을 추천하거나 특정 책의 정보를 알려주면 되는 요청
+- author: 책의 작가를 묻거나 특정 작가의 책을 요청하는 질문
+- chat: 일상 대화, 취향을 더 물어봐야 하는 모호한 요청, 최신 정보가 필요한 질문, 그 밖의 모든 메시지"""
+
+# 같은 질문은 분류 결과가 같으므로 분류 모델 호출 결과를 보관
+_route_cache = TTLCache(maxsize=4096, ttl=24 * 3600)
+registry.register_stats("router_cache", _route_cache.stats)
+
+
+def llm_routing_enabled() -> bool:
+    """ROUTER_LLM 환경 변수가 0/false/off 가 아니면 True 를 반환합니다."""
+    return os.getenv("ROUTER_LLM", "1").lower() not in ("0", "false", "off", "no")
+
+
+def route_question(question: str) -> str:
+    """
+    질문을 분류하여 그래프가 갈 경로를 정합니다.
+    judgement 의 규칙으로 먼저 분류하고, 판단할 수 없는 질문만 작은 모델로 분류합니다.
+    분류 모델이 꺼져 있거나 실패하면 에이전트가 처리하도록 'chat' 을 반환합니다.
+
+    Args:
+        question (str): 사용자의 질문
+
+    Returns:
+        str: 'book', 'author', 'chat' 중 하나
+    """
+    route = classify_question(question)
+    if route != "unknown":
+        return route
+    if not llm_routing_enabled():
+        return "chat"
+    key = normalize_question(question)
+    route = _route_cache.get(key, None)
+    if route is None:
+        try:
+            route = _parse_route(get_chat_model(temperature=0, model=ROUTER_MODEL, streaming=False).invoke(_router_messages(question)).content)
+        except Exception as e:
+            logger.warning("Question routing failed: %s", e)
+            return "chat"
+        _route_cache.set(key, route)
+    return route
+
+
+async def aroute_question(question: str) -> str:
+    """route_question의 비동기 버전입니다."""
+    route = classify_question(question)
+    if route != "unknown":
+        return route
+    if not llm_routing_enabled():
+        return "chat"
+    key = normalize_question(question)
+    route = _route_cache.get(key, None)
+    if route is None:
+        try:
+            result = await get_chat_model(temperature=0, model=ROUTER_MODEL, streaming=False).ainvoke(_router_messages(question))
+            route = _parse_route(result.content)
+        except Exception as e:
+            logger.warning("Question routing failed: %s", e)
+            return "chat"
+        _route_cache.set(key, route)
+    return route
+
+
+def _router_messages(question: str) -> list:
+    """분류 모델에 보낼 메시지를 만듭니다."""
+    return [SystemMessage(content=ROUTER_PROMPT), HumanMessage(content=question)]
+
+
+def _parse_route(text: str) -> str:
+    """분류 모델의 답에서 분류 이름을 꺼냅니다. 알 수 없는 답은 'chat' 으로 처리합니다."""
+    answer = text.strip().lower()
+    for route in ROUTES:
+        if answer.startswith(route):
+            return route
+    return "chat"
@@ -0,0 +1,318 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .metrics import registry
+
+# 의미에 영향을 주지 않는 요청 표현 (토큰 단위로 제거)
+_FILLER_TOKENS = {"좀", "혹시", "제발", "한번", "한", "권", "해줘", "해줘요", "해주세요", "주세요", "줘", "알려줘", "알려주세요", "부탁해", "부탁해요"}
+# 마지막 토큰 끝에 붙는 요청 어미
+_REQUEST_SUFFIXES = ("해주세요", "해줘요", "해줄래", "해줘", "주세요", "줘요", "줘")
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+# 한 단어 차이로 뜻이 반대가 되는 부정 표현 (예: "로맨스 소설 말고 추천해줘")
+NEGATION_MARKERS = ("말고", "빼고", "제외", "아닌")
+# 캐시를 공유할지 정할 때 무시하는 낱말 (빠지거나 더해져도 답이 달라지지 않는 낱말)
+STOP_WORDS = {"책", "도서", "추천", "관련", "그냥", "정도", "요즘"}
+# 벡터 행렬의 처음 크기 (가득 차면 max_entries 까지 두 배씩 늘림)
+INITIAL_CAPACITY = 64
+
+
+def normalize_question(question: str) -> str:
+    """
+    비슷한 질문이 같은 형태가 되도록 정규화합니다.
+    유니코드 정규화, 소문자 변환, 문장 부호 제거, 요청 표현 제거를 수행합니다.
+
+    Args:
+        question (str): 사용자 질문
+
+    Returns:
+        str: 정규화된 질문
+    """
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _SPACES.sub(" ", _NON_WORD.sub(" ", text)).strip()
+    tokens = [token for token in text.split(" ") if token and token not in _FILLER_TOKENS]
+    if tokens:
+        for suffix in _REQUEST_SUFFIXES:
+            if tokens[-1].endswith(suffix) and len(tokens[-1]) > len(suffix):
+                tokens[-1] = tokens[-1][:-len(suffix)]
+                break
+    return " ".join(tokens)
+
+
+def query_guard(normalized: str) -> tuple:
+    """
+    문자 n-gram 유사도로는 구분되지 않지만 답이 달라지는 부분(숫자, 부정 표현)을 뽑습니다.
+    이 값이 같은 질문끼리만 캐시를 공유합니다. (예: "10대" 와 "20대", "추천해줘" 와 "말고 추천해줘")
+
+    Args:
+        normalized (str): 정규화된 질문
+
+    Returns:
+        tuple: (질문에 나온 숫자들, 질문에 나온 부정 표현들)
+    """
+    digits = tuple(sorted(set(_DIGITS.findall(normalized))))
+    negations = tuple(marker for marker in NEGATION_MARKERS if marker in normalized)
+    return digits, negations
+
+
+def content_tokens(normalized: str) -> tuple:
+    """
+    정규화된 질문에서 불용어와 요청 어미를 뺀 낱말 집합을 만듭니다.
+    긴 질문에서는 한 낱말 차이(예: 작가 이름, "여성"과 "남성")가 문자 n-gram 유사도에 묻히므로
+    이 집합이 같은 질문끼리만 캐시를 공유합니다.
+
+    Args:
+        normalized (str): 정규화된 질문
+
+    Returns:
+        tuple: 정렬된 낱말들
+    """
+    tokens = set()
+    for token in normalized.split(" "):
+        for suffix in _REQUEST_SUFFIXES:
+            if token.endswith(suffix) and len(token) > len(suffix):
+                token = token[:-len(suffix)]
+                break
+        if token and token not in STOP_WORDS and token not in _FILLER_TOKENS:
+            tokens.add(token)
+    return tuple(sorted(tokens))
+
+
+def context_key(history: Optional[List[Dict[str, str]]]) -> str:
+    """
+    대화 맥락을 나타내는 키를 만듭니다. 직전 대화가 같은 요청끼리만 캐시를 공유합니다.
+
+    Args:
+        history (list, optional): 이전 대화 기록
+
+    Returns:
+        str: 맥락 키 (대화 기록이 없으면 빈 문자열)
+    """
+    if not history:
+        return ""
+    hasher = hashlib.sha1()
+    for msg in history[-2:]:
+        hasher.update(msg.get("role", "").encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(msg.get("content", "").encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class HashingVectorizer:
+    """
+    모델 없이 문자 n-gram 을 해싱하여 고정 길이 벡터를 만드는 클래스입니다.
+    """
+    def __init__(self, dim: int = 2048, ngram_range: tuple = (1, 3)):
+        """
+        Args:
+            dim (int, optional): 벡터 차원
+            ngram_range (tuple, optional): 사용할 n-gram 길이 범위
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def transform(self, text: str) -> np.ndarray:
+        """
+        텍스트를 L2 정규화된 벡터로 변환합니다.
+
+        Args:
+            text (str): 정규화된 텍스트
+
+        Returns:
+            np.ndarray: (dim,) 크기의 float32 벡터
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.split(" "):
+            padded = f" {token} "
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for i in range(len(padded) - n + 1):
+                    gram = padded[i:i + n]
+                    if gram.strip():
+                        vector[zlib.crc32(gram.encode("utf-8")) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    """
+    비슷한 질문에 대한 최종 응답을 재사용하는 의미 기반 캐시입니다.
+
+    질문을 정규화하고 문자 n-gram 해싱 벡터로 바꾼 뒤, 범위(그래프 이름)와 대화 맥락, 숫자와 부정 표현,
+    불용어를 뺀 낱말 집합이 모두 같은 항목 중 코사인 유사도가 threshold 이상인 것이 있으면 그 응답을 돌려줍니다.
+    항목은 ttl 이 지나면 만료되고, 가득 차면 가장 오래 사용되지 않은 항목부터 교체됩니다.
+    벡터 행렬은 처음부터 max_entries 크기로 만들지 않고 항목이 늘어날 때 키웁니다.
+    """
+    def __init__(self, threshold: float = 0.92, ttl: float = 3600, max_entries: int = 5000, dim: int = 2048):
+        """
+        Args:
+            threshold (float, optional): 캐시 적중으로 볼 최소 코사인 유사도
+            ttl (float, optional): 항목 만료 시간(초)
+            max_entries (int, optional): 최대 항목 수
+            dim (int, optional): 벡터 차원
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.vectorizer = HashingVectorizer(dim=dim)
+        # (정규화된 질문, 맥락) -> 저장 위치
+        self._slots: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self._allocate(min(max_entries, INITIAL_CAPACITY))
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    def lookup(self, question: str, history: Optional[List[Dict[str, str]]] = None, namespace: str = "") -> Optional[str]:
+        """
+        비슷한 질문의 캐시된 응답을 찾습니다.
+
+        Args:
+            question (str): 사용자 질문
+            history (list, optional): 이전 대화 기록
+            namespace (str, optional): 캐시를 나누는 범위 (예: 그래프 이름)
+
+        Returns:
+            str: 캐시된 응답 (없으면 None)
+        """
+        normalized = normalize_question(question)
+        vector = self.vectorizer.transform(normalized)
+        context = self._context_id(history, namespace, self._guard(normalized))
+        now = time.time()
+        with self._lock:
+            candidates = (self._expires > now) & (self._contexts == context)
+            if not candidates.any():
+                self.misses += 1
+                return None
+            similarities = np.where(candidates, self._vectors @ vector, -1.0)
+            index = int(np.argmax(similarities))
+            if similarities[index] < self.threshold:
+                self.misses += 1
+                return None
+            self._last_used[index] = now
+            self.hits += 1
+            return self._answers[index]
+
+    def store(self, question: str, answer: str, history: Optional[List[Dict[str, str]]] = None, namespace: str = "") -> None:
+        """
+        질문과 최종 응답을 캐시에 저장합니다.
+
+        Args:
+            question (str): 사용자 질문
+            answer (str): 최종 응답
+            history (list, optional): 이전 대화 기록
+            namespace (str, optional): 캐시를 나누는 범위 (예: 그래프 이름)
+        """
+        normalized = normalize_question(question)
+        vector = self.vectorizer.transform(normalized)
+        context = self._context_id(history, namespace, self._guard(normalized))
+        now = time.time()
+        with self._lock:
+            index = self._slot_for(normalized, context, now)
+            if self._questions[index] is not None:
+                self._slots.pop((self._questions[index], int(self._contexts[index])), None)
+            self._slots[(normalized, context)] = index
+            self._vectors[index] = vector
+            self._contexts[index] = context
+            self._expires[index] = now + self.ttl
+            self._last_used[index] = now
+            self._questions[index] = normalized
+            self._answers[index] = answer
+
+    def record_bypass(self) -> None:
+        """캐시를 사용하지 않은 요청 수를 기록합니다."""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self) -> None:
+        """모든 항목과 통계를 초기화합니다."""
+        with self._lock:
+            self._allocate(min(self.max_entries, INITIAL_CAPACITY))
+            self._slots.clear()
+            self.hits = self.misses = self.bypassed = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계를 반환합니다.
+
+        Returns:
+            dict: 적중/실패/우회 횟수, 적중률, 현재 크기
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "size": int((self._expires > time.time()).sum()),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _slot_for(self, normalized: str, context: int, now: float) -> int:
+        """락을 잡은 상태에서 항목을 저장할 위치를 고릅니다."""
+        index = self._slots.get((normalized, context))
+        if index is not None:
+            return index
+        expired = np.flatnonzero(self._expires[:self._size] <= now)
+        if expired.size:
+            return int(expired[0])
+        if self._size == len(self._answers) and self._size < self.max_entries:
+            self._grow(min(self.max_entries, self._size * 2))
+        if self._size < len(self._answers):
+            self._size += 1
+            return self._size - 1
+        self.evictions += 1
+        return int(np.argmin(self._last_used))
+
+    def _allocate(self, capacity: int) -> None:
+        """락을 잡은 상태에서 비어 있는 저장 공간을 capacity 크기로 새로 만듭니다."""
+        self._size = 0
+        self._vectors = np.zeros((capacity, self.vectorizer.dim), dtype=np.float32)
+        self._contexts = np.zeros(capacity, dtype=np.int64)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._questions: List[Optional[str]] = [None] * capacity
+        self._answers: List[Optional[str]] = [None] * capacity
+
+    def _grow(self, capacity: int) -> None:
+        """락을 잡은 상태에서 저장 공간을 capacity 크기로 늘립니다. 기존 항목은 같은 위치에 남습니다."""
+        extra = capacity - len(self._answers)
+        self._vectors = np.concatenate([self._vectors, np.zeros((extra, self.vectorizer.dim), dtype=np.float32)])
+        self._contexts = np.concatenate([self._contexts, np.zeros(extra, dtype=np.int64)])
+        self._expires = np.concatenate([self._expires, np.zeros(extra, dtype=np.float64)])
+        self._last_used = np.concatenate([self._last_used, np.zeros(extra, dtype=np.float64)])
+        self._questions.extend([None] * extra)
+        self._answers.extend([None] * extra)
+
+    @staticmethod
+    def _guard(normalized: str) -> tuple:
+        """n-gram 유사도와 별도로 정확히 같아야 하는 부분 (숫자, 부정 표현, 불용어를 뺀 낱말 집합)"""
+        return (*query_guard(normalized), content_tokens(normalized))
+
+    @staticmethod
+    def _context_id(history: Optional[List[Dict[str, str]]], namespace: str = "", guard: tuple = ((), ())) -> int:
+        """범위, 대화 맥락, 질문의 guard 값을 합친 정수 ID 를 만듭니다. (같은 ID 의 항목끼리만 비교)"""
+        key = hashlib.sha1(f"{namespace}\0{context_key(history)}\0{guard!r}".encode("utf-8")).hexdigest()
+        return int(key[:15], 16)
+
+
+# 그래프 앞단에서 공유하는 의미 기반 응답 캐시
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "5000")),
+)
+registry.register_stats("semantic_cache", semantic_cache.stats)
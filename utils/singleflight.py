@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """진행 중인 실행 하나의 결과를 기다리는 호출자들이 공유하는 객체입니다."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    같은 키의 작업이 이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 받도록 묶어 주는 클래스입니다.
+    결과를 저장하지는 않으므로 실행이 끝난 뒤 들어온 호출은 다시 실행합니다. (캐시와 함께 사용)
+    실행 중 예외가 나면 기다리던 호출자 모두에게 같은 예외가 전달됩니다.
+
+    동기 호출(do)은 스레드 사이에서, 비동기 호출(ado)은 같은 이벤트 루프의 코루틴 사이에서 묶입니다.
+    """
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): 통계에 표시할 이름
+        """
+        self.name = name
+        self.executed = 0
+        self.shared = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        key 에 해당하는 실행이 없으면 func 를 실행하고, 있으면 그 실행이 끝나기를 기다립니다.
+
+        Args:
+            key (Hashable): 같은 작업을 나타내는 키
+            func (Callable): 실행할 함수
+
+        Returns:
+            tuple: (결과, 다른 호출의 결과를 공유했는지 여부)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        do 의 비동기 버전입니다. func 는 코루틴 함수입니다.
+        작업은 별도 태스크로 실행하므로, 처음 호출한 쪽이 취소되어도 기다리던 다른 호출자는 결과를 받습니다.
+
+        Returns:
+            tuple: (결과, 다른 호출의 결과를 공유했는지 여부)
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._async_calls.get(loop_key)
+            shared = task is not None
+            if shared:
+                self.shared += 1
+            else:
+                task = self._async_calls[loop_key] = asyncio.ensure_future(func(*args, **kwargs))
+                task.add_done_callback(lambda done: self._forget(loop_key, done))
+                self.executed += 1
+        return await asyncio.shield(task), shared
+
+    def _forget(self, loop_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            self._async_calls.pop(loop_key, None)
+        # 기다리던 호출자가 모두 취소된 경우에도 "예외를 가져가지 않았다"는 경고가 나오지 않도록 확인
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        실행 통계를 반환합니다.
+
+        Returns:
+            dict: 실제 실행 횟수(executed), 결과를 공유하여 아낀 호출 수(shared), 현재 실행 중인 작업 수(inflight)
+        """
+        with self._lock:
+            inflight = len(self._calls) + len(self._async_calls)
+            return {"executed": self.executed, "shared": self.shared, "inflight": inflight}
@@ -0,0 +1,60 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .catalog import book_catalog
+from .chatbot_system import get_agent_executor
+from .graph import graph_registry
+from .llm import warm_up_clients
+from .memory.history import count_tokens
+from .optimization import get_optimizer, open_naver_connection
+from .replay import replay_mode
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_enabled() -> bool:
+    """WARM_UP 환경 변수가 0/false/off 가 아니면 True 를 반환합니다."""
+    return os.getenv("WARM_UP", "1").lower() not in ("0", "false", "off", "no")
+
+
+def warm_up(connect: Optional[bool] = None) -> Dict[str, float]:
+    """
+    워커가 요청을 받기 전에 처음 요청에서 만들어지던 구성 요소를 미리 준비합니다.
+    그래프 컴파일, 에이전트와 최적화 인스턴스 생성, 연결 풀 생성, 토크나이저와 도서 카탈로그 색인 로딩을 수행합니다.
+    실패한 단계는 경고만 남기고 건너뛰며, 해당 구성 요소는 첫 요청에서 다시 만들어집니다.
+
+    Args:
+        connect (bool, optional): OpenAI, 네이버 서버와의 연결을 미리 열지 여부 (기본값은 WARM_UP_CONNECT 환경 변수, 재생 모드에서는 열지 않음)
+
+    Returns:
+        dict: 성공한 단계별 소요 시간(초)
+    """
+    if connect is None:
+        connect = os.getenv("WARM_UP_CONNECT", "0").lower() in ("1", "true", "on", "yes")
+    connect = connect and replay_mode() == "off"
+
+    steps: List[Tuple[str, Callable[[], object]]] = [
+        ("graphs", lambda: graph_registry.warm_up(persistent=True)),
+        ("agent", get_agent_executor),
+        ("optimizer", get_optimizer),
+        ("llm_clients", lambda: warm_up_clients(connect)),
+        ("tokenizer", lambda: count_tokens("준비")),
+        ("book_catalog", lambda: len(book_catalog)),
+    ]
+    if connect:
+        steps.append(("naver_connection", open_naver_connection))
+
+    timings = {}
+    started = time.perf_counter()
+    for name, step in steps:
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            continue
+        timings[name] = time.perf_counter() - step_started
+    logger.info("Warm-up finished in %.2fs: %s", time.perf_counter() - started, {name: round(t, 3) for name, t in timings.items()})
+    return timings
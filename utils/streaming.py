@@ -0,0 +1,93 @@
+import json
+import queue
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks.manager import adispatch_custom_event, dispatch_custom_event
+
+# 스트리밍 대상이 되는 그래프 노드
+STREAMED_NODES = ("chatbot", "judgement", "optimization")
+
+
+def emit_event(name: str, data: Dict[str, Any]) -> None:
+    """
+    그래프 실행 중에 진행 상황 이벤트를 보냅니다.
+    그래프 밖에서 호출된 경우(예: 단독 실행)에는 아무 일도 하지 않습니다.
+
+    Args:
+        name (str): 이벤트 이름
+        data (dict): 이벤트 데이터
+    """
+    try:
+        dispatch_custom_event(name, data)
+    except RuntimeError:
+        pass
+
+
+async def aemit_event(name: str, data: Dict[str, Any]) -> None:
+    """emit_event의 비동기 버전입니다."""
+    try:
+        await adispatch_custom_event(name, data)
+    except RuntimeError:
+        pass
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Server-Sent Events 형식의 메시지를 만듭니다.
+
+    Args:
+        event (str): 이벤트 이름
+        data (dict): JSON으로 보낼 데이터
+
+    Returns:
+        str: SSE 메시지 문자열
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class StreamEventHandler(BaseCallbackHandler):
+    """
+    그래프 실행 중 발생하는 토큰과 진행 상황을 큐에 넣는 콜백 핸들러입니다.
+
+    큐에는 (이벤트 이름, 데이터) 튜플이 들어갑니다.
+    - node_start: 노드 실행 시작
+    - token: LLM 토큰 (줄바꿈은 <br>로 변환)
+    - agent: 챗봇 노드가 만든 응답
+    - progress 등: 노드 내부에서 emit_event로 보낸 이벤트
+    """
+    def __init__(self, events: "queue.Queue"):
+        self.events = events
+        # run_id 별로 어느 노드에서 실행되었는지 기록
+        self._llm_runs: Dict[UUID, Optional[str]] = {}
+        self._node_runs: Dict[UUID, str] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None, metadata=None, **kwargs) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # 노드 함수 이름이 노드 이름과 같으면 같은 이름의 실행이 중첩되므로 바깥쪽만 기록
+        if node in STREAMED_NODES and kwargs.get("name") == node and parent_run_id not in self._node_runs:
+            self._node_runs[run_id] = node
+            self.events.put(("node_start", {"node": node}))
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs) -> None:
+        node = self._node_runs.pop(run_id, None)
+        if node == "chatbot" and isinstance(outputs, dict) and outputs.get("response"):
+            self.events.put(("agent", {"text": outputs["response"]}))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        self._llm_runs[run_id] = (metadata or {}).get("langgraph_node")
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        if token:
+            stage = self._llm_runs.get(run_id)
+            self.events.put(("token", {"stage": stage, "text": token.replace("\n", "<br>")}))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        self._llm_runs.pop(run_id, None)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._llm_runs.pop(run_id, None)
+
+    def on_custom_event(self, name: str, data: Any, *, run_id: UUID, **kwargs) -> None:
+        self.events.put((name, data))
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.tools import BaseTool
+
+
+class NaverBookStubServer:
+    """
+    네이버 책 검색 API를 흉내 내는 로컬 스텁 서버입니다.
+    실제 API를 호출하지 않고 캐시나 조회 로직을 시험할 때 사용합니다.
+
+    사용 예시:
+        with NaverBookStubServer({"살인자의 기억법": [item]}) as stub:
+            os.environ["NAVER_BOOK_API_URL"] = stub.url
+    """
+    def __init__(self, books: Optional[Dict[str, List[dict]]] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            books (dict, optional): 검색어별로 돌려줄 items 리스트
+            host (str, optional): 바인딩할 호스트
+            port (int, optional): 바인딩할 포트 (0이면 임의의 빈 포트)
+        """
+        self.books = books or {}
+        self.request_count = 0
+        self.queries: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """스텁 API의 검색 주소를 반환합니다."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/search/book.json"
+
+    def start(self) -> "NaverBookStubServer":
+        """백그라운드 스레드에서 서버를 시작합니다."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """서버를 종료합니다."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "NaverBookStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                query = params.get("query", [""])[0]
+                display = int(params.get("display", ["10"])[0])
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.queries.append(query)
+                items = stub.books.get(query, [])[:display]
+                body = json.dumps({"total": len(items), "display": len(items), "items": items}, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # 테스트 출력이 지저분해지지 않도록 접근 로그를 남기지 않음
+                pass
+
+        return Handler
+
+
+class SearchToolStub(BaseTool):
+    """
+    Tavily 검색 도구를 흉내 내는 로컬 스텁 도구입니다.
+    외부 API 없이 에이전트 도구 캐시(tool_cache)나 에이전트 동작을 시험할 때 사용합니다.
+
+    사용 예시:
+        stub = SearchToolStub(results={"김영하 신작": [{"url": "...", "content": "..."}]})
+        tool = cache_tool(stub)
+    """
+    name: str = "tavily_search_results_json"
+    description: str = "웹 검색 결과를 돌려주는 스텁 도구입니다. 입력은 검색어입니다."
+    # 검색어별로 돌려줄 결과 리스트 (없는 검색어는 빈 리스트)
+    results: Dict[str, List[dict]] = {}
+    # 호출마다 기다릴 시간(초)
+    latency: float = 0.0
+    queries: List[str] = []
+
+    def _run(self, query: str, run_manager: Any = None) -> List[dict]:
+        self.queries.append(query)
+        if self.latency:
+            time.sleep(self.latency)
+        return list(self.results.get(query, []))
+
+    async def _arun(self, query: str, run_manager: Any = None) -> List[dict]:
+        self.queries.append(query)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return list(self.results.get(query, []))
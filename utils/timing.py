@@ -0,0 +1,58 @@
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class NodeTimingHandler(BaseCallbackHandler):
+    """
+    그래프 노드별 실행 시간을 재는 콜백 핸들러입니다.
+
+    graph_main 의 callbacks 로 넘기면 노드마다 걸린 시간(밀리초)이 durations 에 쌓이고,
+    server_timing() 으로 HTTP Server-Timing 헤더 값을 만들 수 있습니다.
+    같은 노드가 여러 번 실행되면 시간을 더합니다.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        # run_id -> (노드 이름, 시작 시각)
+        self._runs: Dict[UUID, tuple] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None, metadata=None, **kwargs) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # 노드 함수 이름이 노드 이름과 같으면 같은 이름의 실행이 중첩되므로 바깥쪽만 기록 (__start__ 등 내부 노드 제외)
+        if node and not node.startswith("__") and kwargs.get("name") == node and parent_run_id not in self._runs:
+            self._runs[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def add_durations(self, durations: Dict[str, float]) -> None:
+        """다른 요청이 실행한 그래프의 노드별 시간(밀리초)을 더합니다. (함께 받은 실행 결과의 시간 기록용)"""
+        for node, duration in durations.items():
+            self.durations[node] = self.durations.get(node, 0.0) + duration
+
+    def total_ms(self) -> float:
+        """핸들러를 만든 뒤 지금까지 걸린 시간(밀리초)을 반환합니다."""
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """
+        노드별 실행 시간과 전체 시간을 Server-Timing 헤더 형식으로 만듭니다.
+
+        Returns:
+            str: 예) "history;dur=0.4, chatbot;dur=812.3, total;dur=1530.2"
+        """
+        parts = [f"{node};dur={duration:.1f}" for node, duration in self.durations.items()]
+        parts.append(f"total;dur={self.total_ms():.1f}")
+        return ", ".join(parts)
+
+    def _finish(self, run_id: UUID) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is not None:
+            node, start = run
+            self.durations[node] = self.durations.get(node, 0.0) + (time.perf_counter() - start) * 1000
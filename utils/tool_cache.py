@@ -0,0 +1,152 @@
+import os
+import re
+import time
+from typing import Any
+
+from langchain_core.tools import BaseTool
+
+from .cache import MISSING, SQLiteStore, TTLCache
+from .judgement import TIME_SENSITIVE_KEYWORDS
+from .metrics import registry, tool_cache_requests, tool_upstream_duration
+from .semantic_cache import normalize_question
+from .singleflight import SingleFlight
+
+# 결과가 자주 바뀌는 뉴스성 검색어 (짧은 TTL 적용)
+NEWS_KEYWORDS = TIME_SENSITIVE_KEYWORDS + ['신작', '발표', '베스트셀러', '속보', '어제', '내일', '지금']
+_YEAR_PATTERN = re.compile(r'20\d{2}')
+
+
+def tool_cache_enabled() -> bool:
+    """TOOL_CACHE 환경 변수가 0/false/off 가 아니면 True 를 반환합니다."""
+    return os.getenv("TOOL_CACHE", "1").lower() not in ("0", "false", "off", "no")
+
+
+def _build_tool_cache() -> TTLCache:
+    """
+    에이전트 도구 결과 캐시를 생성합니다.
+    TOOL_CACHE_PATH(기본 data/tool_cache.sqlite)의 SQLite 파일에 저장하여 재시작 후에도, 워커 간에도 공유합니다.
+    TOOL_CACHE_PATH 를 빈 문자열로 설정하면 프로세스 메모리에만 보관합니다.
+    """
+    cache_path = os.getenv("TOOL_CACHE_PATH", os.path.join("data", "tool_cache.sqlite"))
+    store = SQLiteStore(cache_path, table="tool_results") if cache_path else None
+    return TTLCache(
+        maxsize=int(os.getenv("TOOL_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("TOOL_CACHE_TTL", str(7 * 24 * 3600))),
+        negative_ttl=float(os.getenv("TOOL_CACHE_NEGATIVE_TTL", "300")),
+        store=store,
+    )
+
+
+# 검색어 종류별 TTL (오래 유지되는 정보는 TOOL_CACHE_TTL, 뉴스성 검색어는 TOOL_CACHE_NEWS_TTL)
+NEWS_TTL = float(os.getenv("TOOL_CACHE_NEWS_TTL", "1800"))
+
+# 에이전트 도구 결과 캐시 (모든 요청이 공유)
+tool_cache = _build_tool_cache()
+
+# 같은 검색어의 동시 도구 호출을 하나로 묶음
+tool_flight = SingleFlight("tool")
+
+registry.register_stats("tool_cache", tool_cache.stats)
+registry.register_stats("tool_singleflight", tool_flight.stats)
+
+
+def query_class(query: str) -> str:
+    """
+    검색어를 결과가 자주 바뀌는 뉴스성 검색어와 오래 유지되는 검색어로 분류합니다.
+
+    Args:
+        query (str): 검색어
+
+    Returns:
+        str: 'news' 또는 'evergreen'
+    """
+    if _YEAR_PATTERN.search(query) or any(keyword in query for keyword in NEWS_KEYWORDS):
+        return "news"
+    return "evergreen"
+
+
+def query_ttl(query: str) -> float:
+    """검색어 종류에 맞는 캐시 만료 시간(초)을 반환합니다."""
+    return NEWS_TTL if query_class(query) == "news" else tool_cache.ttl
+
+
+class CachedSearchTool(BaseTool):
+    """
+    검색 도구(예: Tavily 검색)의 결과를 정규화한 검색어별로 캐시하는 래퍼입니다.
+    뉴스성 검색어는 짧게, 그 밖의 검색어는 길게 보관하며, 같은 검색어의 동시 호출은 한 번만 실행합니다.
+    Tavily 도구는 실패하면 예외 대신 오류 문자열을 반환하므로 리스트 결과만 캐시합니다.
+    """
+    inner: BaseTool
+    # 결과에 영향을 주는 도구 설정 (캐시 키 앞부분)
+    namespace: str = ""
+
+    def _run(self, query: str, run_manager: Any = None) -> Any:
+        key = self._key(query)
+        cached = self._lookup(key)
+        if cached is not MISSING:
+            return cached
+        result, _ = tool_flight.do(key, self._fetch, query, key)
+        return result
+
+    async def _arun(self, query: str, run_manager: Any = None) -> Any:
+        key = self._key(query)
+        cached = self._lookup(key)
+        if cached is not MISSING:
+            return cached
+        result, _ = await tool_flight.ado(key, self._afetch, query, key)
+        return result
+
+    def _key(self, query: str) -> str:
+        return f"{self.namespace}:{normalize_question(query)}"
+
+    def _lookup(self, key: str) -> Any:
+        """캐시된 결과를 찾고 적중 여부를 기록합니다."""
+        cached = tool_cache.get(key)
+        tool_cache_requests.inc(tool=self.inner.name, result="miss" if cached is MISSING else "hit")
+        return cached
+
+    def _fetch(self, query: str, key: str) -> Any:
+        start = time.perf_counter()
+        try:
+            result = self.inner.invoke(query)
+        except Exception:
+            tool_upstream_duration.observe(time.perf_counter() - start, tool=self.inner.name, status="error")
+            raise
+        return self._store(query, key, result, time.perf_counter() - start)
+
+    async def _afetch(self, query: str, key: str) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await self.inner.ainvoke(query)
+        except Exception:
+            tool_upstream_duration.observe(time.perf_counter() - start, tool=self.inner.name, status="error")
+            raise
+        return self._store(query, key, result, time.perf_counter() - start)
+
+    def _store(self, query: str, key: str, result: Any, elapsed: float) -> Any:
+        """호출 시간을 기록하고 정상 결과를 캐시에 저장합니다. (빈 결과는 짧게 보관)"""
+        ok = isinstance(result, list)
+        tool_upstream_duration.observe(elapsed, tool=self.inner.name, status="ok" if ok else "error")
+        if ok:
+            tool_cache.set(key, result, ttl=query_ttl(query) if result else None)
+        return result
+
+
+def cache_tool(tool: BaseTool) -> BaseTool:
+    """
+    TOOL_CACHE 가 꺼져 있지 않으면 검색 도구를 결과 캐시 래퍼로 감쌉니다.
+
+    Args:
+        tool (BaseTool): 검색어 하나를 입력받는 검색 도구
+
+    Returns:
+        BaseTool: 캐시 래퍼 (도구 이름, 설명, 입력 형식은 원래 도구와 같음)
+    """
+    if not tool_cache_enabled():
+        return tool
+    # Tavily 의 max_results 처럼 결과에 영향을 주는 설정이 다르면 캐시를 공유하지 않음
+    namespace = f"{tool.name}:{getattr(tool, 'max_results', '')}"
+    return CachedSearchTool(
+        inner=tool, namespace=namespace,
+        name=tool.name, description=tool.description, args_schema=tool.args_schema,
+    )
@@ -0,0 +1,60 @@
+import os
+import re
+import secrets
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+# W3C Trace Context 의 traceparent 헤더 형식: 버전-trace id-span id-플래그
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# 현재 요청의 (trace id, 서버 span id, 플래그)
+_current_trace: ContextVar[Optional[Tuple[str, str, str]]] = ContextVar("current_trace", default=None)
+
+
+def trace_enabled() -> bool:
+    """TRACE_PROPAGATION 환경 변수가 1/true/on 이면 True 를 반환합니다. (기본: 꺼짐)"""
+    return os.getenv("TRACE_PROPAGATION", "0").lower() in ("1", "true", "on", "yes")
+
+
+def start_trace(traceparent: Optional[str] = None) -> str:
+    """
+    요청을 받을 때 호출하여 현재 컨텍스트의 trace 를 시작합니다.
+    올바른 traceparent 헤더가 오면 같은 trace id 를 이어 쓰고, 없거나 형식이 틀리면 새 trace 를 만듭니다.
+
+    Args:
+        traceparent (str, optional): 요청의 traceparent 헤더 값
+
+    Returns:
+        str: 이 서버의 span 을 나타내는 traceparent 값 (응답 헤더에 사용)
+    """
+    match = TRACEPARENT_PATTERN.match((traceparent or "").strip().lower())
+    if match and match.group(1) != "0" * 32:
+        trace_id, flags = match.group(1), match.group(3)
+    else:
+        trace_id, flags = secrets.token_hex(16), "01"
+    span_id = secrets.token_hex(8)
+    _current_trace.set((trace_id, span_id, flags))
+    return f"00-{trace_id}-{span_id}-{flags}"
+
+
+def current_trace_id() -> Optional[str]:
+    """현재 컨텍스트의 trace id 를 반환합니다. trace 가 없으면 None 을 반환합니다."""
+    trace = _current_trace.get()
+    return trace[0] if trace else None
+
+
+def outbound_headers() -> Dict[str, str]:
+    """
+    외부 요청에 붙일 traceparent 헤더를 만듭니다.
+    전파가 꺼져 있거나 현재 컨텍스트에 trace 가 없으면 빈 딕셔너리를 반환합니다.
+
+    Returns:
+        dict: {"traceparent": "00-<trace id>-<새 span id>-<플래그>"} 또는 {}
+    """
+    if not trace_enabled():
+        return {}
+    trace = _current_trace.get()
+    if trace is None:
+        return {}
+    trace_id, _, flags = trace
+    return {"traceparent": f"00-{trace_id}-{secrets.token_hex(8)}-{flags}"}